@@ -0,0 +1,221 @@
+"""Recording and replaying API traffic (request/response pairs with timings)
+
+A capture is a gzip-compressed JSON-lines file, one exchange per line. Replaying
+it through APIClient(transport=ReplayTransport(path)) reproduces a real sync
+offline, byte for byte, at recorded or maximum speed.
+"""
+import base64
+import gzip
+import json
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+from app.utils.logger import logger
+
+CAPTURE_VERSION = 1
+
+# Never written to a capture
+REDACTED_REQUEST_FIELDS = {"password"}
+REDACTED_RESPONSE_FIELDS = {"accessToken", "refreshToken", "token"}
+
+# Only auth endpoints (login, refresh) return tokens; other bodies are stored as received
+AUTH_PATH = "/auth/"
+_TOKEN_VALUE = re.compile(
+    r'("(?:%s)"\s*:\s*)"(?:[^"\\]|\\.)*"' % "|".join(sorted(REDACTED_RESPONSE_FIELDS))
+)
+
+# Response headers the client looks at
+KEPT_HEADERS = ("Content-Type", "Retry-After")
+
+
+class ReplayMismatch(Exception):
+    """The client made a request that is not (or no longer) in the capture"""
+    pass
+
+
+def _redact(value: Any, fields: set) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: "***" if key in fields else _redact(item, fields)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item, fields) for item in value]
+    return value
+
+
+def _redact_tokens(body: str) -> str:
+    """Mask token string values in a JSON text, leaving the rest of it untouched"""
+    return _TOKEN_VALUE.sub(r'\1"***"', body)
+
+
+def _request_key(method: str, url: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """Match key: method, URL path (base URL ignored) and query parameters"""
+    path = urlsplit(url).path
+    query = json.dumps({k: str(v) for k, v in (params or {}).items()}, sort_keys=True)
+    return method.upper(), path, query
+
+
+def capture_path(target: str) -> Path:
+    """File to record into: `target` itself, or a timestamped file if it is a directory"""
+    path = Path(target).expanduser()
+    if path.is_dir() or not path.suffix:
+        path.mkdir(parents=True, exist_ok=True)
+        path = path / f"capture-{datetime.now():%Y%m%d-%H%M%S}.jsonl.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class CaptureRecorder:
+    """Appends exchanges to a gzip JSON-lines file (thread-safe)"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._started = time.perf_counter()
+        self._seq = 0
+        self._write({"type": "header", "version": CAPTURE_VERSION, "created": datetime.now().isoformat()})
+        logger.info(f"Recording API traffic to {self.path}")
+
+    def _write(self, entry: Dict[str, Any]):
+        with self._lock:
+            if self._file is None:
+                return
+            entry.setdefault("seq", self._seq)
+            self._seq += 1
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            # Sync-flush so a crash loses at most the current exchange
+            self._file.flush()
+
+    def _request_fields(self, method: str, url: str, kwargs: Dict[str, Any], started: float) -> Dict[str, Any]:
+        split = urlsplit(url)
+        entry = {
+            "type": "exchange",
+            "t": round(started - self._started, 6),
+            "method": method.upper(),
+            "path": split.path,
+            "params": kwargs.get("params"),
+        }
+        if kwargs.get("json") is not None:
+            entry["json"] = _redact(kwargs["json"], REDACTED_REQUEST_FIELDS)
+        if kwargs.get("files"):
+            entry["files"] = sorted(kwargs["files"])
+        return entry
+
+    def record(self, method: str, url: str, kwargs: Dict[str, Any], response, started: float, elapsed: float):
+        """Record a completed exchange"""
+        entry = self._request_fields(method, url, kwargs, started)
+        entry["elapsed"] = round(elapsed, 6)
+        entry["status"] = response.status_code
+        entry["headers"] = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+
+        content = response.content or b""
+        try:
+            body = content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(content).decode("ascii")
+        else:
+            if AUTH_PATH in entry["path"]:
+                body = _redact_tokens(body)
+            entry["body"] = body
+        self._write(entry)
+
+    def record_error(self, method: str, url: str, kwargs: Dict[str, Any], error: Exception, started: float, elapsed: float):
+        """Record a request that failed without a response (connection error, timeout)"""
+        entry = self._request_fields(method, url, kwargs, started)
+        entry["elapsed"] = round(elapsed, 6)
+        entry["error"] = type(error).__name__
+        entry["message"] = str(error)
+        self._write(entry)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"API capture saved: {self.path} ({self._seq - 1} exchanges)")
+
+
+def read_capture(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Exchanges of a capture file (a file cut short by a crash is read up to the break)"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("type") == "exchange":
+                    yield entry
+        except (EOFError, json.JSONDecodeError) as e:
+            logger.warning(f"Capture {path} is truncated: {e}")
+
+
+class ReplayTransport:
+    """Answers APIClient requests from a capture instead of the network
+
+    Requests are matched by method, path and query parameters; repeated
+    requests get the recorded responses in order. speed="recorded" sleeps for
+    each exchange's recorded server time, speed="max" does not wait.
+    """
+
+    def __init__(self, path: Union[str, Path], speed: Union[str, float] = "max"):
+        self.path = Path(path)
+        if speed == "max":
+            self.time_scale = 0.0
+        elif speed == "recorded":
+            self.time_scale = 1.0
+        else:
+            self.time_scale = float(speed)
+        self._lock = threading.Lock()
+        self._queues: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.entries: List[Dict[str, Any]] = list(read_capture(self.path))
+        for entry in self.entries:
+            self._queues[_request_key(entry["method"], entry["path"], entry.get("params"))].append(entry)
+        self.replayed = 0
+
+    @property
+    def recorded_seconds(self) -> float:
+        """Time the recorded requests took on the network"""
+        return sum(entry.get("elapsed", 0.0) for entry in self.entries)
+
+    def remaining(self) -> int:
+        """Recorded exchanges not requested (yet)"""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        key = _request_key(method, url, params)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise ReplayMismatch(f"No recorded response for {key[0]} {key[1]} {key[2]}")
+            entry = queue.popleft()
+            self.replayed += 1
+
+        if self.time_scale:
+            time.sleep(entry.get("elapsed", 0.0) * self.time_scale)
+
+        if "error" in entry:
+            error_class = getattr(requests.exceptions, entry["error"], requests.exceptions.ConnectionError)
+            raise error_class(entry.get("message", ""))
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        response.url = url
+        response.reason = ""
+        response.encoding = "utf-8"
+        if "body_b64" in entry:
+            response._content = base64.b64decode(entry["body_b64"])
+        else:
+            response._content = (entry.get("body") or "").encode("utf-8")
+        return response
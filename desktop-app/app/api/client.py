@@ -1,10 +1,9 @@
 """API client for server communication"""
-import requests
+import time
 from typing import Optional, Dict, Any, List
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from app.utils.config import settings
 from app.utils.logger import logger
+from app.utils.profiling import span
 
 
 class AuthenticationError(Exception):
@@ -24,36 +23,85 @@ class APIError(Exception):
 class APIClient:
     """API client for communicating with the server"""
     
-    def __init__(self, base_url: Optional[str] = None, token: Optional[str] = None):
+    def __init__(self, base_url: Optional[str] = None, token: Optional[str] = None, transport=None):
         self.base_url = base_url or settings.api_base_url
         self.token = token
-        self.session = requests.Session()
-        
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
-        # Set default headers
-        self.session.headers.update({
+        self._session = None
+        self._headers: Dict[str, str] = {
             "Content-Type": "application/json",
-        })
+        }
+        # Anything with requests.Session.request() semantics, e.g. capture.ReplayTransport
+        self.transport = transport
+        self.recorder = None
         
         if self.token:
             self.set_token(self.token)
+        
+        if settings.api_capture and transport is None:
+            self.start_capture(settings.api_capture)
+    
+    @property
+    def session(self):
+        """HTTP session, created on first request (requests/urllib3 load lazily to speed up startup)"""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            
+            # Configure retry strategy
+            retry_strategy = Retry(
+                total=3,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+            )
+            adapter = HTTPAdapter(max_retries=retry_strategy)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            
+            session.headers.update(self._headers)
+            self._session = session
+        return self._session
     
     def set_token(self, token: str):
         """Set authentication token"""
         self.token = token
-        self.session.headers.update({
-            "Authorization": f"Bearer {token}",
-        })
+        self._headers["Authorization"] = f"Bearer {token}"
+        if self._session is not None:
+            self._session.headers.update(self._headers)
+    
+    def start_capture(self, target: str):
+        """Record every request/response (with timings) to a compressed capture file"""
+        from app.api.capture import CaptureRecorder, capture_path
+        
+        self.stop_capture()
+        self.recorder = CaptureRecorder(capture_path(target))
+        return self.recorder.path
+    
+    def stop_capture(self):
+        """Finish the current capture file"""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+    
+    def _send(self, method: str, url: str, **kwargs):
+        """Send through the transport, recording the exchange while capturing"""
+        transport = self.transport or self.session
+        recorder = self.recorder
+        if recorder is None:
+            return transport.request(method, url, **kwargs)
+        
+        started = time.perf_counter()
+        try:
+            response = transport.request(method, url, **kwargs)
+        except Exception as e:
+            recorder.record_error(method, url, kwargs, e, started, time.perf_counter() - started)
+            raise
+        recorder.record(method, url, kwargs, response, started, time.perf_counter() - started)
+        return response
     
+    @span("api.request")
     def _request(
         self,
         method: str,
@@ -76,6 +124,7 @@ class APIClient:
             base_url = base_url[:-4]  # Remove '/api'
         
         url = f"{base_url}{endpoint}"
+        import requests
         
         try:
             kwargs = {
@@ -91,7 +140,7 @@ class APIClient:
             elif data:
                 kwargs["json"] = data
             
-            response = self.session.request(method, url, **kwargs)
+            response = self._send(method, url, **kwargs)
             
             # Handle rate limiting (429) before raise_for_status
             if response.status_code == 429:
@@ -124,7 +173,8 @@ class APIClient:
             logger.error(f"HTTP error: {e}")
             if hasattr(e.response, 'status_code') and e.response.status_code == 401:
                 raise AuthenticationError("Authentication failed")
-            raise APIError(f"HTTP error: {e}")
+            status_code = e.response.status_code if e.response is not None else None
+            raise APIError(f"HTTP error: {e}", status_code=status_code)
         
         except APIError:
             # Re-raise APIError as-is
@@ -1,28 +1,163 @@
 """Synchronization service"""
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List, Dict, Any, Callable, Iterable, NamedTuple, Optional, Set
 from sqlalchemy.orm import Session
 from app.database.models import (
-    Event, Registration, AccountingEntry, Collective,
+    Event, EventPrice, Registration, AccountingEntry, Collective,
     Discipline, Nomination, Age, Category, Person,
     RegistrationLeader, RegistrationTrainer,
-    SyncStatus
+    SyncStatus, EventStatus, PaymentStatus, RegistrationStatus
 )
 from app.api.client import APIClient, APIError, AuthenticationError
-from app.utils.logger import logger
+from app.utils.logger import LogAggregator, logger
+from app.utils.profiling import span
+
+
+class SyncProgress(NamedTuple):
+    """Progress event reported while syncing"""
+    phase: str  # reference, events, prices, registrations, accounting, push
+    event_name: Optional[str] = None
+    event_index: int = 0
+    event_count: int = 0
+    page: int = 0
+    total_pages: int = 0
+    rows: int = 0
+    rows_per_sec: float = 0.0
+    eta_seconds: Optional[float] = None
+
+
+class SyncCancelled(Exception):
+    """Sync stopped on request at a page boundary"""
+
+
+class ChangeSet:
+    """Local ids inserted/updated/deleted per entity during a sync
+
+    Rows whose synced values did not change are not recorded, so views can
+    skip refreshing when the server had nothing new.
+    """
+    
+    def __init__(self):
+        self.inserted: Dict[str, Set[int]] = defaultdict(set)
+        self.updated: Dict[str, Set[int]] = defaultdict(set)
+        self.deleted: Dict[str, Set[int]] = defaultdict(set)
+        # Local event id -> entities changed within that event
+        self.events: Dict[int, Set[str]] = defaultdict(set)
+    
+    def record(self, entity: str, kind: str, ids: Iterable[int], event_id: Optional[int] = None):
+        """Record ids of an entity as inserted, updated or deleted"""
+        ids = set(ids)
+        if not ids:
+            return
+        getattr(self, kind)[entity].update(ids)
+        if event_id is not None:
+            self.events[event_id].add(entity)
+    
+    def changed(self, entity: str) -> Set[int]:
+        """All ids of an entity touched by the sync"""
+        return self.inserted[entity] | self.updated[entity] | self.deleted[entity]
+    
+    def has_changes(self, entity: str) -> bool:
+        return bool(self.inserted[entity] or self.updated[entity] or self.deleted[entity])
+    
+    def structure_changed(self, entity: str) -> bool:
+        """Rows were added or removed (list order/counts may differ)"""
+        return bool(self.inserted[entity] or self.deleted[entity])
+    
+    def event_changed(self, event_id: Optional[int], entity: Optional[str] = None) -> bool:
+        """Whether anything (or the given entity) changed within a local event"""
+        if event_id is None or event_id not in self.events:
+            return False
+        return entity is None or entity in self.events[event_id]
+    
+    def is_empty(self) -> bool:
+        return not any(self.inserted.values()) and not any(self.updated.values()) and not any(self.deleted.values())
+    
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Counts per entity for logging"""
+        entities = set(self.inserted) | set(self.updated) | set(self.deleted)
+        return {
+            entity: {
+                "inserted": len(self.inserted[entity]),
+                "updated": len(self.updated[entity]),
+                "deleted": len(self.deleted[entity]),
+            }
+            for entity in sorted(entities)
+            if self.has_changes(entity)
+        }
 
 
 class SyncService:
     """Service for synchronizing local database with server"""
     
-    def __init__(self, api_client: APIClient, db_session: Session):
+    def __init__(
+        self,
+        api_client: APIClient,
+        db_session: Session,
+        progress_callback: Optional[Callable[[SyncProgress], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ):
         self.api = api_client
         self.db = db_session
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        self.changes = ChangeSet()
+        
+        # server_id -> local id per model, loaded in one query on first lookup
+        self._local_ids: Dict[type, Dict[int, int]] = {}
+        
+        # Repeated per-row warnings are collapsed into counts per phase
+        self.log = LogAggregator()
+        
+        # Progress state of the current sync_all run
+        self._started_at = time.monotonic()
+        self._rows = 0
+        self._event_name: Optional[str] = None
+        self._event_index = 0
+        self._event_count = 0
+    
+    def _check_cancelled(self):
+        """Raise SyncCancelled if cancellation was requested"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SyncCancelled()
+    
+    def _report(self, phase: str, page: int = 0, total_pages: int = 0, page_seconds: Optional[float] = None):
+        """Send a progress event to the callback"""
+        self.log.set_phase(phase)
+        if not self.progress_callback:
+            return
+        
+        elapsed = time.monotonic() - self._started_at
+        eta = None
+        if page_seconds is not None and total_pages:
+            eta = (total_pages - page) * page_seconds
+        
+        self.progress_callback(SyncProgress(
+            phase=phase,
+            event_name=self._event_name,
+            event_index=self._event_index,
+            event_count=self._event_count,
+            page=page,
+            total_pages=total_pages,
+            rows=self._rows,
+            rows_per_sec=self._rows / elapsed if elapsed > 0 else 0.0,
+            eta_seconds=eta,
+        ))
     
     def sync_all(self) -> Dict[str, Any]:
         """Sync all data with server"""
+        self._started_at = time.monotonic()
+        self._rows = 0
+        self.changes = ChangeSet()
+        self._local_ids.clear()
         result = {
             "success": True,
+            "cancelled": False,
+            "changes": self.changes,
             "synced": {
                 "events": 0,
                 "registrations": 0,
@@ -33,103 +168,120 @@ class SyncService:
             "errors": [],
         }
         
-        try:
-            # Sync reference data first (needed for other data)
-            self.sync_reference_data()
-            result["synced"]["reference_data"] = 1
-            
-            # Sync events
-            events_count = self.sync_events()
-            result["synced"]["events"] = events_count
-            
-            # Sync registrations for each event
-            events = self.db.query(Event).filter(Event.server_id.isnot(None)).all()
-            for event in events:
-                try:
-                    regs_count = self.sync_registrations(event.server_id)
-                    result["synced"]["registrations"] += regs_count
-                except Exception as e:
-                    logger.error(f"Error syncing registrations for event {event.server_id}: {e}")
-                    result["errors"].append(f"Event {event.server_id} registrations: {e}")
-            
-            # Sync accounting entries
-            acc_count = self.sync_accounting_entries()
-            result["synced"]["accounting_entries"] = acc_count
-            
-            # Push local changes to server
-            self.push_local_changes()
-            
-        except Exception as e:
-            logger.error(f"Error during sync: {e}")
-            result["success"] = False
-            result["errors"].append(str(e))
-        
-        return result
-    
-    def sync_reference_data(self):
-        """Sync reference data (disciplines, nominations, ages, categories)"""
-        try:
-            # Sync disciplines
-            disciplines = self.api.get("/api/reference/disciplines") or []
-            for disc_data in disciplines:
-                disc = self.db.query(Discipline).filter(
-                    Discipline.server_id == disc_data["id"]
-                ).first()
-                
-                if not disc:
-                    disc = Discipline(server_id=disc_data["id"])
-                    self.db.add(disc)
+        with span("sync.all") as sync_span:
+            try:
+                # Sync reference data first (needed for other data)
+                self._report("reference")
+                self.sync_reference_data()
+                result["synced"]["reference_data"] = 1
+                self._check_cancelled()
                 
-                disc.name = disc_data["name"]
-                # Update other fields if needed
-            
-            # Sync nominations
-            nominations = self.api.get("/api/reference/nominations") or []
-            for nom_data in nominations:
-                nom = self.db.query(Nomination).filter(
-                    Nomination.server_id == nom_data["id"]
-                ).first()
+                # Sync events
+                self._report("events")
+                events_count = self.sync_events()
+                result["synced"]["events"] = events_count
+                self._check_cancelled()
                 
-                if not nom:
-                    nom = Nomination(server_id=nom_data["id"])
-                    self.db.add(nom)
+                # Sync registrations for each event
+                events = self.db.query(Event).filter(Event.server_id.isnot(None)).all()
+                self._event_count = len(events)
+                for index, event in enumerate(events, start=1):
+                    self._event_index = index
+                    self._event_name = event.name
+                    
+                    try:
+                        self._report("prices")
+                        self.sync_event_prices(event)
+                    except (SyncCancelled, AuthenticationError):
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error syncing prices for event {event.server_id}: {e}")
+                        result["errors"].append(f"Event {event.server_id} prices: {e}")
+                    
+                    try:
+                        self._report("registrations")
+                        regs_count = self.sync_registrations(event.server_id)
+                        result["synced"]["registrations"] += regs_count
+                    except (SyncCancelled, AuthenticationError):
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error syncing registrations for event {event.server_id}: {e}")
+                        result["errors"].append(f"Event {event.server_id} registrations: {e}")
+                    self._check_cancelled()
+                self._event_name = None
                 
-                nom.name = nom_data["name"]
-            
-            # Sync ages
-            ages = self.api.get("/api/reference/ages") or []
-            for age_data in ages:
-                age = self.db.query(Age).filter(
-                    Age.server_id == age_data["id"]
-                ).first()
+                # Sync accounting entries
+                self._report("accounting")
+                acc_count = self.sync_accounting_entries()
+                result["synced"]["accounting_entries"] = acc_count
+                self._check_cancelled()
                 
-                if not age:
-                    age = Age(server_id=age_data["id"])
-                    self.db.add(age)
+                # Push local changes to server
+                self._report("push")
+                self.push_local_changes()
                 
-                age.name = age_data["name"]
+            except SyncCancelled:
+                # Pages already committed are kept, the current one is discarded
+                self.db.rollback()
+                logger.info(f"Sync cancelled after {self._rows} registration rows")
+                result["synced"]["registrations"] = max(result["synced"]["registrations"], self._rows)
+                result["success"] = False
+                result["cancelled"] = True
+            except AuthenticationError as e:
+                # The token was rejected: no point in trying the remaining events
+                self.db.rollback()
+                logger.warning(f"Sync stopped, authentication failed: {e}")
+                result["success"] = False
+                result["auth_failed"] = True
+                result["errors"].append(str(e))
+            except Exception as e:
+                logger.error(f"Error during sync: {e}")
+                result["success"] = False
+                result["errors"].append(str(e))
             
-            # Sync categories
-            categories = self.api.get("/api/reference/categories") or []
-            for cat_data in categories:
-                cat = self.db.query(Category).filter(
-                    Category.server_id == cat_data["id"]
-                ).first()
-                
-                if not cat:
-                    cat = Category(server_id=cat_data["id"])
-                    self.db.add(cat)
-                
-                cat.name = cat_data["name"]
+        self.log.set_phase(None)
+        logger.info(
+            f"Sync took {sync_span.elapsed:.1f} s, {sync_span.queries} SQL queries "
+            f"({sync_span.sql_seconds:.1f} s in SQLite)"
+        )
+        logger.info(f"Sync changes: {self.changes.summary()}")
+        return result
+    
+    @span("sync.reference")
+    def sync_reference_data(self):
+        """Sync reference data (disciplines, nominations, ages, categories)"""
+        try:
+            for model_class, endpoint in (
+                (Discipline, "/api/reference/disciplines"),
+                (Nomination, "/api/reference/nominations"),
+                (Age, "/api/reference/ages"),
+                (Category, "/api/reference/categories"),
+            ):
+                items = self.api.get(endpoint) or []
+                existing = {
+                    obj.server_id: obj
+                    for obj in self.db.query(model_class).filter(model_class.server_id.isnot(None)).all()
+                }
+                for item_data in items:
+                    obj = existing.get(item_data["id"])
+                    if not obj:
+                        obj = model_class(server_id=item_data["id"])
+                        self.db.add(obj)
+                        existing[obj.server_id] = obj
+                    
+                    obj.name = item_data["name"]
+                self._local_ids.pop(model_class, None)
             
             self.db.commit()
             logger.info("Reference data synced")
         
         except Exception as e:
             self.db.rollback()
+            self._local_ids.clear()
             logger.error(f"Error syncing reference data: {e}")
             raise
     
+    @span("sync.events")
     def sync_events(self) -> int:
         """Sync events from server"""
         try:
@@ -138,47 +290,136 @@ class SyncService:
             events_data = response if isinstance(response, list) else (response.get("events", []) if response else [])
             count = 0
             
+            existing = {
+                event.server_id: event
+                for event in self.db.query(Event).filter(Event.server_id.isnot(None)).all()
+            }
+            inserted = []
+            updated = []
+            
             for event_data in events_data:
-                event = self.db.query(Event).filter(
-                    Event.server_id == event_data["id"]
-                ).first()
+                event = existing.get(event_data["id"])
                 
                 if not event:
                     event = Event(server_id=event_data["id"])
                     self.db.add(event)
+                    existing[event.server_id] = event
+                    inserted.append(event)
                 
                 # Update event data
                 event.name = event_data["name"]
-                event.start_date = datetime.fromisoformat(event_data["startDate"].replace("Z", "+00:00"))
-                event.end_date = datetime.fromisoformat(event_data["endDate"].replace("Z", "+00:00"))
+                event.start_date = self._parse_datetime(event_data["startDate"])
+                event.end_date = self._parse_datetime(event_data["endDate"])
                 event.description = event_data.get("description")
-                event.status = event_data.get("status", "DRAFT")
+                event.status = EventStatus(event_data.get("status", "DRAFT"))
                 event.is_online = event_data.get("isOnline", False)
                 event.payment_enable = event_data.get("paymentEnable", True)
                 event.category_enable = event_data.get("categoryEnable", True)
                 event.calculator_token = event_data.get("calculatorToken")
+                event.price_per_diploma = self._to_decimal(event_data.get("pricePerDiploma"))
+                event.price_per_medal = self._to_decimal(event_data.get("pricePerMedal"))
+                event.discount_tiers = event_data.get("discountTiers")
+                if event.id is not None and self.db.is_modified(event):
+                    updated.append(event)
                 event.sync_status = SyncStatus.SYNCED
                 event.last_synced_at = datetime.utcnow()
                 
                 count += 1
             
+            self.db.flush()
+            self.changes.record("events", "inserted", (event.id for event in inserted))
+            self.changes.record("events", "updated", (event.id for event in updated))
             self.db.commit()
+            self._local_ids.pop(Event, None)
             logger.info(f"Synced {count} events")
             return count
         
         except Exception as e:
             self.db.rollback()
+            self._local_ids.clear()
             logger.error(f"Error syncing events: {e}")
             raise
     
+    @span("sync.prices")
+    def sync_event_prices(self, event: Event) -> int:
+        """Sync nomination prices of an event"""
+        try:
+            prices_data = self.api.get(f"/api/events/{event.server_id}/prices") or []
+            existing = {
+                price.nomination_id: price
+                for price in self.db.query(EventPrice).filter(EventPrice.event_id == event.id).all()
+            }
+            seen = set()
+            count = 0
+            inserted = []
+            updated = []
+            
+            for price_data in prices_data:
+                nomination_id = self._get_local_id(Nomination, price_data.get("nominationId"))
+                if not nomination_id:
+                    continue
+                
+                price = existing.get(nomination_id)
+                if not price:
+                    price = EventPrice(event_id=event.id, nomination_id=nomination_id)
+                    self.db.add(price)
+                    inserted.append(price)
+                
+                price.server_id = price_data.get("id")
+                price.price_per_participant = self._to_decimal(price_data.get("pricePerParticipant")) or Decimal(0)
+                price.price_per_federation_participant = self._to_decimal(price_data.get("pricePerFederationParticipant"))
+                if price.id is not None and self.db.is_modified(price):
+                    updated.append(price)
+                price.last_synced_at = datetime.utcnow()
+                seen.add(nomination_id)
+                count += 1
+            
+            # Prices removed on the server
+            deleted = []
+            for nomination_id, price in existing.items():
+                if nomination_id not in seen:
+                    deleted.append(price.id)
+                    self.db.delete(price)
+            
+            self.db.flush()
+            self.changes.record("event_prices", "inserted", (price.id for price in inserted), event.id)
+            self.changes.record("event_prices", "updated", (price.id for price in updated), event.id)
+            self.changes.record("event_prices", "deleted", deleted, event.id)
+            self.db.commit()
+            return count
+        
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error syncing event prices: {e}")
+            raise
+    
+    @staticmethod
+    def _parse_datetime(value: str) -> datetime:
+        """Parse an API timestamp as naive UTC (the form SQLite returns it in)"""
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    @staticmethod
+    def _to_decimal(value: Any) -> Optional[Decimal]:
+        """Convert API money value (number or decimal string) to Decimal"""
+        if value is None or value == "":
+            return None
+        return Decimal(str(value))
+    
+    @span("sync.registrations")
     def sync_registrations(self, event_id: int) -> int:
         """Sync registrations for an event"""
         try:
             page = 1
             limit = 100
             total_count = 0
+            page_seconds = None
             
             while True:
+                self._check_cancelled()
+                page_started = time.monotonic()
                 registrations_data = self.api.get(
                     "/api/registrations",
                     params={"eventId": event_id, "page": page, "limit": limit}
@@ -188,10 +429,22 @@ class SyncService:
                 if not registrations:
                     break
                 
+                # One query for the page instead of one per registration
+                server_ids = [reg_data["id"] for reg_data in registrations if reg_data.get("id")]
+                existing = {
+                    reg.server_id: reg
+                    for reg in self.db.query(Registration).filter(Registration.server_id.in_(server_ids)).all()
+                } if server_ids else {}
+                inserted = []
+                updated = []
+                
                 for reg_data in registrations:
                     # Skip if required fields are missing
                     if not reg_data.get("eventId") or not reg_data.get("disciplineId") or not reg_data.get("nominationId") or not reg_data.get("ageId"):
-                        logger.warning(f"Skipping registration {reg_data.get('id')}: missing required fields")
+                        self.log.log(
+                            "Skipping registrations with missing required fields",
+                            f"Skipping registration {reg_data.get('id')}: missing required fields",
+                        )
                         continue
                     
                     # Sync collective if needed
@@ -199,28 +452,45 @@ class SyncService:
                         collective_data = reg_data.get("collective")
                         self._ensure_collective_exists(reg_data.get("collectiveId"), collective_data)
                     
-                    reg = self.db.query(Registration).filter(
-                        Registration.server_id == reg_data["id"]
-                    ).first()
+                    reg = existing.get(reg_data["id"])
                     
                     if not reg:
                         reg = Registration(server_id=reg_data["id"])
                         self.db.add(reg)
+                        existing[reg.server_id] = reg
+                        inserted.append(reg)
                     
                     # Update registration data
                     try:
                         self._update_registration_from_data(reg, reg_data)
+                        if reg.id is not None and self.db.is_modified(reg):
+                            updated.append(reg)
                         reg.sync_status = SyncStatus.SYNCED
                         reg.last_synced_at = datetime.utcnow()
                         total_count += 1
                     except Exception as e:
-                        logger.error(f"Error updating registration {reg_data.get('id')}: {e}")
+                        self.log.log(
+                            f"Error updating registration: {type(e).__name__}",
+                            f"Error updating registration {reg_data.get('id')}: {e}",
+                            level="ERROR",
+                        )
                         # Continue with next registration
                         continue
                 
+                # Commit per page so a cancelled sync keeps the pages already done
+                self.db.flush()
+                self._record_registrations("inserted", inserted)
+                self._record_registrations("updated", updated)
+                self.db.commit()
+                self._rows += len(registrations)
+                
                 # Check if there are more pages
                 pagination = registrations_data.get("pagination", {})
-                if page >= pagination.get("totalPages", 1):
+                total_pages = pagination.get("totalPages", 1)
+                elapsed = time.monotonic() - page_started
+                page_seconds = elapsed if page_seconds is None else 0.7 * page_seconds + 0.3 * elapsed
+                self._report("registrations", page, total_pages, page_seconds)
+                if page >= total_pages:
                     break
                 
                 page += 1
@@ -229,11 +499,26 @@ class SyncService:
             logger.info(f"Synced {total_count} registrations for event {event_id}")
             return total_count
         
+        except SyncCancelled:
+            self.db.rollback()
+            self._local_ids.clear()
+            raise
         except Exception as e:
             self.db.rollback()
+            # Collectives flushed on the discarded page are gone
+            self._local_ids.clear()
             logger.error(f"Error syncing registrations: {e}")
             raise
     
+    def _record_registrations(self, kind: str, registrations: List[Registration]):
+        """Record flushed registrations in the change set, grouped by event"""
+        by_event: Dict[int, List[int]] = defaultdict(list)
+        for reg in registrations:
+            if reg.id is not None:
+                by_event[reg.event_id].append(reg.id)
+        for event_id, ids in by_event.items():
+            self.changes.record("registrations", kind, ids, event_id)
+    
     def _update_registration_from_data(self, reg: Registration, data: Dict[str, Any]):
         """Update registration from API data"""
         # Map API data to model
@@ -255,12 +540,12 @@ class SyncService:
         reg.diplomas_count = data.get("diplomasCount", 0)
         reg.medals_count = data.get("medalsCount", 0)
         reg.diplomas_list = data.get("diplomasList")
-        reg.payment_status = data.get("paymentStatus", "UNPAID")
-        reg.paid_amount = data.get("paidAmount")
+        reg.payment_status = PaymentStatus(data.get("paymentStatus", "UNPAID"))
+        reg.paid_amount = self._to_decimal(data.get("paidAmount"))
         reg.performance_paid = data.get("performancePaid", False)
         reg.diplomas_and_medals_paid = data.get("diplomasAndMedalsPaid", False)
         reg.diplomas_printed = data.get("diplomasPrinted", False)
-        reg.status = data.get("status", "PENDING")
+        reg.status = RegistrationStatus(data.get("status", "PENDING"))
         reg.notes = data.get("notes")
         reg.number = data.get("number")
         reg.block_number = data.get("blockNumber")
@@ -274,42 +559,59 @@ class SyncService:
     
     def _ensure_collective_exists(self, collective_id: int, collective_data: Optional[Dict[str, Any]] = None):
         """Ensure collective exists in local DB"""
-        collective = self.db.query(Collective).filter(
-            Collective.server_id == collective_id
-        ).first()
-        
-        if not collective:
+        local_ids = self._local_id_map(Collective)
+        if collective_id not in local_ids:
             collective = Collective(server_id=collective_id)
             if collective_data:
                 collective.name = collective_data.get("name", f"Collective {collective_id}")
             else:
                 collective.name = f"Collective {collective_id}"
             self.db.add(collective)
-            self.db.commit()
-            logger.info(f"Created collective {collective_id}: {collective.name}")
+            # Flushed only - committed with the current page, so loaded rows are not expired mid-page
+            self.db.flush()
+            local_ids[collective_id] = collective.id
+            self.changes.record("collectives", "inserted", [collective.id])
+            self.log.log(
+                "Created collectives",
+                f"Created collective {collective_id}: {collective.name}",
+                level="INFO",
+            )
+    
+    def _local_id_map(self, model_class) -> Dict[int, int]:
+        """server_id -> local id of all rows of a model (cached for the sync run)"""
+        local_ids = self._local_ids.get(model_class)
+        if local_ids is None:
+            local_ids = dict(
+                self.db.query(model_class.server_id, model_class.id).filter(model_class.server_id.isnot(None)).all()
+            )
+            self._local_ids[model_class] = local_ids
+        return local_ids
     
     def _get_local_id(self, model_class, server_id: Optional[int]) -> Optional[int]:
         """Get local ID from server ID"""
         if not server_id:
             return None
         
-        obj = self.db.query(model_class).filter(
-            model_class.server_id == server_id
-        ).first()
+        local_id = self._local_id_map(model_class).get(server_id)
         
-        if not obj:
+        if local_id is None:
             # Log warning but don't fail - some references might not be synced yet
-            logger.warning(f"Reference not found: {model_class.__name__} with server_id={server_id}")
+            self.log.log(
+                f"Reference not found: {model_class.__name__}",
+                f"Reference not found: {model_class.__name__} with server_id={server_id}",
+            )
             return None
         
-        return obj.id
+        return local_id
     
+    @span("sync.accounting")
     def sync_accounting_entries(self) -> int:
         """Sync accounting entries"""
         # Similar to sync_registrations
         # Implementation depends on your API structure
         return 0
     
+    @span("sync.push")
     def push_local_changes(self):
         """Push local changes to server"""
         # Find all items with sync_status = PENDING
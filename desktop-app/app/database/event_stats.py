@@ -0,0 +1,91 @@
+"""Incrementally maintained per-event statistics (event_stats table)"""
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from app.utils.logger import logger
+
+# event_stats column -> SQL expression over a registrations row ("{ref}" is NEW or OLD)
+STATS_COLUMNS = {
+    "total_regs": "1",
+    "pending_regs": "({ref}.status IS 'PENDING')",
+    "approved_regs": "({ref}.status IS 'APPROVED')",
+    "rejected_regs": "({ref}.status IS 'REJECTED')",
+    "unpaid_regs": "({ref}.payment_status IS 'UNPAID')",
+    "performance_paid_regs": "({ref}.payment_status IS 'PERFORMANCE_PAID')",
+    "diplomas_paid_regs": "({ref}.payment_status IS 'DIPLOMAS_PAID')",
+    "paid_regs": "({ref}.payment_status IS 'PAID')",
+    "total_participants": "COALESCE({ref}.participants_count, 0)",
+    "total_diplomas": "COALESCE({ref}.diplomas_count, 0)",
+    "total_medals": "COALESCE({ref}.medals_count, 0)",
+}
+
+# Registration columns that affect the aggregates
+TRACKED_COLUMNS = (
+    "event_id", "status", "payment_status",
+    "participants_count", "diplomas_count", "medals_count",
+)
+
+
+def _apply_sql(ref: str, sign: str) -> str:
+    """Statements adding (+) or removing (-) one registration row from its event aggregates"""
+    assignments = ",\n        ".join(
+        f"{column} = {column} {sign} {expr.format(ref=ref)}"
+        for column, expr in STATS_COLUMNS.items()
+    )
+    return (
+        f"INSERT OR IGNORE INTO event_stats (event_id) VALUES ({ref}.event_id);\n"
+        f"    UPDATE event_stats SET\n        {assignments}\n"
+        f"    WHERE event_id = {ref}.event_id;"
+    )
+
+
+TRIGGERS = {
+    "trg_event_stats_insert": (
+        "AFTER INSERT ON registrations",
+        _apply_sql("NEW", "+"),
+    ),
+    "trg_event_stats_update": (
+        f"AFTER UPDATE OF {', '.join(TRACKED_COLUMNS)} ON registrations",
+        _apply_sql("OLD", "-") + "\n    " + _apply_sql("NEW", "+"),
+    ),
+    "trg_event_stats_delete": (
+        "AFTER DELETE ON registrations",
+        _apply_sql("OLD", "-"),
+    ),
+}
+
+
+def install_event_stats_triggers(engine: Engine):
+    """Create event_stats triggers; rebuild aggregates when they were missing"""
+    with engine.begin() as conn:
+        existing = {
+            row[0] for row in conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'registrations'"
+            ))
+        }
+        missing = [name for name in TRIGGERS if name not in existing]
+        for name in missing:
+            timing, body = TRIGGERS[name]
+            conn.execute(text(f"CREATE TRIGGER {name} {timing}\nBEGIN\n    {body}\nEND"))
+
+        if missing:
+            # Registrations written before the triggers existed are not counted yet
+            count = rebuild_event_stats(conn)
+            logger.info(f"Installed event_stats triggers, rebuilt stats for {count} events")
+
+
+def rebuild_event_stats(conn: Connection, event_id: Optional[int] = None) -> int:
+    """Recompute event_stats from registrations (all events or one local event ID)"""
+    columns = ", ".join(STATS_COLUMNS)
+    aggregates = ", ".join(
+        f"SUM({expr.format(ref='registrations')})" for expr in STATS_COLUMNS.values()
+    )
+    where = "WHERE event_id = :event_id" if event_id is not None else ""
+    params = {"event_id": event_id} if event_id is not None else {}
+
+    conn.execute(text(f"DELETE FROM event_stats {where}"), params)
+    result = conn.execute(text(
+        f"INSERT INTO event_stats (event_id, {columns}) "
+        f"SELECT event_id, {aggregates} FROM registrations {where} GROUP BY event_id"
+    ), params)
+    return result.rowcount
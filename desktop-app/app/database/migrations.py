@@ -0,0 +1,69 @@
+"""Schema migrations for existing local databases"""
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.database.models import Base
+from app.utils.logger import logger
+
+
+def add_missing_columns(engine: Engine):
+    """Add model columns missing from existing tables (create_all only creates new tables)"""
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+            if not existing:
+                continue
+
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+
+def create_missing_indexes(engine: Engine):
+    """Create model indexes missing from existing tables"""
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+# Columns converted from NUMERIC major units to integer minor units (schema version 1)
+FIXED_POINT_COLUMNS = {
+    "events": ("price_per_diploma", "price_per_medal"),
+    "event_prices": ("price_per_participant", "price_per_federation_participant"),
+    "registrations": ("paid_amount",),
+    "accounting_entries": ("amount", "discount_amount", "discount_percent"),
+}
+
+
+def _fixed_point_to_integers(conn):
+    """Store money (and discount percent) as scaled integers"""
+    for table, columns in FIXED_POINT_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+        for column in columns:
+            if column in existing:
+                conn.execute(text(
+                    f"UPDATE {table} SET {column} = CAST(ROUND({column} * 100) AS INTEGER) "
+                    f"WHERE {column} IS NOT NULL"
+                ))
+
+
+# (version, description, step) - applied in order, tracked in PRAGMA user_version
+MIGRATIONS = [
+    (1, "money as integer kopecks", _fixed_point_to_integers),
+]
+
+
+def run_migrations(engine: Engine):
+    """Apply pending data migrations"""
+    with engine.begin() as conn:
+        version = conn.execute(text("PRAGMA user_version")).scalar() or 0
+        for target, description, step in MIGRATIONS:
+            if version >= target:
+                continue
+            logger.info(f"Applying migration {target}: {description}")
+            step(conn)
+            conn.execute(text(f"PRAGMA user_version = {target}"))
+            version = target
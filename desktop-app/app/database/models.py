@@ -3,10 +3,11 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
     Column, Integer, String, Boolean, DateTime, 
-    Numeric, ForeignKey, Text, Enum as SQLEnum
+    ForeignKey, Text, Enum as SQLEnum, Index, UniqueConstraint
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from app.database.types import FixedPoint, Money
 import enum
 
 Base = declarative_base()
@@ -64,6 +65,9 @@ class Event(Base):
     payment_enable = Column(Boolean, default=True)
     category_enable = Column(Boolean, default=True)
     calculator_token = Column(String, nullable=True, unique=True)
+    price_per_diploma = Column(Money(), nullable=True)
+    price_per_medal = Column(Money(), nullable=True)
+    discount_tiers = Column(Text, nullable=True)  # JSON
     
     # Sync metadata
     sync_status = Column(SQLEnum(SyncStatus), default=SyncStatus.SYNCED)
@@ -73,6 +77,7 @@ class Event(Base):
     
     # Relationships
     registrations = relationship("Registration", back_populates="event", cascade="all, delete-orphan")
+    prices = relationship("EventPrice", back_populates="event", cascade="all, delete-orphan")
     
     def to_dict(self):
         return {
@@ -86,9 +91,36 @@ class Event(Base):
             "paymentEnable": self.payment_enable,
             "categoryEnable": self.category_enable,
             "calculatorToken": self.calculator_token,
+            "pricePerDiploma": float(self.price_per_diploma) if self.price_per_diploma is not None else None,
+            "pricePerMedal": float(self.price_per_medal) if self.price_per_medal is not None else None,
+            "discountTiers": self.discount_tiers,
         }
 
 
+class EventPrice(Base):
+    """Performance price of a nomination within an event"""
+    __tablename__ = "event_prices"
+    __table_args__ = (
+        UniqueConstraint("event_id", "nomination_id", name="uq_event_prices_event_nomination"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    server_id = Column(Integer, unique=True, nullable=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
+    nomination_id = Column(Integer, ForeignKey("nominations.id"), nullable=False, index=True)
+    price_per_participant = Column(Money(), nullable=False)
+    price_per_federation_participant = Column(Money(), nullable=True)
+    
+    # Sync metadata
+    last_synced_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    event = relationship("Event", back_populates="prices")
+    nomination = relationship("Nomination")
+
+
 class Collective(Base):
     """Collective model"""
     __tablename__ = "collectives"
@@ -190,6 +222,10 @@ class Person(Base):
 class Registration(Base):
     """Registration model"""
     __tablename__ = "registrations"
+    __table_args__ = (
+        # Event list in display order (newest first) without a separate sort
+        Index("ix_registrations_event_created", "event_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True)
     server_id = Column(Integer, unique=True, nullable=True, index=True)
@@ -212,7 +248,7 @@ class Registration(Base):
     medals_count = Column(Integer, default=0)
     diplomas_list = Column(Text, nullable=True)
     payment_status = Column(SQLEnum(PaymentStatus), default=PaymentStatus.UNPAID, index=True)
-    paid_amount = Column(Numeric(10, 2), nullable=True)
+    paid_amount = Column(Money(), nullable=True)
     performance_paid = Column(Boolean, default=False)
     diplomas_and_medals_paid = Column(Boolean, default=False)
     diplomas_printed = Column(Boolean, default=False)
@@ -274,6 +310,24 @@ class Registration(Base):
         }
 
 
+class EventStats(Base):
+    """Per-event registration aggregates, maintained by triggers on registrations"""
+    __tablename__ = "event_stats"
+    
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    total_regs = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_regs = Column(Integer, nullable=False, default=0, server_default="0")
+    approved_regs = Column(Integer, nullable=False, default=0, server_default="0")
+    rejected_regs = Column(Integer, nullable=False, default=0, server_default="0")
+    unpaid_regs = Column(Integer, nullable=False, default=0, server_default="0")
+    performance_paid_regs = Column(Integer, nullable=False, default=0, server_default="0")
+    diplomas_paid_regs = Column(Integer, nullable=False, default=0, server_default="0")
+    paid_regs = Column(Integer, nullable=False, default=0, server_default="0")
+    total_participants = Column(Integer, nullable=False, default=0, server_default="0")
+    total_diplomas = Column(Integer, nullable=False, default=0, server_default="0")
+    total_medals = Column(Integer, nullable=False, default=0, server_default="0")
+
+
 class RegistrationLeader(Base):
     """Registration-Leader relationship"""
     __tablename__ = "registration_leaders"
@@ -313,9 +367,9 @@ class AccountingEntry(Base):
     collective_id = Column(Integer, ForeignKey("collectives.id"), nullable=True)
     event_id = Column(Integer, nullable=True, index=True)
     
-    amount = Column(Numeric(10, 2), nullable=False)
-    discount_amount = Column(Numeric(10, 2), default=0)
-    discount_percent = Column(Numeric(5, 2), default=0)
+    amount = Column(Money(), nullable=False)
+    discount_amount = Column(Money(), default=0)
+    discount_percent = Column(FixedPoint(100), default=0)  # percent, stored in hundredths
     method = Column(SQLEnum(PaymentMethod), nullable=False)
     paid_for = Column(SQLEnum(PaidFor), nullable=False, index=True)
     payment_group_id = Column(String, nullable=True, index=True)
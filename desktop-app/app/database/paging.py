@@ -0,0 +1,182 @@
+"""Paged data sources for virtualized list views"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+
+
+class PagedDataSource(ABC):
+    """Row source fetched in fixed-size pages, with a small LRU page cache
+
+    Subclasses implement _count_rows() and _fetch(); each call gets its own short-lived session.
+    get_rows() and count() block on the database; views read the cache with peek_rows()
+    and load missing_pages() on a worker thread with fetch_pages() / store_pages().
+    """
+
+    def __init__(
+        self,
+        page_size: int = 200,
+        max_cached_pages: int = 8,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ):
+        if session_factory is None:
+            from app.database.session import get_db_session
+            session_factory = get_db_session
+        self.session_factory = session_factory
+        self.page_size = page_size
+        self.max_cached_pages = max_cached_pages
+        self._pages: "OrderedDict[int, List[Any]]" = OrderedDict()
+        self._count: Optional[int] = None
+        self.version = 0  # bumped when cached pages are dropped; stale fetches are not stored
+
+    @abstractmethod
+    def _count_rows(self, db: Session) -> int:
+        """Total number of rows"""
+
+    @abstractmethod
+    def _fetch(self, db: Session, offset: int, limit: int) -> List[Any]:
+        """Rows [offset, offset + limit) in display order"""
+
+    def invalidate(self):
+        """Drop cached pages and count"""
+        self._pages.clear()
+        self._count = None
+        self.version += 1
+
+    def invalidate_pages(self):
+        """Drop cached pages, keep the count (row set unchanged, order changed)"""
+        self._pages.clear()
+        self.version += 1
+
+    def count(self) -> int:
+        """Total number of rows"""
+        if self._count is None:
+            db = self.session_factory()
+            try:
+                self._count = self._count_rows(db)
+            finally:
+                db.close()
+        return self._count
+
+    def patch_rows(self, rows: Sequence[Any], key: str = "id"):
+        """Replace cached rows that have the same key (in-place update of changed rows)"""
+        by_key = {getattr(row, key): row for row in rows}
+        for page in self._pages.values():
+            for i, row in enumerate(page):
+                replacement = by_key.get(getattr(row, key))
+                if replacement is not None:
+                    page[i] = replacement
+
+    def cached_keys(self, key: str = "id") -> set:
+        """Keys of rows currently held in the page cache"""
+        return {getattr(row, key) for page in self._pages.values() for row in page}
+
+    def prefetch(self, pages: int = 1):
+        """Load the count and the first pages (e.g. on a worker thread before binding to a view)"""
+        self.count()
+        if self._count:
+            self.get_rows(0, min(self._count, pages * self.page_size))
+
+    def _store(self, index: int, page: List[Any]):
+        self._pages[index] = page
+        if len(self._pages) > self.max_cached_pages:
+            self._pages.popitem(last=False)
+
+    def _page(self, db: Session, index: int) -> List[Any]:
+        page = self._pages.get(index)
+        if page is None:
+            page = self._fetch(db, index * self.page_size, self.page_size)
+            self._store(index, page)
+        else:
+            self._pages.move_to_end(index)
+        return page
+
+    def peek_rows(self, offset: int, limit: int) -> List[Optional[Any]]:
+        """Rows [offset, offset + limit) from the cache only; rows of uncached pages are None"""
+        end = min(offset + limit, self._count if self._count is not None else offset + limit)
+        rows: List[Optional[Any]] = []
+        position = offset
+        while position < end:
+            index = position // self.page_size
+            page_end = min(end, (index + 1) * self.page_size)
+            page = self._pages.get(index)
+            if page is None:
+                rows.extend([None] * (page_end - position))
+            else:
+                self._pages.move_to_end(index)
+                start = position - index * self.page_size
+                rows.extend(page[start:start + page_end - position])
+            position = page_end
+        return rows
+
+    def missing_pages(self, offset: int, limit: int, margin: Optional[int] = None) -> List[int]:
+        """Uncached pages covering rows [offset - margin, offset + limit + margin), margin defaults to half a page"""
+        if margin is None:
+            margin = self.page_size // 2
+        first = max(0, offset - margin) // self.page_size
+        end = offset + limit + margin
+        if self._count is not None:
+            end = min(end, self._count)
+        last = (end - 1) // self.page_size
+        return [i for i in range(first, last + 1) if i not in self._pages]
+
+    def fetch_pages(self, indexes: Sequence[int]) -> Dict[int, List[Any]]:
+        """Read pages without touching the cache (safe on a worker thread)"""
+        db = self.session_factory()
+        try:
+            return {index: self._fetch(db, index * self.page_size, self.page_size) for index in indexes}
+        finally:
+            db.close()
+
+    def store_pages(self, pages: Dict[int, List[Any]], version: int) -> bool:
+        """Cache pages from fetch_pages(); ignored if the cache was dropped since `version`"""
+        if version != self.version:
+            return False
+        for index, page in pages.items():
+            self._store(index, page)
+        return True
+
+    def get_rows(self, offset: int, limit: int) -> Sequence[Any]:
+        """Rows [offset, offset + limit), reading missing pages"""
+        if limit <= 0:
+            return []
+        first = offset // self.page_size
+        last = (offset + limit - 1) // self.page_size
+        missing = [i for i in range(first, last + 1) if i not in self._pages]
+
+        db = self.session_factory() if missing else None
+        try:
+            rows: List[Any] = []
+            for index in range(first, last + 1):
+                rows.extend(self._page(db, index))
+        finally:
+            if db is not None:
+                db.close()
+
+        start = offset - first * self.page_size
+        return rows[start:start + limit]
+
+
+class ListDataSource:
+    """In-memory row source with the same interface as PagedDataSource"""
+
+    def __init__(self, rows: Sequence[Any]):
+        self.rows = list(rows)
+
+    def invalidate(self):
+        pass
+
+    def prefetch(self, pages: int = 1):
+        pass
+
+    def count(self) -> int:
+        return len(self.rows)
+
+    def get_rows(self, offset: int, limit: int) -> Sequence[Any]:
+        return self.rows[offset:offset + limit]
+
+    def peek_rows(self, offset: int, limit: int) -> List[Any]:
+        return self.rows[offset:offset + limit]
+
+    def missing_pages(self, offset: int, limit: int, margin: Optional[int] = None) -> List[int]:
+        return []
@@ -0,0 +1,259 @@
+"""Read-only queries returning lightweight row projections for list views"""
+from array import array
+from typing import Collection, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Query, Session
+from app.database.models import Event, EventStats, Registration, Collective, PaymentStatus
+from app.database.event_stats import STATS_COLUMNS
+from app.database.paging import PagedDataSource
+
+
+class RegistrationRow(NamedTuple):
+    """Displayed columns of a registration (no ORM state, no lazy loads)"""
+    id: int
+    number: Optional[int]
+    block_number: Optional[int]
+    collective_name: Optional[str]
+    dance_name: Optional[str]
+    status: Optional[str]
+    payment_status: Optional[str]
+    participants_count: Optional[int]
+    notes: Optional[str]
+
+
+class RegistrationFilter(NamedTuple):
+    """Search text and status filters of the registrations list"""
+    search: str = ""
+    status: Optional[str] = None
+    payment_status: Optional[str] = None
+
+    def is_active(self) -> bool:
+        return bool(self.search.strip() or self.status or self.payment_status)
+
+
+def _like_pattern(text: str) -> str:
+    """Casefolded substring LIKE pattern with wildcards escaped"""
+    escaped = text.casefold().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _filter_registrations(query: Query, filters: Optional[RegistrationFilter]) -> Query:
+    """Apply search/status filters (search is case-insensitive for Cyrillic via the casefold SQL function)"""
+    if not filters:
+        return query
+    if filters.status:
+        query = query.filter(Registration.status == filters.status)
+    if filters.payment_status:
+        query = query.filter(Registration.payment_status == filters.payment_status)
+
+    search = filters.search.strip()
+    if search:
+        pattern = _like_pattern(search)
+        conditions = [
+            func.casefold(Collective.name).like(pattern, escape="\\"),
+            func.casefold(Registration.dance_name).like(pattern, escape="\\"),
+            func.casefold(Registration.notes).like(pattern, escape="\\"),
+        ]
+        if search.isdigit():
+            conditions.append(Registration.number == int(search))
+        query = query.filter(or_(*conditions))
+    return query
+
+
+def find_event(db: Session, event_id: int) -> Optional[Event]:
+    """Find local event by server ID or local ID"""
+    return db.query(Event).filter(
+        (Event.server_id == event_id) | (Event.id == event_id)
+    ).first()
+
+
+def load_registration_rows(
+    db: Session,
+    local_event_id: int,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    filters: Optional[RegistrationFilter] = None,
+    ids: Optional[Collection[int]] = None,
+) -> List[RegistrationRow]:
+    """Load registration rows for an event (optionally only the given ids), selecting only displayed columns"""
+    query = db.query(
+        Registration.id,
+        Registration.number,
+        Registration.block_number,
+        Collective.name,
+        Registration.dance_name,
+        Registration.status,
+        Registration.payment_status,
+        Registration.participants_count,
+        Registration.notes,
+    ).outerjoin(
+        Collective, Registration.collective_id == Collective.id
+    ).filter(
+        Registration.event_id == local_event_id
+    )
+    if ids is not None:
+        query = query.filter(Registration.id.in_(list(ids)))
+    query = _filter_registrations(query, filters).order_by(Registration.created_at.desc())
+
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+
+    return [
+        RegistrationRow(
+            id=row[0],
+            number=row[1],
+            block_number=row[2],
+            collective_name=row[3],
+            dance_name=row[4],
+            status=row[5].value if row[5] else None,
+            payment_status=row[6].value if row[6] else None,
+            participants_count=row[7],
+            notes=row[8],
+        )
+        for row in query.all()
+    ]
+
+
+def count_registrations(
+    db: Session,
+    local_event_id: int,
+    filters: Optional[RegistrationFilter] = None,
+) -> int:
+    """Count registrations of an event (matching filters, if given)"""
+    query = db.query(Registration.id).filter(Registration.event_id == local_event_id)
+    if filters and filters.search.strip():
+        query = query.outerjoin(Collective, Registration.collective_id == Collective.id)
+    return _filter_registrations(query, filters).count()
+
+
+_NUMBER_LAST = 2 ** 62  # sorts empty numbers after all real ones
+_TEXT_LAST = "\U0010ffff"
+_PAYMENT_RANK = {status.value: rank for rank, status in enumerate(PaymentStatus)}
+
+# Sortable column -> key expression
+SORT_COLUMNS = {
+    "number": Registration.number,
+    "block_number": Registration.block_number,
+    "collective_name": func.casefold(Collective.name),
+    "dance_name": func.casefold(Registration.dance_name),
+    "payment_status": Registration.payment_status,
+}
+
+
+class SortIndex:
+    """Sort keys of one registration list, loaded once as compact columns
+
+    Permutations are computed in memory per (column, direction) and cached, so
+    changing the sort order does not query the database.
+    """
+
+    def __init__(self, ids: array, keys: Dict[str, list], empty: Dict[str, int]):
+        self.ids = ids
+        self.keys = keys
+        self.empty = empty
+        self._permutations: Dict[Tuple[str, bool], array] = {}
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        local_event_id: int,
+        filters: Optional[RegistrationFilter] = None,
+    ) -> "SortIndex":
+        """One query over the id and sort key columns, in default list order"""
+        query = db.query(
+            Registration.id, *SORT_COLUMNS.values()
+        ).outerjoin(
+            Collective, Registration.collective_id == Collective.id
+        ).filter(
+            Registration.event_id == local_event_id
+        )
+        rows = _filter_registrations(query, filters).order_by(Registration.created_at.desc()).all()
+
+        ids = array("q", (row[0] for row in rows))
+        keys: Dict[str, list] = {}
+        empty: Dict[str, int] = {}
+        for position, name in enumerate(SORT_COLUMNS, start=1):
+            values = [row[position] for row in rows]
+            if name == "payment_status":
+                values = [_PAYMENT_RANK.get(v.value) if v else None for v in values]
+            if name in ("collective_name", "dance_name"):
+                column = [v if v else _TEXT_LAST for v in values]
+                empty[name] = column.count(_TEXT_LAST)
+            else:
+                column = array("q", (_NUMBER_LAST if v is None else v for v in values))
+                empty[name] = column.count(_NUMBER_LAST)
+            keys[name] = column
+        return cls(ids, keys, empty)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def permutation(self, key: str, descending: bool = False) -> array:
+        """Row positions in sorted order (stable; empty values last in both directions)"""
+        cached = self._permutations.get((key, descending))
+        if cached is None:
+            values = self.keys[key]
+            order = sorted(range(len(values)), key=values.__getitem__, reverse=descending)
+            if descending and self.empty[key]:
+                # Reversed order puts the empty placeholder first - move it back to the end
+                order = order[self.empty[key]:] + order[:self.empty[key]]
+            cached = array("l", order)
+            self._permutations[(key, descending)] = cached
+        return cached
+
+
+class RegistrationsSource(PagedDataSource):
+    """Paged registration rows of one event, in default order or sorted by a column"""
+
+    def __init__(self, local_event_id: int, filters: Optional[RegistrationFilter] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.local_event_id = local_event_id
+        self.filters = filters
+        self.sort_index: Optional[SortIndex] = None
+        self.sort_key: Optional[str] = None
+        self.sort_descending = False
+        self._order: Optional[array] = None
+
+    def load_sort_index(self):
+        """Load sort keys (call on a worker thread; once per source)"""
+        if self.sort_index is None:
+            db = self.session_factory()
+            try:
+                self.sort_index = SortIndex.load(db, self.local_event_id, self.filters)
+            finally:
+                db.close()
+
+    def set_sort(self, key: Optional[str], descending: bool = False):
+        """Order rows by a sort column (None for default order); only cached pages are dropped"""
+        self.sort_key = key
+        self.sort_descending = descending
+        self._order = self.sort_index.permutation(key, descending) if key else None
+        self.invalidate_pages()
+
+    def _count_rows(self, db: Session) -> int:
+        if self.sort_index is not None:
+            return len(self.sort_index)
+        return count_registrations(db, self.local_event_id, self.filters)
+
+    def _fetch(self, db: Session, offset: int, limit: int) -> List[RegistrationRow]:
+        if self._order is None:
+            return load_registration_rows(
+                db, self.local_event_id, limit=limit, offset=offset, filters=self.filters
+            )
+
+        # Sorted: pick ids of the page from the permutation, fetch them by primary key
+        ids = [self.sort_index.ids[position] for position in self._order[offset:offset + limit]]
+        rows = {row.id: row for row in load_registration_rows(db, self.local_event_id, ids=ids)}
+        return [rows[row_id] for row_id in ids if row_id in rows]
+
+
+def load_event_stats(db: Session, local_event_id: int) -> Dict[str, int]:
+    """Read precomputed event aggregates (single row, zeros if event has none)"""
+    stats = db.query(EventStats).filter(EventStats.event_id == local_event_id).first()
+    return {
+        column: (getattr(stats, column) or 0) if stats else 0
+        for column in STATS_COLUMNS
+    }
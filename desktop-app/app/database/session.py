@@ -1,32 +1,81 @@
 """Database session management"""
-from sqlalchemy import create_engine
+import threading
+import weakref
+from typing import List
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
 from app.database.models import Base
+from app.database.event_stats import install_event_stats_triggers
+from app.database.migrations import add_missing_columns, create_missing_indexes, run_migrations
 from app.utils.config import get_db_path
 from app.utils.logger import logger
+from app.utils.profiling import get_profiler
+from app.utils.startup import get_startup_profiler
 from pathlib import Path
 
 # Database path
 db_path = get_db_path()
 db_path.parent.mkdir(parents=True, exist_ok=True)
 
-# Create engine with connection pooling
+# Create engine with connection pooling (one connection per thread at a time:
+# views load data on worker threads while sync writes)
 engine = create_engine(
     f"sqlite:///{db_path}",
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    connect_args={"check_same_thread": False, "timeout": 30},
     echo=False,  # Set to True for SQL debugging
 )
 
+
+def _casefold(value):
+    """SQL casefold(): SQLite's lower()/LIKE only fold ASCII, search needs Cyrillic too"""
+    return value.casefold() if isinstance(value, str) else value
+
+
+@event.listens_for(engine, "connect")
+def _configure_connection(dbapi_connection, connection_record):
+    """WAL lets readers proceed while a sync transaction is writing"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+    dbapi_connection.create_function("casefold", 1, _casefold, deterministic=True)
+
+
+# Statement counts and time per profiling span
+get_profiler().install_query_counter(engine)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessions still referenced somewhere (identity-map sizes in memory diagnostics)
+_live_sessions: "weakref.WeakSet[Session]" = weakref.WeakSet()
+_live_sessions_lock = threading.Lock()
+
+
+def _track(db: Session) -> Session:
+    with _live_sessions_lock:
+        _live_sessions.add(db)
+    return db
+
+
+def live_sessions() -> List[Session]:
+    """Sessions created by get_db/get_db_session that have not been garbage collected"""
+    with _live_sessions_lock:
+        return list(_live_sessions)
+
 
 def init_db():
     """Initialize database - create all tables"""
     try:
-        Base.metadata.create_all(bind=engine)
+        profiler = get_startup_profiler()
+        with profiler.phase("create_all"):
+            Base.metadata.create_all(bind=engine)
+        with profiler.phase("migrations"):
+            add_missing_columns(engine)
+            create_missing_indexes(engine)
+            run_migrations(engine)
+        with profiler.phase("event stats triggers"):
+            install_event_stats_triggers(engine)
         logger.info(f"Database initialized at {db_path}")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
@@ -35,7 +84,7 @@ def init_db():
 
 def get_db() -> Session:
     """Get database session"""
-    db = SessionLocal()
+    db = _track(SessionLocal())
     try:
         yield db
     finally:
@@ -44,5 +93,5 @@ def get_db() -> Session:
 
 def get_db_session() -> Session:
     """Get database session (non-generator version)"""
-    return SessionLocal()
+    return _track(SessionLocal())
 
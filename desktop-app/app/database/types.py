@@ -0,0 +1,39 @@
+"""Custom column types"""
+from decimal import Decimal
+from typing import Any, Optional
+from sqlalchemy import Integer, type_coerce
+from sqlalchemy.types import TypeDecorator
+from app.utils.money import MINOR_UNITS, to_minor, from_minor
+
+
+class FixedPoint(TypeDecorator):
+    """Decimal value stored as a scaled INTEGER (e.g. rubles as kopecks)
+
+    SQL aggregates (SUM, GROUP BY) run on plain integers; conversion to Decimal
+    happens only when a value crosses the model boundary.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def __init__(self, scale: int = MINOR_UNITS):
+        super().__init__()
+        self.scale = scale
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[int]:
+        return to_minor(value, self.scale)
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[Decimal]:
+        return from_minor(value, self.scale)
+
+
+class Money(FixedPoint):
+    """Rubles stored as integer kopecks"""
+    cache_ok = True
+
+    def __init__(self):
+        super().__init__(MINOR_UNITS)
+
+
+def minor_units(column):
+    """Read a FixedPoint column (or aggregate over it) as raw integer minor units"""
+    return type_coerce(column, Integer)
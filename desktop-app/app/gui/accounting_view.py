@@ -1,22 +1,37 @@
 """Accounting view for displaying and managing payments"""
 import customtkinter as ctk
-from typing import List, Optional, Dict, Any
-from app.database.models import AccountingEntry, Event, PaymentMethod, PaidFor
+from typing import Optional, Dict, Any, Tuple
+from app.database.models import PaymentMethod, PaidFor
 from app.database.session import get_db_session
+from app.gui.background import BackgroundLoader
+from app.gui.event_dropdown import EventDropdownMixin
+from app.services.event_catalog import get_event_catalog
+from app.database.queries import find_event
+from app.gui.virtual_table import VirtualTable, TableColumn
+from app.services.accounting_service import AccountingQueryService, AccountingLedgerSource
+from app.utils.money import format_rub
 from app.utils.logger import logger
-from datetime import datetime
+from app.utils.profiling import span
 
 
-class AccountingView(ctk.CTkFrame):
+class AccountingView(EventDropdownMixin, ctk.CTkFrame):
     """View for displaying accounting entries"""
     
+    synced_events_only = True
+    
     def __init__(self, parent, event_id: Optional[int] = None):
         super().__init__(parent)
         self.event_id = event_id
         
+        # Ledger source (paged), totals are always computed over the whole event
+        self.source: Optional[AccountingLedgerSource] = None
+        
+        # Queries run on worker threads, results are rendered on the main thread
+        self.loader = BackgroundLoader(self)
+        
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(2, weight=1)
+        self.grid_rowconfigure(3, weight=1)
         
         # Header frame
         header_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -68,13 +83,58 @@ class AccountingView(ctk.CTkFrame):
         refresh_btn.grid(row=0, column=2, padx=5, pady=5, sticky="e")
         controls_frame.after(100, lambda: refresh_btn.lift())
         
-        # Accounting scrollable frame
-        self.scrollable_frame = ctk.CTkScrollableFrame(
+        # Summary (totals over the whole event)
+        self.summary_frame = ctk.CTkFrame(
             self,
-            scrollbar_button_color=("gray70", "gray30"),
-            scrollbar_button_hover_color=("gray60", "gray40")
+            corner_radius=10,
+            fg_color=("gray75", "gray25")
         )
-        self.scrollable_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
+        self.summary_label = ctk.CTkLabel(
+            self.summary_frame,
+            text="",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            wraplength=800
+        )
+        self.summary_label.pack(pady=(10, 2), padx=10)
+        self.details_label = ctk.CTkLabel(
+            self.summary_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            wraplength=800
+        )
+        self.details_label.pack(pady=(2, 10), padx=10)
+        
+        # Ledger table
+        method_labels = {
+            PaymentMethod.CASH: "Наличные",
+            PaymentMethod.CARD: "Карта",
+            PaymentMethod.TRANSFER: "Перевод"
+        }
+        paid_for_labels = {
+            PaidFor.PERFORMANCE: "Рега",
+            PaidFor.DIPLOMAS_MEDALS: "ДМ"
+        }
+        self.table = VirtualTable(
+            self,
+            columns=[
+                TableColumn(
+                    "created_at", "Дата", width=120,
+                    formatter=lambda v: v.strftime("%d.%m.%Y %H:%M") if v else "-"
+                ),
+                TableColumn("amount", "Сумма", width=150, weight=1, bold=True, formatter=format_rub),
+                TableColumn(
+                    "method", "Метод", width=150, weight=1,
+                    formatter=lambda v: method_labels.get(v, v.value if v else "-")
+                ),
+                TableColumn(
+                    "paid_for", "Назначение", width=200,
+                    formatter=lambda v: paid_for_labels.get(v, v.value if v else "-")
+                ),
+                TableColumn("description", "Описание", width=200, weight=1, max_chars=50),
+            ],
+            empty_text="📭 Выберите событие для просмотра оплат"
+        )
+        self.table.grid(row=3, column=0, sticky="nsew", padx=10, pady=10)
         
         # Status label
         self.status_label = ctk.CTkLabel(
@@ -82,40 +142,15 @@ class AccountingView(ctk.CTkFrame):
             text="",
             font=ctk.CTkFont(size=12)
         )
-        self.status_label.grid(row=3, column=0, pady=5)
+        self.status_label.grid(row=4, column=0, pady=5)
         
-        # Load events
+        # Load events (and follow catalogue changes, e.g. after sync)
         self.refresh_events()
+        get_event_catalog().subscribe(self.refresh_events, self)
         if event_id:
             self.event_id = event_id
             self.refresh_accounting()
     
-    def refresh_events(self):
-        """Refresh events dropdown"""
-        try:
-            db = get_db_session()
-            try:
-                events = db.query(Event).filter(
-                    Event.server_id.isnot(None)
-                ).order_by(Event.start_date.desc()).all()
-                
-                event_values = ["Выберите событие"]
-                for event in events:
-                    event_values.append(f"{event.name} (ID: {event.server_id})")
-                
-                self.event_dropdown.configure(values=event_values)
-                
-                if self.event_id:
-                    # Find and select current event
-                    for event in events:
-                        if event.server_id == self.event_id or event.id == self.event_id:
-                            self.event_var.set(f"{event.name} (ID: {event.server_id})")
-                            break
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Error loading events: {e}")
-    
     def _on_event_selected(self, choice: str):
         """Handle event selection"""
         if choice == "Выберите событие":
@@ -129,201 +164,94 @@ class AccountingView(ctk.CTkFrame):
         except Exception as e:
             logger.error(f"Error parsing event ID: {e}")
     
+    @span("ui.accounting.refresh_accounting")
     def refresh_accounting(self):
-        """Refresh accounting entries"""
-        # Clear existing widgets
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        """Refresh accounting entries (loaded in the background)"""
+        self.source = None
         
         if not self.event_id:
+            self.loader.cancel("accounting")
+            self.summary_frame.grid_forget()
             self.status_label.configure(text="", text_color="gray")
-            no_event_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text="📭 Выберите событие для просмотра оплат",
-                font=ctk.CTkFont(size=16),
-                justify="center"
-            )
-            no_event_label.pack(pady=40)
+            self.table.show_message("📭 Выберите событие для просмотра оплат")
             return
         
         self.status_label.configure(text="⏳ Загрузка оплат...", text_color="gray")
-        self.update()
+        event_id = self.event_id
         
-        try:
+        def load():
             db = get_db_session()
             try:
                 # Find local event ID from server ID
-                event = db.query(Event).filter(
-                    (Event.server_id == self.event_id) | (Event.id == self.event_id)
-                ).first()
-                
+                event = find_event(db, event_id)
                 if not event:
-                    error_label = ctk.CTkLabel(
-                        self.scrollable_frame,
-                        text="❌ Событие не найдено в локальной БД.\nСинхронизируйтесь с сервером.",
-                        text_color="red",
-                        font=ctk.CTkFont(size=14),
-                        wraplength=600,
-                        justify="center"
-                    )
-                    error_label.pack(pady=20)
-                    self.status_label.configure(text="✗ Событие не найдено", text_color="red")
-                    return
-                
-                # Get accounting entries
-                entries = db.query(AccountingEntry).filter(
-                    AccountingEntry.event_id == event.id,
-                    AccountingEntry.deleted_at.is_(None)
-                ).order_by(AccountingEntry.created_at.desc()).limit(200).all()
+                    return None
                 
-                self._render_accounting(entries)
-                self.status_label.configure(
-                    text=f"✓ Загружено оплат: {len(entries)}",
-                    text_color="green"
-                )
+                # Totals over the whole event, ledger paged separately
+                totals = AccountingQueryService(db).get_totals(event.id)
+                local_event_id = event.id
             finally:
                 db.close()
-        except Exception as e:
-            logger.error(f"Error loading accounting: {e}")
-            error_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text=f"❌ Ошибка загрузки оплат: {e}",
-                text_color="red",
-                font=ctk.CTkFont(size=14),
-                wraplength=600
-            )
-            error_label.pack(pady=20)
-            self.status_label.configure(
-                text=f"✗ Ошибка: {str(e)[:50]}",
-                text_color="red"
-            )
+            
+            source = AccountingLedgerSource(local_event_id)
+            source.prefetch()
+            return totals, source
+        
+        self.loader.submit("accounting", load, self._on_accounting_loaded, self._on_accounting_error)
     
-    def _render_accounting(self, entries: List[AccountingEntry]):
-        """Render accounting entries"""
-        if not entries:
-            no_entries_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text="📭 Нет оплат для этого события",
-                font=ctk.CTkFont(size=16),
-                justify="center"
+    def _on_accounting_loaded(self, result: Optional[Tuple[Dict[str, Any], AccountingLedgerSource]]):
+        """Render loaded totals and bind the ledger to the table"""
+        if result is None:
+            self.summary_frame.grid_forget()
+            self.table.show_message(
+                "❌ Событие не найдено в локальной БД.\nСинхронизируйтесь с сервером.",
+                color="red"
             )
-            no_entries_label.pack(pady=40)
+            self.status_label.configure(text="✗ Событие не найдено", text_color="red")
             return
         
-        # Summary frame
-        summary_frame = ctk.CTkFrame(
-            self.scrollable_frame,
-            corner_radius=10,
-            fg_color=("gray75", "gray25")
-        )
-        summary_frame.pack(fill="x", padx=5, pady=10)
-        
-        total_cash = sum(float(e.amount) for e in entries if e.method == PaymentMethod.CASH)
-        total_card = sum(float(e.amount) for e in entries if e.method == PaymentMethod.CARD)
-        total_transfer = sum(float(e.amount) for e in entries if e.method == PaymentMethod.TRANSFER)
-        total_all = total_cash + total_card + total_transfer
-        
-        summary_label = ctk.CTkLabel(
-            summary_frame,
-            text=f"💰 Итого: Наличные: {total_cash:.2f} ₽ | Карта: {total_card:.2f} ₽ | Перевод: {total_transfer:.2f} ₽ | Всего: {total_all:.2f} ₽",
-            font=ctk.CTkFont(size=14, weight="bold"),
-            wraplength=800
-        )
-        summary_label.pack(pady=10, padx=10)
-        
-        # Create table headers
-        headers_frame = ctk.CTkFrame(
-            self.scrollable_frame,
-            corner_radius=5,
-            fg_color=("gray75", "gray25")
+        totals, source = result
+        self.source = source
+        self._render_summary(totals)
+        self.table.empty_text = "📭 Нет оплат для этого события"
+        self.table.set_source(source)
+        self.status_label.configure(
+            text=f"✓ Загружено оплат: {source.count()}",
+            text_color="green"
         )
-        headers_frame.pack(fill="x", padx=5, pady=5)
-        headers_frame.grid_columnconfigure(1, weight=1)
-        headers_frame.grid_columnconfigure(2, weight=1)
-        
-        headers = ["Дата", "Сумма", "Метод", "Назначение", "Описание"]
-        for col, header in enumerate(headers):
-            header_label = ctk.CTkLabel(
-                headers_frame,
-                text=header,
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=120 if col == 0 else 150 if col < 3 else 200
-            )
-            header_label.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-            if col >= 1:
-                headers_frame.grid_columnconfigure(col, weight=1)
-        
-        # Create entries
-        for entry in entries:
-            self._create_accounting_row(entry)
     
-    def _create_accounting_row(self, entry: AccountingEntry):
-        """Create accounting entry row"""
-        row_frame = ctk.CTkFrame(
-            self.scrollable_frame,
-            corner_radius=3,
-            border_width=1,
-            border_color=("gray80", "gray20")
-        )
-        row_frame.pack(fill="x", padx=5, pady=2)
-        row_frame.grid_columnconfigure(1, weight=1)
-        row_frame.grid_columnconfigure(2, weight=1)
-        row_frame.grid_columnconfigure(4, weight=1)
-        
-        # Date
-        date_str = entry.created_at.strftime("%d.%m.%Y %H:%M") if entry.created_at else "-"
-        date_label = ctk.CTkLabel(
-            row_frame,
-            text=date_str,
-            width=120,
-            font=ctk.CTkFont(size=12)
-        )
-        date_label.grid(row=0, column=0, padx=5, pady=8, sticky="w")
-        
-        # Amount
-        amount_label = ctk.CTkLabel(
-            row_frame,
-            text=f"{float(entry.amount):.2f} ₽",
-            width=150,
-            font=ctk.CTkFont(size=12, weight="bold")
+    def _on_accounting_error(self, e: Exception):
+        logger.error(f"Error loading accounting: {e}")
+        self.summary_frame.grid_forget()
+        self.table.show_message(f"❌ Ошибка загрузки оплат: {e}", color="red")
+        self.status_label.configure(
+            text=f"✗ Ошибка: {str(e)[:50]}",
+            text_color="red"
         )
-        amount_label.grid(row=0, column=1, padx=5, pady=8, sticky="w")
+    
+    def _render_summary(self, totals: Dict[str, Any]):
+        """Render event totals"""
+        if not totals["entries"]:
+            self.summary_frame.grid_forget()
+            return
         
-        # Method
-        method_labels = {
-            PaymentMethod.CASH: "Наличные",
-            PaymentMethod.CARD: "Карта",
-            PaymentMethod.TRANSFER: "Перевод"
-        }
-        method_label = ctk.CTkLabel(
-            row_frame,
-            text=method_labels.get(entry.method, entry.method.value),
-            width=150,
-            font=ctk.CTkFont(size=12)
-        )
-        method_label.grid(row=0, column=2, padx=5, pady=8, sticky="w")
+        by_method = totals["by_method"]
+        by_paid_for = totals["by_paid_for"]
         
-        # Paid for
-        paid_for_labels = {
-            PaidFor.PERFORMANCE: "Рега",
-            PaidFor.DIPLOMAS_MEDALS: "ДМ"
-        }
-        paid_for_label = ctk.CTkLabel(
-            row_frame,
-            text=paid_for_labels.get(entry.paid_for, entry.paid_for.value),
-            width=200,
-            font=ctk.CTkFont(size=12)
+        self.summary_label.configure(
+            text=(
+                f"💰 Итого: Наличные: {format_rub(by_method[PaymentMethod.CASH])} | "
+                f"Карта: {format_rub(by_method[PaymentMethod.CARD])} | "
+                f"Перевод: {format_rub(by_method[PaymentMethod.TRANSFER])} | "
+                f"Всего: {format_rub(totals['total'])}"
+            )
         )
-        paid_for_label.grid(row=0, column=3, padx=5, pady=8, sticky="w")
-        
-        # Description
-        desc_text = (entry.description or "-")[:50] + "..." if entry.description and len(entry.description) > 50 else (entry.description or "-")
-        desc_label = ctk.CTkLabel(
-            row_frame,
-            text=desc_text,
-            width=200,
-            anchor="w",
-            font=ctk.CTkFont(size=12)
+        self.details_label.configure(
+            text=(
+                f"Рега: {format_rub(by_paid_for[PaidFor.PERFORMANCE])} | "
+                f"ДМ: {format_rub(by_paid_for[PaidFor.DIPLOMAS_MEDALS])} | "
+                f"Скидки: {format_rub(totals['discount'])} | "
+                f"Групповых оплат: {len(totals['by_group'])}"
+            )
         )
-        desc_label.grid(row=0, column=4, padx=5, pady=8, sticky="ew")
-
+        self.summary_frame.grid(row=2, column=0, sticky="ew", padx=15, pady=(10, 0))
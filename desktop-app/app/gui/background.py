@@ -0,0 +1,122 @@
+"""Background loading: jobs run on a worker pool, results are delivered on the Tk main thread"""
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.utils.logger import logger
+from app.utils.profiling import span
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for database jobs"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="loader")
+        return _executor
+
+
+def shutdown_executor():
+    """Stop the worker pool (pending jobs are dropped)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+class BackgroundLoader:
+    """Per-widget job runner
+
+    Jobs must not touch widgets; they open their own DB session and return plain data.
+    Jobs are keyed: submitting a new job under the same key supersedes the previous
+    one (cancelled if not started yet, its result dropped otherwise).
+    """
+
+    def __init__(self, widget, poll_ms: int = 30):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._results: "queue.Queue[Tuple[str, int, bool, Any]]" = queue.Queue()
+        self._current: Dict[str, Tuple[int, Future, Callable, Optional[Callable]]] = {}
+        self._generation = 0
+        self._polling = False
+
+    def submit(
+        self,
+        key: str,
+        job: Callable[[], Any],
+        on_done: Callable[[Any], None],
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> int:
+        """Run job() in the background, then on_done(result) on the main thread"""
+        self.cancel(key)
+        self._generation += 1
+        generation = self._generation
+
+        def run():
+            try:
+                with span(f"load.{type(self.widget).__name__}.{key}"):
+                    result = job()
+            except Exception as e:
+                self._results.put((key, generation, False, e))
+            else:
+                self._results.put((key, generation, True, result))
+
+        future = get_executor().submit(run)
+        self._current[key] = (generation, future, on_done, on_error)
+        self._schedule_poll()
+        return generation
+
+    def cancel(self, key: str):
+        """Forget the pending job under key"""
+        current = self._current.pop(key, None)
+        if current:
+            current[1].cancel()
+
+    def cancel_all(self):
+        for key in list(self._current):
+            self.cancel(key)
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._current
+
+    def _schedule_poll(self):
+        if self._polling:
+            return
+        try:
+            self.widget.after(self.poll_ms, self._poll)
+            self._polling = True
+        except Exception:
+            # Widget destroyed - nobody to deliver results to
+            self._current.clear()
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                key, generation, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            current = self._current.get(key)
+            if not current or current[0] != generation:
+                continue  # superseded or cancelled
+            del self._current[key]
+
+            _, _, on_done, on_error = current
+            try:
+                if ok:
+                    with span(f"apply.{type(self.widget).__name__}.{key}"):
+                        on_done(value)
+                elif on_error:
+                    on_error(value)
+                else:
+                    logger.error(f"Background job '{key}' failed: {value}")
+            except Exception as e:
+                logger.error(f"Error handling result of '{key}': {e}")
+
+        if self._current:
+            self._schedule_poll()
@@ -0,0 +1,65 @@
+"""Main-thread dispatch queue for UI updates posted from background threads"""
+import queue
+import threading
+from typing import Any, Callable, Dict, Tuple
+from app.utils.logger import logger
+
+
+class UIDispatcher:
+    """Runs callbacks posted from any thread on the Tk main thread
+
+    Tk widgets must only be touched from the main thread; background tasks post
+    callables here and the root window drains the queue with after().
+    """
+
+    def __init__(self, root, poll_ms: int = 50, max_per_tick: int = 100):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.max_per_tick = max_per_tick
+        self._queue: "queue.Queue[Tuple[Callable, tuple]]" = queue.Queue()
+        self._latest: Dict[str, Tuple[Callable, tuple]] = {}
+        self._latest_lock = threading.Lock()
+        self._closed = False
+        self.root.after(self.poll_ms, self._drain)
+
+    def post(self, callback: Callable, *args: Any):
+        """Queue callback(*args) for the main thread (thread-safe)"""
+        if not self._closed:
+            self._queue.put((callback, args))
+
+    def post_latest(self, key: str, callback: Callable, *args: Any):
+        """Like post(), but only the most recent call per key runs (for high-rate progress updates)"""
+        if self._closed:
+            return
+        with self._latest_lock:
+            pending = key in self._latest
+            self._latest[key] = (callback, args)
+        if not pending:
+            self._queue.put((self._run_latest, (key,)))
+
+    def close(self):
+        """Stop draining (pending callbacks are dropped)"""
+        self._closed = True
+
+    def _run_latest(self, key: str):
+        with self._latest_lock:
+            callback, args = self._latest.pop(key)
+        callback(*args)
+
+    def _drain(self):
+        if self._closed:
+            return
+        for _ in range(self.max_per_tick):
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"Error in UI callback {getattr(callback, '__name__', callback)}: {e}")
+        try:
+            self.root.after(self.poll_ms, self._drain)
+        except Exception:
+            # Root window destroyed
+            self._closed = True
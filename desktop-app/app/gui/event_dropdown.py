@@ -0,0 +1,41 @@
+"""Event combobox filled from the shared event catalogue"""
+from typing import List, Optional
+from app.services.event_catalog import get_event_catalog
+from app.utils.logger import logger
+
+
+class EventDropdownMixin:
+    """Fills self.event_dropdown / self.event_var from the catalogue in a self.loader job
+
+    Views set `synced_events_only` and call refresh_events() once their widgets
+    exist; after a catalogue invalidation the reload happens on a worker thread.
+    """
+
+    synced_events_only = False
+
+    def refresh_events(self):
+        """Refresh events dropdown from the shared catalogue (read in the background)"""
+        catalog = get_event_catalog()
+        event_id = self.event_id
+        synced_only = self.synced_events_only
+
+        def load():
+            # The catalogue loads on first access, otherwise this is in-memory
+            return catalog.dropdown_values(synced_only=synced_only), catalog.label_for(event_id)
+
+        self.loader.submit(
+            "events",
+            load,
+            lambda result: self._on_events_loaded(event_id, *result),
+            lambda e: logger.error(f"Error loading events: {e}")
+        )
+
+    def destroy(self):
+        get_event_catalog().unsubscribe(self.refresh_events)
+        super().destroy()
+
+    def _on_events_loaded(self, event_id: Optional[int], values: List[str], label: Optional[str]):
+        """Fill the events dropdown and select the current event (unless another one was picked meanwhile)"""
+        self.event_dropdown.configure(values=values)
+        if label and self.event_id == event_id:
+            self.event_var.set(label)
@@ -1,9 +1,12 @@
 """Events view component"""
 import customtkinter as ctk
 from typing import List, Dict, Any, Optional, Callable
-from app.database.session import get_db_session
-from app.database.models import Event, EventStatus
+from app.gui.background import BackgroundLoader
+from app.database.paging import ListDataSource
+from app.services.event_catalog import EventSummary, get_event_catalog
+from app.gui.virtual_table import VirtualTable, TableColumn
 from app.utils.logger import logger
+from app.utils.profiling import span
 
 
 class EventsView(ctk.CTkFrame):
@@ -13,9 +16,11 @@ class EventsView(ctk.CTkFrame):
         super().__init__(parent)
         
         self.on_event_select = on_event_select
-        self.events: List[Event] = []
         self.selected_event_id: Optional[int] = None
         
+        # Queries run on worker threads, results are rendered on the main thread
+        self.loader = BackgroundLoader(self)
+        
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
@@ -37,7 +42,7 @@ class EventsView(ctk.CTkFrame):
         refresh_btn = ctk.CTkButton(
             header_frame,
             text="🔄 Обновить",
-            command=self.refresh_events,
+            command=get_event_catalog().invalidate,
             width=150,
             height=35,
             font=ctk.CTkFont(size=14, weight="bold"),
@@ -47,19 +52,33 @@ class EventsView(ctk.CTkFrame):
         # Ensure button is clickable - use after to lift after rendering
         header_frame.after(100, lambda: refresh_btn.lift())
         
-        # Events scrollable frame - optimized for performance
-        self.events_scrollable = ctk.CTkScrollableFrame(
+        # Events table (rows are pooled, only the visible ones are bound)
+        status_labels = {
+            "DRAFT": "📝 Черновик",
+            "ACTIVE": "✅ Активно",
+            "ARCHIVED": "📦 Архив"
+        }
+        status_colors = {
+            "DRAFT": "gray",
+            "ACTIVE": "darkgreen",
+            "ARCHIVED": "darkorange"
+        }
+        self.events_table = VirtualTable(
             self,
-            scrollbar_button_color=("gray70", "gray30"),
-            scrollbar_button_hover_color=("gray60", "gray40")
+            columns=[
+                TableColumn("name", "Название", width=300, weight=1, bold=True),
+                TableColumn("dates", "Даты", width=220),
+                TableColumn(
+                    "status", "Статус", width=120,
+                    formatter=lambda v: status_labels.get(v, "Неизвестно"),
+                    badge_colors=status_colors
+                ),
+            ],
+            row_height=44,
+            on_row_click=self._on_row_click,
+            empty_text="📭 Нет событий.\nНажмите 'Синхронизировать' для загрузки данных с сервера."
         )
-        self.events_scrollable.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
-        
-        # Performance optimization: limit visible items
-        self.max_visible_items = 50
-        self.all_events = []
-        self.displayed_events = []
-        self.events_scrollable.grid_columnconfigure(0, weight=1)
+        self.events_table.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
         
         # Status label
         self.status_label = ctk.CTkLabel(
@@ -69,196 +88,55 @@ class EventsView(ctk.CTkFrame):
         )
         self.status_label.grid(row=2, column=0, pady=5)
         
-        # Load events
+        # Load events (and follow catalogue changes, e.g. after sync)
         self.refresh_events()
+        get_event_catalog().subscribe(self.refresh_events, self)
     
+    @span("ui.events.refresh_events")
     def refresh_events(self):
-        """Refresh events list"""
+        """Refresh events list (loaded in the background)"""
         self.status_label.configure(text="⏳ Загрузка событий...", text_color="gray")
-        self.update()
-        
-        try:
-            db = get_db_session()
-            try:
-                self.events = db.query(Event).order_by(Event.start_date.desc()).all()
-                self._render_events()
-                self.status_label.configure(
-                    text=f"✓ Загружено событий: {len(self.events)}",
-                    text_color="green"
-                )
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Error loading events: {e}")
-            # Clear and show error
-            for widget in self.events_scrollable.winfo_children():
-                widget.destroy()
-            error_label = ctk.CTkLabel(
-                self.events_scrollable,
-                text=f"❌ Ошибка загрузки событий: {e}",
-                text_color="red",
-                font=ctk.CTkFont(size=14)
-            )
-            error_label.pack(pady=20)
-            self.status_label.configure(
-                text=f"✗ Ошибка: {str(e)[:50]}",
-                text_color="red"
-            )
-    
-    def _render_events(self):
-        """Render events list with performance optimization"""
-        # Clear existing widgets
-        for widget in self.events_scrollable.winfo_children():
-            widget.destroy()
-        
-        if not self.events:
-            no_events_label = ctk.CTkLabel(
-                self.events_scrollable,
-                text="📭 Нет событий.\nНажмите 'Синхронизировать' для загрузки данных с сервера.",
-                font=ctk.CTkFont(size=16),
-                wraplength=600,
-                justify="center"
-            )
-            no_events_label.pack(pady=40)
-            return
-        
-        # Store all events
-        self.all_events = self.events.copy()
-        
-        # Limit initial display for performance
-        self.displayed_events = self.all_events[:self.max_visible_items]
-        
-        # Create event cards with better performance
-        for idx, event in enumerate(self.displayed_events):
-            self._create_event_card(event, idx)
         
-        # Add "Load more" button if there are more events
-        if len(self.all_events) > len(self.displayed_events):
-            load_more_btn = ctk.CTkButton(
-                self.events_scrollable,
-                text=f"📄 Показать ещё ({len(self.all_events) - len(self.displayed_events)} событий)",
-                command=self._load_more_events,
-                width=300,
-                height=40,
-                font=ctk.CTkFont(size=14),
-                corner_radius=8,
-                fg_color=("gray70", "gray30"),
-                hover_color=("gray60", "gray40")
-            )
-            load_more_btn.pack(pady=10)
-            self.events_scrollable.after(100, lambda: load_more_btn.lift())
-    
-    def _load_more_events(self):
-        """Load more events"""
-        current_count = len(self.displayed_events)
-        next_batch = self.all_events[current_count:current_count + self.max_visible_items]
+        def load():
+            # The catalogue loads on first access, otherwise this is in-memory
+            return [self._event_row(event) for event in get_event_catalog().events]
         
-        if next_batch:
-            for idx, event in enumerate(next_batch):
-                self._create_event_card(event, current_count + idx)
-            self.displayed_events.extend(next_batch)
-            
-            # Update or remove "Load more" button
-            for widget in self.events_scrollable.winfo_children():
-                if isinstance(widget, ctk.CTkButton) and "Показать ещё" in widget.cget("text"):
-                    widget.destroy()
-                    break
-            
-            # Add new "Load more" button if needed
-            if len(self.all_events) > len(self.displayed_events):
-                load_more_btn = ctk.CTkButton(
-                    self.events_scrollable,
-                    text=f"📄 Показать ещё ({len(self.all_events) - len(self.displayed_events)} событий)",
-                    command=self._load_more_events,
-                    width=300,
-                    height=40,
-                    font=ctk.CTkFont(size=14),
-                    corner_radius=8,
-                    fg_color=("gray70", "gray30"),
-                    hover_color=("gray60", "gray40")
-                )
-                load_more_btn.pack(pady=10)
-                self.events_scrollable.after(100, lambda: load_more_btn.lift())
+        self.loader.submit("events", load, self._on_events_loaded, self._on_events_error)
     
-    def _create_event_card(self, event: Event, index: int):
-        """Create event card"""
-        card = ctk.CTkFrame(
-            self.events_scrollable,
-            corner_radius=10,
-            border_width=1,
-            border_color=("gray70", "gray30")
+    def _on_events_loaded(self, rows: List[Dict[str, Any]]):
+        """Bind loaded events to the table"""
+        self.events_table.set_source(ListDataSource(rows))
+        self.status_label.configure(
+            text=f"✓ Загружено событий: {len(rows)}",
+            text_color="green"
         )
-        card.pack(fill="x", padx=5, pady=8)
-        card.grid_columnconfigure(0, weight=1)
-        
-        # Top row: name and status
-        top_row = ctk.CTkFrame(card, fg_color="transparent")
-        top_row.grid(row=0, column=0, sticky="ew", padx=15, pady=(15, 5))
-        top_row.grid_columnconfigure(0, weight=1)
-        
-        # Event name
-        name_label = ctk.CTkLabel(
-            top_row,
-            text=event.name,
-            font=ctk.CTkFont(size=18, weight="bold"),
-            anchor="w"
-        )
-        name_label.grid(row=0, column=0, sticky="ew", padx=0, pady=0)
-        
-        # Status badge
-        status_colors = {
-            "DRAFT": ("gray", "gray"),
-            "ACTIVE": ("green", "darkgreen"),
-            "ARCHIVED": ("orange", "darkorange")
-        }
-        status_labels = {
-            "DRAFT": "📝 Черновик",
-            "ACTIVE": "✅ Активно",
-            "ARCHIVED": "📦 Архив"
-        }
-        status_color = status_colors.get(event.status.value if event.status else "DRAFT", ("gray", "gray"))
-        status_label_text = status_labels.get(event.status.value if event.status else "DRAFT", "Неизвестно")
-        
-        status_badge = ctk.CTkLabel(
-            top_row,
-            text=status_label_text,
-            font=ctk.CTkFont(size=12, weight="bold"),
-            fg_color=status_color[1],
-            text_color="white",
-            corner_radius=15,
-            width=120,
-            height=30
+    
+    def _on_events_error(self, e: Exception):
+        logger.error(f"Error loading events: {e}")
+        self.events_table.show_message(f"❌ Ошибка загрузки событий: {e}", color="red")
+        self.status_label.configure(
+            text=f"✗ Ошибка: {str(e)[:50]}",
+            text_color="red"
         )
-        status_badge.grid(row=0, column=1, padx=(10, 0), pady=0, sticky="e")
-        
-        # Event dates
+    
+    def _event_row(self, event: EventSummary) -> Dict[str, Any]:
+        """Table row for an event"""
         start_date = event.start_date.strftime("%d.%m.%Y") if event.start_date else "N/A"
         end_date = event.end_date.strftime("%d.%m.%Y") if event.end_date else "N/A"
-        dates_label = ctk.CTkLabel(
-            card,
-            text=f"📆 С {start_date} по {end_date}",
-            font=ctk.CTkFont(size=14),
-            anchor="w",
-            text_color=("gray60", "gray40")
-        )
-        dates_label.grid(row=1, column=0, sticky="ew", padx=15, pady=5)
-        
-        # Select button - place directly in card, ensure it's in separate row
-        select_btn = ctk.CTkButton(
-            card,
-            text="👉 Выбрать",
-            command=lambda e=event: self._select_event(e),
-            width=150,
-            height=40,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            corner_radius=8
-        )
-        select_btn.grid(row=2, column=0, columnspan=2, padx=15, pady=(10, 15), sticky="e")
-        # Ensure button is clickable - use after to lift after rendering
-        card.after(100, lambda: select_btn.lift())
+        return {
+            "id": event.id,
+            "server_id": event.server_id,
+            "name": event.name,
+            "dates": f"📆 С {start_date} по {end_date}",
+            "status": event.status,
+        }
+    
+    def _on_row_click(self, row: Dict[str, Any]):
+        """Select the clicked event"""
+        self._select_event(row)
     
-    def _select_event(self, event: Event):
+    def _select_event(self, event: Dict[str, Any]):
         """Select event"""
-        self.selected_event_id = event.server_id or event.id
+        self.selected_event_id = event["server_id"] or event["id"]
         if self.on_event_select:
             self.on_event_select(self.selected_event_id)
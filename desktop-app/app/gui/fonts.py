@@ -0,0 +1,15 @@
+"""Shared CTkFont instances"""
+from typing import Dict, Tuple
+import customtkinter as ctk
+
+_fonts: Dict[Tuple[int, str], ctk.CTkFont] = {}
+
+
+def get_font(size: int = 12, weight: str = "normal") -> ctk.CTkFont:
+    """Return a cached font (fonts are created once per size/weight, after the root window exists)"""
+    key = (size, weight)
+    font = _fonts.get(key)
+    if font is None:
+        font = ctk.CTkFont(size=size, weight=weight)
+        _fonts[key] = font
+    return font
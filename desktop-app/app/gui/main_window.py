@@ -1,11 +1,20 @@
 """Main application window"""
+import threading
+import time
 import customtkinter as ctk
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 from app.services.auth_service import AuthService
 from app.api.client import AuthenticationError, APIError
 from app.utils.logger import logger
-from app.gui.events_view import EventsView
-from app.gui.registrations_view import RegistrationsView
+from app.gui.dispatch import UIDispatcher
+from app.gui.watchdog import MainLoopWatchdog
+from app.gui.memory_monitor import MemoryMonitor
+from app.services.event_catalog import get_event_catalog
+from app.utils.config import settings, get_log_dir
+from app.utils.startup import get_startup_profiler, init_database
+
+if TYPE_CHECKING:
+    from app.api.sync import ChangeSet
 
 
 class MainWindow(ctk.CTk):
@@ -16,6 +25,29 @@ class MainWindow(ctk.CTk):
         
         self.auth_service = auth_service
         
+        # UI updates from background threads go through the dispatcher
+        self.dispatcher = UIDispatcher(self)
+        self._sync_cancel: Optional[threading.Event] = None
+        
+        # Opt-in main loop instrumentation (UI_WATCHDOG=true or --watchdog)
+        self.watchdog: Optional[MainLoopWatchdog] = None
+        if settings.ui_watchdog:
+            self.watchdog = MainLoopWatchdog(
+                self, stall_threshold=settings.ui_stall_threshold_ms / 1000
+            )
+            self.watchdog.start()
+        
+        # Opt-in memory diagnostics for long sessions (MEMORY_MONITOR=true or --memory)
+        self.memory_monitor: Optional[MemoryMonitor] = None
+        if settings.memory_monitor:
+            self.memory_monitor = MemoryMonitor(
+                self,
+                interval=settings.memory_interval_s,
+                report_path=get_log_dir() / "memory_report.txt",
+                samples_path=get_log_dir() / "memory_samples.jsonl",
+            )
+            self.memory_monitor.start()
+        
         # Configure window
         self.title("FTR Registration")
         self.geometry("1200x800")
@@ -27,15 +59,53 @@ class MainWindow(ctk.CTk):
         # Create UI
         self._create_ui()
         
-        # Try to load saved authentication
-        if self.auth_service.load_saved_auth():
-            # Validate token
-            if self.auth_service.is_token_valid():
+        # Open straight from the saved session and local DB; the token is
+        # validated (and the first sync started) in the background
+        self._session_generation = 0
+        with get_startup_profiler().phase("auth load"):
+            saved = self.auth_service.load_saved_auth()
+        if saved:
+            with get_startup_profiler().phase("main content"):
                 self._show_main_content()
-                return
+            self._start_session_check(validate_token=True)
+            return
         
-        # Show login if no saved auth or token invalid
+        # Show login if there is no saved session; the database is set up
+        # after the login screen is painted, while the user types
         self._show_login()
+        self.after(100, self._prepare_database)
+    
+    def _prepare_database(self):
+        """Import and initialize the database layer ahead of the first view"""
+        try:
+            init_database()
+        except Exception as e:
+            # Retried (and reported) when the main content needs it
+            logger.error(f"Error initializing database: {e}")
+    
+    def stop_watchdog(self):
+        """Stop the main loop watchdog and log (and save) its report"""
+        if self.watchdog is None:
+            return
+        self.watchdog.stop()
+        report = self.watchdog.report()
+        logger.info(report)
+        try:
+            path = get_log_dir() / "ui_watchdog.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(report + "\n", encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not save UI watchdog report: {e}")
+        self.watchdog = None
+    
+    def stop_memory_monitor(self):
+        """Stop memory sampling and log (and save) the leak report"""
+        if self.memory_monitor is None:
+            return
+        self.memory_monitor.stop()
+        logger.info(self.memory_monitor.report())
+        self.memory_monitor.write_report()
+        self.memory_monitor = None
     
     def _create_ui(self):
         """Create UI components"""
@@ -49,8 +119,13 @@ class MainWindow(ctk.CTk):
         # Main content frame (initially hidden)
         self.content_frame = None
     
-    def _show_login(self):
+    def _show_login(self, message: str = ""):
         """Show login screen"""
+        self._session_generation += 1
+        if self._sync_cancel is not None:
+            # The running sync belongs to the old session: stop it, its result is dropped
+            self._sync_cancel.set()
+            self._sync_cancel = None
         if self.content_frame:
             self.content_frame.destroy()
         
@@ -151,6 +226,8 @@ class MainWindow(ctk.CTk):
             wraplength=350
         )
         self.status_label.pack(pady=10, padx=30)
+        if message:
+            self.status_label.configure(text=message, text_color="orange")
         
         # Offline mode button
         offline_button = ctk.CTkButton(
@@ -173,6 +250,9 @@ class MainWindow(ctk.CTk):
     
     def _show_main_content(self):
         """Show main application content"""
+        started = time.perf_counter()
+        init_database()
+        self._session_generation += 1
         if self.login_frame:
             self.login_frame.destroy()
         
@@ -224,6 +304,19 @@ class MainWindow(ctk.CTk):
         # Ensure button is clickable - use after to lift after rendering
         top_bar.after(100, lambda: self.sync_button.lift())
         
+        # Cancel button - shown in place of the sync button while syncing
+        self.cancel_sync_button = ctk.CTkButton(
+            top_bar,
+            text="⏹ Отменить",
+            command=self._cancel_sync,
+            width=180,
+            height=35,
+            fg_color=("gray65", "gray45"),
+            hover_color=("gray55", "gray35"),
+            font=ctk.CTkFont(size=13, weight="bold"),
+            corner_radius=8
+        )
+        
         # Sync status label
         self.sync_status_label = ctk.CTkLabel(
             top_bar,
@@ -251,15 +344,13 @@ class MainWindow(ctk.CTk):
         # Update grid column weights
         top_bar.grid_columnconfigure(1, weight=1)
         
-        # Auto-sync on startup
-        self.after(1000, self._auto_sync_on_startup)
-        
         # Tab view for different sections
         self.tabview = ctk.CTkTabview(
             self.content_frame,
             corner_radius=10,
             border_width=2,
-            border_color=("gray70", "gray30")
+            border_color=("gray70", "gray30"),
+            command=self._on_tab_changed
         )
         self.tabview.pack(fill="both", expand=True, padx=10, pady=10)
         
@@ -272,17 +363,52 @@ class MainWindow(ctk.CTk):
         self.tabview.add("💰 Оплаты")
         self.tabview.add("📊 Статистика")
         
-        # Setup tabs
-        self._setup_events_tab()
-        self._setup_registrations_tab()
-        self._setup_accounting_tab()
-        self._setup_statistics_tab()
+        # Views are built the first time their tab is shown, then kept
+        self._tab_builders: Dict[str, Tuple[str, Callable[[], None]]] = {
+            "📅 События": ("events_view", self._setup_events_tab),
+            "📋 Регистрации": ("registrations_view", self._setup_registrations_tab),
+            "💰 Оплаты": ("accounting_view", self._setup_accounting_tab),
+            "📊 Статистика": ("statistics_view", self._setup_statistics_tab),
+        }
+        for attr, _ in self._tab_builders.values():
+            # Views of a previous session (before logout) are gone with content_frame
+            if hasattr(self, attr):
+                delattr(self, attr)
+        
+        self._ensure_tab(self.tabview.get())
+        self.after_idle(lambda: logger.info(
+            f"Main content first paint: {(time.perf_counter() - started) * 1000:.0f} ms"
+        ))
+    
+    def _ensure_tab(self, name: str):
+        """Build the view of a tab if it has not been built yet"""
+        attr, setup = self._tab_builders[name]
+        if hasattr(self, attr):
+            return
+        
+        started = time.perf_counter()
+        setup()
+        built = time.perf_counter()
+        self.after_idle(lambda: logger.info(
+            f"Tab {name} built in {(built - started) * 1000:.0f} ms, "
+            f"first paint {(time.perf_counter() - started) * 1000:.0f} ms"
+        ))
+    
+    def _on_tab_changed(self):
+        """Build the selected tab on first use"""
+        self._ensure_tab(self.tabview.get())
+    
+    def _show_tab(self, name: str):
+        """Switch to a tab, building it if needed"""
+        self._ensure_tab(name)
+        self.tabview.set(name)
     
     def _setup_events_tab(self):
         """Setup events tab"""
         events_frame = self.tabview.tab("📅 События")
         
         # Create events view
+        from app.gui.events_view import EventsView
         self.events_view = EventsView(events_frame, on_event_select=self._on_event_selected)
         self.events_view.pack(fill="both", expand=True, padx=10, pady=10)
     
@@ -291,6 +417,7 @@ class MainWindow(ctk.CTk):
         reg_frame = self.tabview.tab("📋 Регистрации")
         
         # Create registrations view
+        from app.gui.registrations_view import RegistrationsView
         self.registrations_view = RegistrationsView(reg_frame)
         self.registrations_view.pack(fill="both", expand=True, padx=10, pady=10)
     
@@ -298,111 +425,229 @@ class MainWindow(ctk.CTk):
         """Handle event selection"""
         logger.info(f"Event selected: {event_id}")
         # Switch to registrations tab and filter by event
-        self.tabview.set("📋 Регистрации")
+        self._show_tab("📋 Регистрации")
         # Refresh registrations view with selected event
-        if hasattr(self, 'registrations_view'):
-            self.registrations_view.event_id = event_id
-            self.registrations_view.refresh_registrations()
+        self.registrations_view.event_id = event_id
+        self.registrations_view.refresh_registrations()
     
     def _handle_sync(self):
         """Handle manual sync"""
-        self.sync_button.configure(state="disabled", text="Синхронизация...")
+        if self._sync_cancel is not None:
+            return  # already running
+        
+        self._sync_cancel = threading.Event()
+        self.sync_button.grid_remove()
+        self.cancel_sync_button.configure(state="normal", text="⏹ Отменить")
+        self.cancel_sync_button.grid(row=0, column=2, sticky="", padx=10, pady=10)
         self.sync_status_label.configure(text="Синхронизация с сервером...", text_color="blue")
         
+        cancel_event = self._sync_cancel
+        generation = self._session_generation
+        
         def do_sync():
+            # Runs on a worker thread: widgets are only touched through the dispatcher
             try:
                 from app.database.session import get_db_session
                 from app.api.sync import SyncService
                 
                 db = get_db_session()
                 try:
-                    sync_service = SyncService(self.auth_service.api, db)
+                    sync_service = SyncService(
+                        self.auth_service.api,
+                        db,
+                        progress_callback=lambda progress: self.dispatcher.post_latest(
+                            "sync_progress", self._show_sync_progress, generation, progress
+                        ),
+                        cancel_event=cancel_event,
+                    )
                     result = sync_service.sync_all()
-                    
-                    if result.get("success"):
-                        synced = result.get("synced", {})
-                        events_count = synced.get("events", 0)
-                        regs_count = synced.get("registrations", 0)
-                        
-                        status_text = f"✓ Синхронизировано: событий {events_count}, регистраций {regs_count}"
-                        self.sync_status_label.configure(
-                            text=status_text,
-                            text_color="green"
-                        )
-                        
-                        # Refresh views
-                        self.after(100, lambda: self._refresh_all_views())
-                    else:
-                        errors = result.get("errors", [])
-                        error_msg = errors[0] if errors else "Неизвестная ошибка"
-                        self.sync_status_label.configure(
-                            text=f"⚠ Ошибка: {error_msg[:60]}",
-                            text_color="orange"
-                        )
                 finally:
                     db.close()
+                self.dispatcher.post(self._on_sync_finished, generation, result)
             except Exception as e:
                 logger.error(f"Sync error: {e}", exc_info=True)
-                error_msg = str(e)
-                if "Cannot connect" in error_msg or "resolve" in error_msg.lower():
-                    self.sync_status_label.configure(
-                        text="✗ Сервер недоступен. Проверьте подключение.",
-                        text_color="red"
-                    )
-                else:
-                    self.sync_status_label.configure(
-                        text=f"✗ Ошибка: {error_msg[:50]}",
-                        text_color="red"
-                    )
-            finally:
-                self.sync_button.configure(state="normal", text="Синхронизировать")
-                # Clear status after 10 seconds
-                self.after(10000, lambda: self.sync_status_label.configure(text=""))
+                self.dispatcher.post(self._on_sync_failed, generation, e)
         
         # Run sync in a thread to avoid blocking UI
-        import threading
         thread = threading.Thread(target=do_sync, daemon=True)
         thread.start()
     
-    def _refresh_all_views(self):
-        """Refresh all views"""
-        if hasattr(self, 'events_view'):
-            self.events_view.refresh_events()
-        if hasattr(self, 'registrations_view'):
-            self.registrations_view._load_events()
-            self.registrations_view.refresh_registrations()
-        if hasattr(self, 'accounting_view'):
-            self.accounting_view.refresh_events()
-            if self.accounting_view.event_id:
-                self.accounting_view.refresh_accounting()
-        if hasattr(self, 'statistics_view'):
-            self.statistics_view.refresh_events()
-            if self.statistics_view.event_id:
-                self.statistics_view.refresh_statistics()
+    def _cancel_sync(self):
+        """Ask the running sync to stop at the next page boundary"""
+        if self._sync_cancel is not None:
+            self._sync_cancel.set()
+            self.cancel_sync_button.configure(state="disabled", text="Отмена...")
     
-    def _auto_sync_on_startup(self):
-        """Auto-sync on startup if enabled"""
-        from app.utils.config import settings
-        from app.database.session import get_db_session
-        from app.database.models import Event
-        
-        # Check if we have any data
-        db = get_db_session()
-        try:
-            events_count = db.query(Event).count()
-            if events_count == 0 and settings.auto_sync and self.auth_service.is_authenticated():
-                # No data, try to sync
-                logger.info("No local data found, starting auto-sync...")
-                self._handle_sync()
-            elif events_count > 0:
-                # We have data, refresh views
-                logger.info(f"Found {events_count} events in local DB")
-                if hasattr(self, 'events_view'):
-                    self.events_view.refresh_events()
-        except Exception as e:
-            logger.error(f"Error checking local data: {e}")
-        finally:
-            db.close()
+    def _show_sync_progress(self, generation: int, progress):
+        """Show live sync progress in the status bar"""
+        if self._sync_cancel is None or generation != self._session_generation:
+            return  # late update after the sync finished or the session ended
+        
+        phases = {
+            "reference": "справочники",
+            "events": "события",
+            "prices": "цены",
+            "registrations": "регистрации",
+            "accounting": "оплаты",
+            "push": "отправка изменений",
+        }
+        parts = [f"⏳ {phases.get(progress.phase, progress.phase).capitalize()}"]
+        if progress.event_name and progress.event_count:
+            parts.append(f"{progress.event_index}/{progress.event_count} {progress.event_name[:30]}")
+        if progress.total_pages:
+            parts.append(f"стр. {progress.page}/{progress.total_pages}")
+        if progress.rows:
+            parts.append(f"{progress.rows_per_sec:.0f} зап/с")
+        if progress.eta_seconds is not None:
+            parts.append(f"осталось ~{int(progress.eta_seconds)} с")
+        self.sync_status_label.configure(text=" · ".join(parts), text_color="blue")
+    
+    def _finish_sync_ui(self):
+        """Restore sync controls"""
+        self._sync_cancel = None
+        self.cancel_sync_button.grid_remove()
+        self.sync_button.configure(state="normal", text="🔄 Синхронизировать")
+        self.sync_button.grid()
+        
+        # Clear status after 10 seconds (unless the session is gone by then)
+        label = self.sync_status_label
+        
+        def clear_status():
+            if label.winfo_exists():
+                label.configure(text="")
+        
+        self.after(10000, clear_status)
+    
+    def _on_sync_finished(self, generation: int, result: Dict[str, Any]):
+        """Show sync result and refresh views"""
+        if generation != self._session_generation:
+            return  # the user logged out meanwhile: the views are gone
+        self._finish_sync_ui()
+        
+        if result.get("auth_failed"):
+            self._handle_auth_failure()
+            return
+        
+        synced = result.get("synced", {})
+        events_count = synced.get("events", 0)
+        regs_count = synced.get("registrations", 0)
+        
+        if result.get("cancelled"):
+            self.sync_status_label.configure(
+                text=f"⏹ Синхронизация отменена (регистраций: {regs_count})",
+                text_color="orange"
+            )
+            self._apply_sync_changes(result["changes"])
+        elif result.get("success"):
+            self.sync_status_label.configure(
+                text=f"✓ Синхронизировано: событий {events_count}, регистраций {regs_count}",
+                text_color="green"
+            )
+            self._apply_sync_changes(result["changes"])
+        else:
+            errors = result.get("errors", [])
+            error_msg = errors[0] if errors else "Неизвестная ошибка"
+            self.sync_status_label.configure(
+                text=f"⚠ Ошибка: {error_msg[:60]}",
+                text_color="orange"
+            )
+    
+    def _on_sync_failed(self, generation: int, error: Exception):
+        """Show sync error"""
+        if generation != self._session_generation:
+            return  # the user logged out meanwhile: the views are gone
+        self._finish_sync_ui()
+        
+        if isinstance(error, AuthenticationError):
+            self._handle_auth_failure()
+            return
+        
+        error_msg = str(error)
+        if "Cannot connect" in error_msg or "resolve" in error_msg.lower():
+            self.sync_status_label.configure(
+                text="✗ Сервер недоступен. Проверьте подключение.",
+                text_color="red"
+            )
+        else:
+            self.sync_status_label.configure(
+                text=f"✗ Ошибка: {error_msg[:50]}",
+                text_color="red"
+            )
+    
+    def _handle_auth_failure(self):
+        """Token expired since startup: the saved session is useless now"""
+        self.auth_service.logout()
+        self._show_login("Сессия истекла. Войдите снова.")
+    
+    def _apply_sync_changes(self, changes: "ChangeSet"):
+        """Update views in place from a sync change set (untouched views are left alone)"""
+        if changes.is_empty():
+            return
+        
+        # Event lists and dropdowns follow the shared catalogue
+        if changes.has_changes("events"):
+            get_event_catalog().invalidate()
+        
+        # Accounting entries are not downloaded yet, so the accounting view has nothing to apply
+        for attr in ('registrations_view', 'statistics_view'):
+            if hasattr(self, attr):
+                getattr(self, attr).apply_changes(changes)
+    
+    def _start_session_check(self, validate_token: bool):
+        """Validate the token and look at local data off the main thread, then sync if needed"""
+        generation = self._session_generation
+        if validate_token:
+            self.sync_status_label.configure(text="Проверка авторизации...", text_color="gray")
+        
+        def check():
+            status: Optional[bool] = True
+            if validate_token:
+                status = self.auth_service.check_token()
+            try:
+                # Also warms the event catalogue for the views
+                events_count = len(get_event_catalog().events)
+            except Exception as e:
+                logger.error(f"Error checking local data: {e}")
+                events_count = 0
+            self.dispatcher.post(self._on_session_checked, generation, validate_token, status, events_count)
+        
+        threading.Thread(target=check, daemon=True).start()
+    
+    def _on_session_checked(
+        self, generation: int, revalidated: bool, status: Optional[bool], events_count: int
+    ):
+        """Apply the background session check: start sync, go offline or ask to log in"""
+        if generation != self._session_generation:
+            return  # the user logged in/out meanwhile
+        
+        if status is False:
+            logger.info("Saved session is no longer valid, showing login")
+            self._show_login("Сессия истекла. Войдите снова.")
+            return
+        
+        if status is None:
+            # Server unreachable: keep working from the local DB and retry later
+            logger.info(f"Server unavailable, working offline ({events_count} events in local DB)")
+            self.sync_status_label.configure(
+                text="📴 Оффлайн режим: сервер недоступен", text_color="orange"
+            )
+            if settings.sync_interval > 0:
+                def retry():
+                    if generation == self._session_generation:
+                        self._start_session_check(validate_token=True)
+                self.after(settings.sync_interval * 1000, retry)
+            return
+        
+        if self.sync_status_label.cget("text") == "Проверка авторизации...":
+            self.sync_status_label.configure(text="")
+        logger.info(f"Found {events_count} events in local DB")
+        # A restored session shows the local snapshot, so refresh it; after a
+        # fresh login only an empty database needs the initial sync
+        if settings.auto_sync and self.auth_service.is_authenticated() and (
+            revalidated or events_count == 0
+        ):
+            logger.info("Starting background sync...")
+            self._handle_sync()
     
     def _setup_accounting_tab(self):
         """Setup accounting tab"""
@@ -438,6 +683,7 @@ class MainWindow(ctk.CTk):
             result = self.auth_service.login(email, password)
             if result.get("success"):
                 self._show_main_content()
+                self._start_session_check(validate_token=False)
             else:
                 self.status_label.configure(text="Ошибка входа", text_color="red")
         except APIError as e:
@@ -497,12 +743,9 @@ class MainWindow(ctk.CTk):
     def _handle_offline_mode(self):
         """Handle offline mode - work without authentication"""
         # Check if we have any data in local DB
-        from app.database.session import get_db_session
-        from app.database.models import Event
-        
-        db = get_db_session()
         try:
-            events_count = db.query(Event).count()
+            init_database()
+            events_count = len(get_event_catalog().events)
             if events_count > 0:
                 # We have data, allow offline mode
                 self.auth_service.enable_offline_mode()
@@ -518,6 +761,3 @@ class MainWindow(ctk.CTk):
                 text="⚠️ Ошибка проверки оффлайн режима",
                 text_color="red"
             )
-        finally:
-            db.close()
-
@@ -0,0 +1,331 @@
+"""Memory diagnostics for long sessions (opt-in instrumentation)
+
+Every few minutes records process RSS, tracemalloc totals, live widgets and
+Tcl commands, open DB sessions with their identity-map sizes and live ORM
+objects. The first sample after warm-up is kept as the baseline; the report
+compares the latest tracemalloc snapshot with it by allocation site, so
+steady growth points at the line that allocates it.
+"""
+import gc
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+from app.utils.logger import logger
+
+APP_DIR = str(Path(__file__).resolve().parent.parent)
+
+
+class MemorySample(NamedTuple):
+    """One measurement"""
+    elapsed: float                  # seconds since start
+    rss: Optional[int]              # bytes, None if unknown on this platform
+    traced: int                     # bytes held by allocations tracemalloc sees
+    traced_peak: int
+    widgets: int                    # Python widget objects in the Tk tree
+    tcl_commands: int               # Tcl commands (callbacks, bindings, widgets)
+    sessions: int                   # live SQLAlchemy sessions
+    identity_objects: int           # objects in all their identity maps
+    orm_objects: int                # live instances of mapped classes
+    widget_classes: Dict[str, int]
+    orm_classes: Dict[str, int]
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if os.name == "nt":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except Exception:
+            return None
+        return None
+    # macOS: no current RSS in the standard library, ru_maxrss (peak, bytes) is the closest
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return None
+
+
+def count_widgets(root) -> Counter:
+    """Python widget objects in the Tk tree by class (walks tkinter's children dicts)"""
+    counts: Counter = Counter()
+    stack = [root]
+    while stack:
+        widget = stack.pop()
+        counts[type(widget).__name__] += 1
+        stack.extend(getattr(widget, "children", {}).values())
+    return counts
+
+
+def _megabytes(value: Optional[int]) -> str:
+    return "?" if value is None else f"{value / 1024 / 1024:.1f}"
+
+
+class MemoryMonitor:
+    """Periodic memory samples with a leak report by allocation site"""
+
+    def __init__(
+        self,
+        root,
+        interval: float = 300.0,
+        warmup_samples: int = 2,
+        trace_frames: int = 10,
+        report_path: Optional[Path] = None,
+        samples_path: Optional[Path] = None,
+    ):
+        self.root = root
+        self.interval = interval
+        self.warmup_samples = warmup_samples
+        self.trace_frames = trace_frames
+        self.report_path = report_path
+        self.samples_path = samples_path
+
+        self.samples: List[MemorySample] = []
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.latest: Optional[tracemalloc.Snapshot] = None
+        self._started = time.monotonic()
+        self._running = False
+        self._busy = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        self._running = True
+        self._started = time.monotonic()
+        self.root.after(int(self.interval * 1000), self._tick)
+        logger.info(f"Memory monitor started (sample every {self.interval:.0f} s, {self.trace_frames} frames traced)")
+
+    def stop(self):
+        """Stop sampling (tracemalloc keeps running until the final report is written)"""
+        self._running = False
+
+    def _tick(self):
+        """Main thread: read the widget tree, then sample the rest on a worker thread"""
+        if not self._running:
+            return
+        try:
+            if not self._busy:
+                widgets = count_widgets(self.root)
+                try:
+                    tcl_commands = len(self.root.tk.splitlist(self.root.tk.call("info", "commands")))
+                except Exception:
+                    tcl_commands = 0
+                self._busy = True
+                threading.Thread(
+                    target=self._collect, args=(widgets, tcl_commands), name="memory-monitor", daemon=True
+                ).start()
+            self.root.after(int(self.interval * 1000), self._tick)
+        except Exception:
+            # Window destroyed
+            self._running = False
+
+    def _collect(self, widgets: Counter, tcl_commands: int):
+        try:
+            self.sample(widgets, tcl_commands)
+            self.write_report()
+        except Exception as e:
+            logger.warning(f"Memory sample failed: {e}")
+        finally:
+            self._busy = False
+
+    def sample(self, widgets: Optional[Counter] = None, tcl_commands: int = 0) -> MemorySample:
+        """Take one measurement (widget counts must come from the main thread)"""
+        from app.database.models import Base
+        from app.database.session import live_sessions
+
+        sessions = live_sessions()
+        identity_objects = 0
+        for session in sessions:
+            try:
+                identity_objects += len(session.identity_map)
+            except Exception:
+                pass  # being used concurrently; counted next time
+        del sessions
+
+        mapped = {mapper.class_ for mapper in Base.registry.mappers}
+        orm_classes: Counter = Counter()
+        for obj in gc.get_objects():
+            if type(obj) in mapped:
+                orm_classes[type(obj).__name__] += 1
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        widgets = widgets or Counter()
+
+        sample = MemorySample(
+            elapsed=time.monotonic() - self._started,
+            rss=current_rss(),
+            traced=traced,
+            traced_peak=traced_peak,
+            widgets=sum(widgets.values()),
+            tcl_commands=tcl_commands,
+            sessions=len(live_sessions()),
+            identity_objects=identity_objects,
+            orm_objects=sum(orm_classes.values()),
+            widget_classes=dict(widgets.most_common(10)),
+            orm_classes=dict(orm_classes),
+        )
+        with self._lock:
+            self.samples.append(sample)
+            if len(self.samples) == self.warmup_samples:
+                self.baseline = snapshot
+            self.latest = snapshot
+        self._append_sample(sample)
+        logger.info(
+            f"Memory: RSS {_megabytes(sample.rss)} MB, traced {_megabytes(sample.traced)} MB, "
+            f"{sample.widgets} widgets, {sample.tcl_commands} Tcl commands, {sample.sessions} sessions, "
+            f"{sample.identity_objects} in identity maps, {sample.orm_objects} ORM objects"
+        )
+        return sample
+
+    def _append_sample(self, sample: MemorySample):
+        if self.samples_path is None:
+            return
+        try:
+            self.samples_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.samples_path, "a", encoding="utf-8") as f:
+                record: Dict[str, Any] = {"time": datetime.now().isoformat(timespec="seconds")}
+                record.update(sample._asdict())
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write memory sample: {e}")
+
+    @staticmethod
+    def _per_hour(first: MemorySample, last: MemorySample, field: str) -> Optional[float]:
+        start, end = getattr(first, field), getattr(last, field)
+        hours = (last.elapsed - first.elapsed) / 3600
+        if start is None or end is None or hours <= 0:
+            return None
+        return (end - start) / hours
+
+    def report(self, top: int = 20) -> str:
+        """Series summary, growth rates since the baseline and top growing allocation sites"""
+        with self._lock:
+            samples = list(self.samples)
+            baseline, latest = self.baseline, self.latest
+
+        lines = [f"Memory report ({len(samples)} samples, every {self.interval:.0f} s)"]
+        if not samples:
+            return "\n".join(lines + ["  no samples yet"])
+
+        lines.append(
+            f"  {'elapsed':>9} {'RSS MB':>8} {'traced MB':>10} {'widgets':>8} {'tcl cmds':>9} "
+            f"{'sessions':>9} {'id map':>7} {'ORM':>7}"
+        )
+        shown = samples[::max(1, len(samples) // 30)]
+        if shown[-1] is not samples[-1]:
+            shown.append(samples[-1])
+        for sample in shown:
+            lines.append(
+                f"  {sample.elapsed / 3600:8.2f}h {_megabytes(sample.rss):>8} {_megabytes(sample.traced):>10} "
+                f"{sample.widgets:8d} {sample.tcl_commands:9d} {sample.sessions:9d} "
+                f"{sample.identity_objects:7d} {sample.orm_objects:7d}"
+            )
+
+        first = samples[min(self.warmup_samples, len(samples)) - 1]
+        last = samples[-1]
+        if last is not first:
+            lines.append(f"  growth since baseline ({first.elapsed / 3600:.2f}h -> {last.elapsed / 3600:.2f}h), per hour:")
+            for field, scale, unit in (
+                ("rss", 1024 * 1024, "MB"),
+                ("traced", 1024 * 1024, "MB"),
+                ("widgets", 1, ""),
+                ("tcl_commands", 1, ""),
+                ("identity_objects", 1, ""),
+                ("orm_objects", 1, ""),
+            ):
+                rate = self._per_hour(first, last, field)
+                if rate is not None:
+                    lines.append(f"    {field:<18} {rate / scale:+10.2f} {unit}")
+            grown = {
+                name: count - first.orm_classes.get(name, 0)
+                for name, count in last.orm_classes.items()
+                if count > first.orm_classes.get(name, 0)
+            }
+            if grown:
+                lines.append("  ORM objects grown: " + ", ".join(f"{name} +{count}" for name, count in grown.items()))
+
+        if baseline is not None and latest is not None and latest is not baseline:
+            lines.append(f"  top {top} allocation sites by growth since baseline:")
+            for stat in latest.compare_to(baseline, "lineno")[:top]:
+                if stat.size_diff <= 0:
+                    break
+                frame = stat.traceback[0]
+                lines.append(
+                    f"    {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+                    f"{frame.filename}:{frame.lineno}"
+                )
+            by_traceback = latest.compare_to(baseline, "traceback")
+            app_sites: Counter = Counter()
+            for stat in by_traceback:
+                if stat.size_diff <= 0:
+                    continue
+                site = "<outside app code within traced frames>"
+                for frame in reversed(stat.traceback):
+                    if frame.filename.startswith(APP_DIR):
+                        site = f"{Path(frame.filename).relative_to(APP_DIR)}:{frame.lineno}"
+                        break
+                app_sites[site] += stat.size_diff
+            lines.append("  growth by innermost app code line:")
+            for site, size in app_sites.most_common(10):
+                lines.append(f"    {size / 1024:+10.1f} KiB  {site}")
+            lines.append("  largest growth with call stacks:")
+            for stat in by_traceback[:3]:
+                if stat.size_diff <= 0:
+                    break
+                lines.append(f"    {stat.size_diff / 1024:+.1f} KiB in {stat.count_diff:+d} blocks")
+                for line in stat.traceback.format(limit=self.trace_frames):
+                    lines.append(f"      {line}")
+        return "\n".join(lines)
+
+    def write_report(self):
+        """Rewrite the report file (kept current so a killed process still leaves one)"""
+        if self.report_path is None:
+            return
+        try:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            self.report_path.write_text(self.report() + "\n", encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not save memory report: {e}")
@@ -1,13 +1,19 @@
 """Registrations view component"""
 import customtkinter as ctk
-from typing import List, Dict, Any, Optional
+from typing import List, Any, Optional
 from app.database.session import get_db_session
-from app.database.models import Registration, Event
+from app.gui.background import BackgroundLoader
+from app.gui.event_dropdown import EventDropdownMixin
+from app.services.event_catalog import get_event_catalog
+from app.api.sync import ChangeSet
+from app.database.queries import RegistrationFilter, RegistrationsSource, find_event, load_registration_rows
+from app.gui.virtual_table import VirtualTable, TableColumn
 from app.utils.logger import logger
+from app.utils.profiling import span
 from app.utils.storage import load_display_settings, save_display_settings
 
 
-class RegistrationsView(ctk.CTkFrame):
+class RegistrationsView(EventDropdownMixin, ctk.CTkFrame):
     """Registrations list view"""
     
     def __init__(self, parent, event_id: Optional[int] = None):
@@ -16,6 +22,18 @@ class RegistrationsView(ctk.CTkFrame):
         self.event_id = event_id
         self.display_settings = load_display_settings()
         
+        # Sort column and direction (None - newest first); kept across reloads
+        self.sort_key: Optional[str] = None
+        self.sort_descending = False
+        
+        # Search/filter state; typing is debounced before querying
+        self.filters = RegistrationFilter()
+        self._search_after_id: Optional[str] = None
+        self.search_delay_ms = 250
+        
+        # Queries run on worker threads, results are rendered on the main thread
+        self.loader = BackgroundLoader(self)
+        
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(2, weight=1)
@@ -86,19 +104,68 @@ class RegistrationsView(ctk.CTkFrame):
         # Ensure button is clickable - use after to lift after rendering
         controls_frame.after(100, lambda: refresh_btn.lift())
         
-        # Registrations scrollable frame - optimized for performance
-        self.scrollable_frame = ctk.CTkScrollableFrame(
-            self,
-            scrollbar_button_color=("gray70", "gray30"),
-            scrollbar_button_hover_color=("gray60", "gray40")
+        # Search and filters
+        ctk.CTkLabel(
+            controls_frame,
+            text="Поиск:",
+            font=ctk.CTkFont(size=14, weight="bold")
+        ).grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        
+        self.search_var = ctk.StringVar(value="")
+        self.search_entry = ctk.CTkEntry(
+            controls_frame,
+            textvariable=self.search_var,
+            placeholder_text="Коллектив, название, заметки или №",
+            height=35,
+            font=ctk.CTkFont(size=14)
         )
-        self.scrollable_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
+        self.search_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+        self.search_entry.bind("<KeyRelease>", self._on_search_changed)
+        self.search_entry.bind("<Return>", lambda e: self._apply_filters())
+        
+        self.status_filter_options = {
+            "Все статусы": None,
+            "На рассмотрении": "PENDING",
+            "Одобрено": "APPROVED",
+            "Отклонено": "REJECTED",
+        }
+        self.status_filter_var = ctk.StringVar(value="Все статусы")
+        ctk.CTkOptionMenu(
+            controls_frame,
+            values=list(self.status_filter_options),
+            variable=self.status_filter_var,
+            command=lambda _: self._apply_filters(),
+            width=120,
+            height=35
+        ).grid(row=1, column=2, padx=5, pady=5, sticky="e")
+        
+        self.payment_filter_options = {
+            "Любая оплата": None,
+            "Не оплачено": "UNPAID",
+            "Оплачено выступление": "PERFORMANCE_PAID",
+            "Оплачены ДМ": "DIPLOMAS_PAID",
+            "Оплачено": "PAID",
+        }
+        self.payment_filter_var = ctk.StringVar(value="Любая оплата")
+        ctk.CTkOptionMenu(
+            controls_frame,
+            values=list(self.payment_filter_options),
+            variable=self.payment_filter_var,
+            command=lambda _: self._apply_filters(),
+            width=120,
+            height=35
+        ).grid(row=1, column=3, padx=5, pady=5, sticky="e")
         
-        # Performance optimization: limit visible items
-        self.max_visible_items = 100
-        self.all_registrations = []
-        self.displayed_registrations = []
-        self.scrollable_frame.grid_columnconfigure(0, weight=1)
+        # Registrations table - row widgets are pooled and rebound while scrolling
+        self.source: Optional[RegistrationsSource] = None
+        self.table = VirtualTable(
+            self,
+            columns=self._build_columns(),
+            empty_text="📭 Выберите событие для просмотра регистраций",
+            on_header_click=self._on_header_click
+        )
+        self.table.cell_color = self._cell_color
+        self.table.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
         
         # Status label
         self.status_label = ctk.CTkLabel(
@@ -108,27 +175,80 @@ class RegistrationsView(ctk.CTkFrame):
         )
         self.status_label.grid(row=3, column=0, pady=5)
         
-        # Load events for dropdown
-        self._load_events()
+        # Load events for dropdown (and follow catalogue changes, e.g. after sync)
+        self.refresh_events()
+        get_event_catalog().subscribe(self.refresh_events, self)
         
         # Load registrations if event_id provided
         if event_id:
             self.event_id = event_id
             self.refresh_registrations()
     
-    def _load_events(self):
-        """Load events for dropdown"""
-        try:
-            db = get_db_session()
-            try:
-                events = db.query(Event).order_by(Event.start_date.desc()).all()
-                event_names = [f"{e.name} (ID: {e.server_id or e.id})" for e in events]
-                event_names.insert(0, "Выберите событие")
-                self.event_dropdown.configure(values=event_names)
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Error loading events: {e}")
+    def _build_columns(self) -> List[TableColumn]:
+        """Table columns enabled in display settings"""
+        columns = self.display_settings.get("registration_columns", {})
+        status_colors = {
+            "PENDING": "darkgoldenrod",
+            "APPROVED": "darkgreen",
+            "REJECTED": "darkred"
+        }
+        payment_colors = {
+            "UNPAID": "darkred",
+            "PERFORMANCE_PAID": "darkorange",
+            "DIPLOMAS_PAID": "darkorange",
+            "PAID": "darkgreen"
+        }
+        available = [
+            ("number", True, TableColumn("number", "№", width=60, sortable=True)),
+            ("block_number", False, TableColumn("block_number", "Блок", width=60, sortable=True)),
+            ("collective", True, TableColumn(
+                "collective_name", "Коллектив", width=200, weight=1, max_chars=30, sortable=True
+            )),
+            ("dance_name", True, TableColumn(
+                "dance_name", "Название", width=200, weight=1, max_chars=30, sortable=True
+            )),
+            ("status", True, TableColumn("status", "Статус", width=120, badge_colors=status_colors)),
+            ("payment_status", True, TableColumn(
+                "payment_status", "Оплата", width=120, badge_colors=payment_colors, sortable=True
+            )),
+            ("participants_count", False, TableColumn(
+                "participants_count", "Участники", width=100, anchor="center",
+                formatter=lambda v: str(v or 0)
+            )),
+            ("notes", False, TableColumn("notes", "Заметки", width=200, weight=1, max_chars=30)),
+        ]
+        return [column for key, default, column in available if columns.get(key, default)]
+    
+    def _on_search_changed(self, event=None):
+        """Restart the debounce timer on each keystroke"""
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(self.search_delay_ms, self._apply_filters)
+    
+    def _apply_filters(self):
+        """Re-query with the current search text and filters (skipped if unchanged)"""
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        
+        filters = RegistrationFilter(
+            search=self.search_var.get().strip(),
+            status=self.status_filter_options.get(self.status_filter_var.get()),
+            payment_status=self.payment_filter_options.get(self.payment_filter_var.get()),
+        )
+        if filters == self.filters:
+            return
+        self.filters = filters
+        self.refresh_registrations()
+    
+    def _cell_color(self, row: Any, column: TableColumn):
+        """Highlight cells containing the search text of the shown results"""
+        search = self.source.filters.search.casefold() if self.source and self.source.filters else ""
+        if search and column.key in ("collective_name", "dance_name", "notes", "number"):
+            value = getattr(row, column.key, None)
+            if value is not None and search in str(value).casefold():
+                return ("#b35900", "#ffb347")
+        return ("gray10", "gray90")
     
     def _on_event_selected(self, choice: str):
         """Handle event selection"""
@@ -165,6 +285,7 @@ class RegistrationsView(ctk.CTkFrame):
         
         column_labels = {
             "number": "№",
+            "block_number": "Блок",
             "collective": "Коллектив",
             "dance_name": "Название танца",
             "status": "Статус",
@@ -194,6 +315,7 @@ class RegistrationsView(ctk.CTkFrame):
                 key: var.get() for key, var in checkboxes.items()
             }
             save_display_settings(self.display_settings)
+            self.table.set_columns(self._build_columns())
             self.refresh_registrations()
             dialog.destroy()
         
@@ -219,311 +341,144 @@ class RegistrationsView(ctk.CTkFrame):
         )
         cancel_btn.pack(side="right", padx=5)
     
-    def refresh_registrations(self):
-        """Refresh registrations list"""
-        # Clear existing widgets
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+    def apply_changes(self, changes: ChangeSet):
+        """Update the shown list in place after a sync"""
+        source = self.source
+        if not source or not changes.event_changed(source.local_event_id, "registrations"):
+            return
+        
+        if (
+            changes.structure_changed("registrations")
+            or (source.filters and source.filters.is_active())
+            or source.sort_key
+        ):
+            # Rows added/removed, or may now (not) match filters or move in sort order - reload, keep scroll position
+            self.refresh_registrations(keep_offset=True)
+            return
         
-        # Reset displayed registrations
-        self.all_registrations = []
-        self.displayed_registrations = []
+        # Only updates: re-read changed rows that are loaded and rebind the visible ones
+        ids = changes.updated["registrations"] & source.cached_keys()
+        if not ids:
+            return
+        
+        def load():
+            db = get_db_session()
+            try:
+                return load_registration_rows(db, source.local_event_id, ids=ids)
+            finally:
+                db.close()
+        
+        def patch(rows):
+            if self.source is source:
+                source.patch_rows(rows)
+                self.table.refresh()
+        
+        self.loader.submit("registrations", load, patch, self._on_registrations_error)
+    
+    @span("ui.registrations.refresh_registrations")
+    def refresh_registrations(self, keep_offset: bool = False):
+        """Refresh registrations list (loaded in the background)"""
+        self.source = None
         
         if not self.event_id:
+            self.loader.cancel("registrations")
             self.status_label.configure(text="", text_color="gray")
-            no_event_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text="📭 Выберите событие для просмотра регистраций",
-                font=ctk.CTkFont(size=16),
-                justify="center"
-            )
-            no_event_label.pack(pady=40)
+            self.table.show_message("📭 Выберите событие для просмотра регистраций")
             return
         
         self.status_label.configure(text="⏳ Загрузка регистраций...", text_color="gray")
-        self.update()
+        event_id = self.event_id
+        filters = self.filters
+        sort_key, sort_descending = self.sort_key, self.sort_descending
         
-        try:
+        def load():
             db = get_db_session()
             try:
                 # Find local event ID from server ID
-                event = db.query(Event).filter(
-                    (Event.server_id == self.event_id) | (Event.id == self.event_id)
-                ).first()
-                
+                event = find_event(db, event_id)
                 if not event:
-                    error_label = ctk.CTkLabel(
-                        self.scrollable_frame,
-                        text="❌ Событие не найдено в локальной БД.\nСинхронизируйтесь с сервером.",
-                        text_color="red",
-                        font=ctk.CTkFont(size=14),
-                        wraplength=600,
-                        justify="center"
-                    )
-                    error_label.pack(pady=20)
-                    self.status_label.configure(text="✗ Событие не найдено", text_color="red")
-                    return
-                
-                registrations = db.query(Registration).filter(
-                    Registration.event_id == event.id
-                ).order_by(Registration.created_at.desc()).all()
-                
-                # Store all registrations
-                self.all_registrations = registrations
-                
-                # Limit initial display for performance
-                self.displayed_registrations = registrations[:self.max_visible_items]
-                
-                self._render_registrations(self.displayed_registrations)
-                self.status_label.configure(
-                    text=f"✓ Загружено регистраций: {len(registrations)}",
-                    text_color="green"
-                )
+                    return None
+                local_event_id = event.id
             finally:
                 db.close()
-        except Exception as e:
-            logger.error(f"Error loading registrations: {e}")
-            error_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text=f"❌ Ошибка загрузки регистраций: {e}",
-                text_color="red",
-                font=ctk.CTkFont(size=14),
-                wraplength=600
-            )
-            error_label.pack(pady=20)
-            self.status_label.configure(
-                text=f"✗ Ошибка: {str(e)[:50]}",
-                text_color="red"
-            )
+            
+            # Count and first page are read here, further pages as the table scrolls
+            source = RegistrationsSource(local_event_id, filters)
+            if sort_key:
+                source.load_sort_index()
+                source.set_sort(sort_key, sort_descending)
+            source.prefetch()
+            return source
+        
+        self.loader.submit(
+            "registrations",
+            load,
+            lambda source: self._on_registrations_loaded(source, keep_offset),
+            self._on_registrations_error
+        )
     
-    def _render_registrations(self, registrations: List[Registration]):
-        """Render registrations table with performance optimization"""
-        if not registrations:
-            no_regs_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text="📭 Нет регистраций для этого события",
-                font=ctk.CTkFont(size=16),
-                justify="center"
+    def _on_registrations_loaded(self, source: Optional[RegistrationsSource], keep_offset: bool = False):
+        """Bind loaded registrations to the table"""
+        if source is None:
+            self.table.show_message(
+                "❌ Событие не найдено в локальной БД.\nСинхронизируйтесь с сервером.",
+                color="red"
             )
-            no_regs_label.pack(pady=40)
+            self.status_label.configure(text="✗ Событие не найдено", text_color="red")
             return
         
-        # Get visible columns from settings
-        columns = self.display_settings.get("registration_columns", {})
+        self.source = source
+        if source.filters and source.filters.is_active():
+            self.table.empty_text = "🔍 Ничего не найдено"
+            status_text = f"🔍 Найдено: {source.count()}"
+        else:
+            self.table.empty_text = "📭 Нет регистраций для этого события"
+            status_text = f"✓ Загружено регистраций: {source.count()}"
+        self.table.set_source(source, keep_offset=keep_offset)
+        self.status_label.configure(text=status_text, text_color="green")
+    
+    def _on_header_click(self, column: TableColumn):
+        """Sort by a column; clicking the sorted column again reverses the order"""
+        if column.key == self.sort_key:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_key = column.key
+            self.sort_descending = False
+        self.table.set_sort_indicator(self.sort_key, self.sort_descending)
+        
+        source = self.source
+        if source is None:
+            return  # applied when the current load finishes
+        
+        if source.sort_index is not None:
+            # Keys already in memory: reorder and rebind the visible rows only
+            source.set_sort(self.sort_key, self.sort_descending)
+            self.table.offset = 0
+            self.table.refresh()
+            return
         
-        # Create table headers
-        headers_frame = ctk.CTkFrame(
-            self.scrollable_frame,
-            corner_radius=5,
-            fg_color=("gray75", "gray25")
+        sort_key, sort_descending = self.sort_key, self.sort_descending
+        
+        def load():
+            # Sort keys of the whole list are read once; a fresh source keeps the bound one untouched
+            sorted_source = RegistrationsSource(source.local_event_id, source.filters)
+            sorted_source.load_sort_index()
+            sorted_source.set_sort(sort_key, sort_descending)
+            sorted_source.prefetch()
+            return sorted_source
+        
+        self.status_label.configure(text="⏳ Сортировка...", text_color="gray")
+        self.loader.submit(
+            "registrations",
+            load,
+            lambda loaded: self._on_registrations_loaded(loaded),
+            self._on_registrations_error
         )
-        headers_frame.pack(fill="x", padx=5, pady=5)
-        
-        col = 0
-        if columns.get("number", True):
-            header = ctk.CTkLabel(
-                headers_frame,
-                text="№",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=60
-            )
-            header.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-            col += 1
-        
-        if columns.get("collective", True):
-            header = ctk.CTkLabel(
-                headers_frame,
-                text="Коллектив",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=200
-            )
-            header.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-            headers_frame.grid_columnconfigure(col, weight=1)
-            col += 1
-        
-        if columns.get("dance_name", True):
-            header = ctk.CTkLabel(
-                headers_frame,
-                text="Название",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=200
-            )
-            header.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-            headers_frame.grid_columnconfigure(col, weight=1)
-            col += 1
-        
-        if columns.get("status", True):
-            header = ctk.CTkLabel(
-                headers_frame,
-                text="Статус",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=120
-            )
-            header.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-            col += 1
-        
-        if columns.get("payment_status", True):
-            header = ctk.CTkLabel(
-                headers_frame,
-                text="Оплата",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=120
-            )
-            header.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-            col += 1
-        
-        if columns.get("participants_count", False):
-            header = ctk.CTkLabel(
-                headers_frame,
-                text="Участники",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=100
-            )
-            header.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-            col += 1
-        
-        if columns.get("notes", False):
-            header = ctk.CTkLabel(
-                headers_frame,
-                text="Заметки",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=200
-            )
-            header.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-            headers_frame.grid_columnconfigure(col, weight=1)
-            col += 1
-        
-        # Create registration rows
-        for reg in registrations:
-            self._create_registration_row(reg, columns)
     
-    def _create_registration_row(self, reg: Registration, columns: Dict[str, bool]):
-        """Create registration table row"""
-        row_frame = ctk.CTkFrame(
-            self.scrollable_frame,
-            corner_radius=3,
-            border_width=1,
-            border_color=("gray80", "gray20")
+    def _on_registrations_error(self, e: Exception):
+        logger.error(f"Error loading registrations: {e}")
+        self.table.show_message(f"❌ Ошибка загрузки регистраций: {e}", color="red")
+        self.status_label.configure(
+            text=f"✗ Ошибка: {str(e)[:50]}",
+            text_color="red"
         )
-        row_frame.pack(fill="x", padx=5, pady=2)
-        row_frame.grid_columnconfigure(1, weight=1)
-        row_frame.grid_columnconfigure(2, weight=1)
-        if columns.get("notes", False):
-            # Find notes column index
-            notes_col = sum([
-                columns.get("number", True),
-                columns.get("collective", True),
-                columns.get("dance_name", True),
-                columns.get("status", True),
-                columns.get("payment_status", True),
-                columns.get("participants_count", False)
-            ])
-            row_frame.grid_columnconfigure(notes_col, weight=1)
-        
-        col = 0
-        
-        # Number
-        if columns.get("number", True):
-            number_label = ctk.CTkLabel(
-                row_frame,
-                text=str(reg.number or "-"),
-                width=60,
-                font=ctk.CTkFont(size=12)
-            )
-            number_label.grid(row=0, column=col, padx=5, pady=8, sticky="w")
-            col += 1
-        
-        # Collective name
-        if columns.get("collective", True):
-            collective_name = "-"
-            if reg.collective:
-                collective_name = reg.collective.name
-            collective_label = ctk.CTkLabel(
-                row_frame,
-                text=collective_name[:30] + "..." if len(collective_name) > 30 else collective_name,
-                width=200,
-                anchor="w",
-                font=ctk.CTkFont(size=12)
-            )
-            collective_label.grid(row=0, column=col, padx=5, pady=8, sticky="ew")
-            row_frame.grid_columnconfigure(col, weight=1)
-            col += 1
-        
-        # Dance name
-        if columns.get("dance_name", True):
-            dance_label = ctk.CTkLabel(
-                row_frame,
-                text=(reg.dance_name or "-")[:30] + "..." if reg.dance_name and len(reg.dance_name) > 30 else (reg.dance_name or "-"),
-                width=200,
-                anchor="w",
-                font=ctk.CTkFont(size=12)
-            )
-            dance_label.grid(row=0, column=col, padx=5, pady=8, sticky="ew")
-            row_frame.grid_columnconfigure(col, weight=1)
-            col += 1
-        
-        # Status
-        if columns.get("status", True):
-            status_colors = {
-                "PENDING": ("yellow", "darkyellow"),
-                "APPROVED": ("green", "darkgreen"),
-                "REJECTED": ("red", "darkred")
-            }
-            status_color = status_colors.get(reg.status.value if reg.status else "PENDING", ("gray", "gray"))
-            status_label = ctk.CTkLabel(
-                row_frame,
-                text=reg.status.value if reg.status else "PENDING",
-                text_color="white",
-                fg_color=status_color[1],
-                width=120,
-                corner_radius=10,
-                font=ctk.CTkFont(size=11, weight="bold")
-            )
-            status_label.grid(row=0, column=col, padx=5, pady=8)
-            col += 1
-        
-        # Payment status
-        if columns.get("payment_status", True):
-            payment_colors = {
-                "UNPAID": ("red", "darkred"),
-                "PERFORMANCE_PAID": ("orange", "darkorange"),
-                "DIPLOMAS_PAID": ("orange", "darkorange"),
-                "PAID": ("green", "darkgreen")
-            }
-            payment_color = payment_colors.get(reg.payment_status.value if reg.payment_status else "UNPAID", ("gray", "gray"))
-            payment_label = ctk.CTkLabel(
-                row_frame,
-                text=reg.payment_status.value if reg.payment_status else "UNPAID",
-                text_color="white",
-                fg_color=payment_color[1],
-                width=120,
-                corner_radius=10,
-                font=ctk.CTkFont(size=11, weight="bold")
-            )
-            payment_label.grid(row=0, column=col, padx=5, pady=8)
-            col += 1
-        
-        # Participants count
-        if columns.get("participants_count", False):
-            participants_label = ctk.CTkLabel(
-                row_frame,
-                text=str(reg.participants_count or 0),
-                width=100,
-                font=ctk.CTkFont(size=12)
-            )
-            participants_label.grid(row=0, column=col, padx=5, pady=8)
-            col += 1
-        
-        # Notes
-        if columns.get("notes", False):
-            notes_text = (reg.notes or "-")[:30] + "..." if reg.notes and len(reg.notes) > 30 else (reg.notes or "-")
-            notes_label = ctk.CTkLabel(
-                row_frame,
-                text=notes_text,
-                width=200,
-                anchor="w",
-                font=ctk.CTkFont(size=12)
-            )
-            notes_label.grid(row=0, column=col, padx=5, pady=8, sticky="ew")
-            row_frame.grid_columnconfigure(col, weight=1)
-            col += 1
@@ -1,19 +1,52 @@
 """Statistics view for displaying event statistics"""
 import customtkinter as ctk
-from typing import Optional, Dict, Any
-from app.database.models import Event, Registration, RegistrationStatus, PaymentStatus
+from typing import Optional, Dict, Any, List, Tuple
+from app.api.sync import ChangeSet
+from app.database.queries import find_event, load_event_stats
 from app.database.session import get_db_session
+from app.gui.background import BackgroundLoader
+from app.gui.event_dropdown import EventDropdownMixin
+from app.gui.fonts import get_font
+from app.services.event_catalog import get_event_catalog
+from app.services.statistics_service import StatisticsEngine, DIMENSIONS, DIMENSION_LABELS, MEASURES
 from app.utils.logger import logger
-from sqlalchemy import func
+from app.utils.profiling import span
 
+MEASURE_LABELS = {
+    "count": "Рег.",
+    "participants": "Участн.",
+    "federation_participants": "Фед.",
+    "diplomas": "Дипл.",
+    "medals": "Мед.",
+}
 
-class StatisticsView(ctk.CTkFrame):
+# Pivot cells are labels; beyond this the grid gets slow to lay out and unreadable
+MAX_PIVOT_ROWS = 40
+MAX_PIVOT_COLUMNS = 12
+
+
+class StatisticsView(EventDropdownMixin, ctk.CTkFrame):
     """View for displaying statistics"""
     
+    synced_events_only = True
+    
     def __init__(self, parent, event_id: Optional[int] = None):
         super().__init__(parent)
         self.event_id = event_id
         
+        # Breakdown state: cube of the loaded event and current drill-down path
+        self.cube = None
+        self.local_event_id: Optional[int] = None
+        self.root_dimension = "discipline"
+        self.drill_path: List[Tuple[str, int]] = []
+        
+        # Pivot state: rows follow the breakdown dimension
+        self.pivot_column = "nomination"
+        self.pivot_measure = "count"
+        
+        # Queries run on worker threads, results are rendered on the main thread
+        self.loader = BackgroundLoader(self)
+        
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(2, weight=1)
@@ -84,38 +117,13 @@ class StatisticsView(ctk.CTkFrame):
         )
         self.status_label.grid(row=3, column=0, pady=5)
         
-        # Load events
+        # Load events (and follow catalogue changes, e.g. after sync)
         self.refresh_events()
+        get_event_catalog().subscribe(self.refresh_events, self)
         if event_id:
             self.event_id = event_id
             self.refresh_statistics()
     
-    def refresh_events(self):
-        """Refresh events dropdown"""
-        try:
-            db = get_db_session()
-            try:
-                events = db.query(Event).filter(
-                    Event.server_id.isnot(None)
-                ).order_by(Event.start_date.desc()).all()
-                
-                event_values = ["Выберите событие"]
-                for event in events:
-                    event_values.append(f"{event.name} (ID: {event.server_id})")
-                
-                self.event_dropdown.configure(values=event_values)
-                
-                if self.event_id:
-                    # Find and select current event
-                    for event in events:
-                        if event.server_id == self.event_id or event.id == self.event_id:
-                            self.event_var.set(f"{event.name} (ID: {event.server_id})")
-                            break
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Error loading events: {e}")
-    
     def _on_event_selected(self, choice: str):
         """Handle event selection"""
         if choice == "Выберите событие":
@@ -129,13 +137,22 @@ class StatisticsView(ctk.CTkFrame):
         except Exception as e:
             logger.error(f"Error parsing event ID: {e}")
     
-    def refresh_statistics(self):
-        """Refresh statistics"""
-        # Clear existing widgets
+    def _clear(self):
+        """Remove rendered statistics"""
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
-        
+    
+    def apply_changes(self, changes: ChangeSet):
+        """Reload statistics only if the sync changed the shown event"""
+        if self.event_id and changes.event_changed(self.local_event_id, "registrations"):
+            self.refresh_statistics()
+    
+    @span("ui.statistics.refresh_statistics")
+    def refresh_statistics(self):
+        """Refresh statistics (loaded in the background)"""
         if not self.event_id:
+            self.loader.cancel("statistics")
+            self._clear()
             self.status_label.configure(text="", text_color="gray")
             no_event_label = ctk.CTkLabel(
                 self.scrollable_frame,
@@ -147,94 +164,73 @@ class StatisticsView(ctk.CTkFrame):
             return
         
         self.status_label.configure(text="⏳ Загрузка статистики...", text_color="gray")
-        self.update()
+        event_id = self.event_id
         
-        try:
+        def load():
             db = get_db_session()
             try:
                 # Find local event ID from server ID
-                event = db.query(Event).filter(
-                    (Event.server_id == self.event_id) | (Event.id == self.event_id)
-                ).first()
-                
+                event = find_event(db, event_id)
                 if not event:
-                    error_label = ctk.CTkLabel(
-                        self.scrollable_frame,
-                        text="❌ Событие не найдено в локальной БД.\nСинхронизируйтесь с сервером.",
-                        text_color="red",
-                        font=ctk.CTkFont(size=14),
-                        wraplength=600,
-                        justify="center"
-                    )
-                    error_label.pack(pady=20)
-                    self.status_label.configure(text="✗ Событие не найдено", text_color="red")
-                    return
-                
-                # Get statistics
-                total_regs = db.query(Registration).filter(
-                    Registration.event_id == event.id
-                ).count()
-                
-                pending_regs = db.query(Registration).filter(
-                    Registration.event_id == event.id,
-                    Registration.status == RegistrationStatus.PENDING
-                ).count()
+                    return None
                 
-                approved_regs = db.query(Registration).filter(
-                    Registration.event_id == event.id,
-                    Registration.status == RegistrationStatus.APPROVED
-                ).count()
+                # Aggregates are maintained by triggers - a single-row read
+                stats = load_event_stats(db, event.id)
+                stats["event_name"] = event.name
                 
-                rejected_regs = db.query(Registration).filter(
-                    Registration.event_id == event.id,
-                    Registration.status == RegistrationStatus.REJECTED
-                ).count()
-                
-                unpaid_regs = db.query(Registration).filter(
-                    Registration.event_id == event.id,
-                    Registration.payment_status == PaymentStatus.UNPAID
-                ).count()
-                
-                paid_regs = db.query(Registration).filter(
-                    Registration.event_id == event.id,
-                    Registration.payment_status == PaymentStatus.PAID
-                ).count()
-                
-                total_participants = db.query(func.sum(Registration.participants_count)).filter(
-                    Registration.event_id == event.id
-                ).scalar() or 0
-                
-                self._render_statistics({
-                    "total_regs": total_regs,
-                    "pending_regs": pending_regs,
-                    "approved_regs": approved_regs,
-                    "rejected_regs": rejected_regs,
-                    "unpaid_regs": unpaid_regs,
-                    "paid_regs": paid_regs,
-                    "total_participants": int(total_participants) if total_participants else 0,
-                    "event_name": event.name
-                })
-                
-                self.status_label.configure(
-                    text="✓ Статистика загружена",
-                    text_color="green"
-                )
+                # Breakdowns are computed in memory from one columnar query;
+                # the cubes are rolled up here so pivots switch instantly
+                cube = StatisticsEngine(db).load(event.id)
+                cube.all_cubes()
+                return stats, cube, event.id
             finally:
                 db.close()
-        except Exception as e:
-            logger.error(f"Error loading statistics: {e}")
+        
+        self.loader.submit("statistics", load, self._on_statistics_loaded, self._on_statistics_error)
+    
+    def _on_statistics_loaded(self, result: Optional[Tuple[Dict[str, Any], Any]]):
+        """Render loaded statistics"""
+        self._clear()
+        
+        if result is None:
             error_label = ctk.CTkLabel(
                 self.scrollable_frame,
-                text=f"❌ Ошибка загрузки статистики: {e}",
+                text="❌ Событие не найдено в локальной БД.\nСинхронизируйтесь с сервером.",
                 text_color="red",
                 font=ctk.CTkFont(size=14),
-                wraplength=600
+                wraplength=600,
+                justify="center"
             )
             error_label.pack(pady=20)
-            self.status_label.configure(
-                text=f"✗ Ошибка: {str(e)[:50]}",
-                text_color="red"
-            )
+            self.status_label.configure(text="✗ Событие не найдено", text_color="red")
+            return
+        
+        stats, self.cube, self.local_event_id = result
+        self.drill_path = []
+        self._render_statistics(stats)
+        self._render_breakdown_section()
+        self._render_pivot_section()
+        
+        self.status_label.configure(
+            text="✓ Статистика загружена",
+            text_color="green"
+        )
+    
+    def _on_statistics_error(self, e: Exception):
+        logger.error(f"Error loading statistics: {e}")
+        self._clear()
+        error_label = ctk.CTkLabel(
+            self.scrollable_frame,
+            text=f"❌ Ошибка загрузки статистики: {e}",
+            text_color="red",
+            font=ctk.CTkFont(size=14),
+            wraplength=600
+        )
+        error_label.pack(pady=20)
+        self.status_label.configure(
+            text=f"✗ Ошибка: {str(e)[:50]}",
+            text_color="red"
+        )
     
     def _render_statistics(self, stats: Dict[str, Any]):
         """Render statistics"""
@@ -262,6 +258,8 @@ class StatisticsView(ctk.CTkFrame):
             ("💳 Не оплачено", stats['unpaid_regs'], "orange"),
             ("💰 Оплачено", stats['paid_regs'], "green"),
             ("👥 Всего участников", stats['total_participants'], "purple"),
+            ("📜 Дипломов", stats['total_diplomas'], "blue"),
+            ("🏅 Медалей", stats['total_medals'], "blue"),
         ]
         
         for title, value, color in stats_cards:
@@ -288,4 +286,280 @@ class StatisticsView(ctk.CTkFrame):
                 anchor="e"
             )
             value_label.pack(side="right", padx=15, pady=10)
+    
+    def _render_breakdown_section(self):
+        """Render breakdown header with dimension selector"""
+        section = ctk.CTkFrame(
+            self.scrollable_frame,
+            corner_radius=10,
+            fg_color=("gray75", "gray25")
+        )
+        section.pack(fill="x", padx=5, pady=(15, 5))
+        
+        ctk.CTkLabel(
+            section,
+            text="🔎 Разбивка",
+            font=ctk.CTkFont(size=16, weight="bold")
+        ).pack(side="left", padx=15, pady=10)
+        
+        self.dimension_var = ctk.StringVar(value=DIMENSION_LABELS[self.root_dimension])
+        dimension_selector = ctk.CTkSegmentedButton(
+            section,
+            values=list(DIMENSION_LABELS.values()),
+            variable=self.dimension_var,
+            command=self._on_dimension_selected
+        )
+        dimension_selector.pack(side="right", padx=15, pady=10)
+        
+        self.breakdown_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="transparent")
+        self.breakdown_frame.pack(fill="x", padx=5, pady=5)
+        self._render_breakdown()
+    
+    def _on_dimension_selected(self, label: str):
+        """Handle breakdown dimension change"""
+        for dim, dim_label in DIMENSION_LABELS.items():
+            if dim_label == label:
+                self.root_dimension = dim
+        self.drill_path = []
+        self._render_breakdown()
+        self._render_pivot()
+    
+    def _drill_order(self) -> List[str]:
+        """Dimensions in drill-down order, starting from the selected one"""
+        return [self.root_dimension] + [dim for dim in DIMENSIONS if dim != self.root_dimension]
+    
+    def _drill_into(self, dim: str, key: int):
+        """Drill down into a dimension value"""
+        self.drill_path.append((dim, key))
+        self._render_breakdown()
+    
+    def _drill_up(self):
+        """Go one level up"""
+        if self.drill_path:
+            self.drill_path.pop()
+        self._render_breakdown()
+    
+    def _render_breakdown(self):
+        """Render breakdown rows for the current drill-down level"""
+        for widget in self.breakdown_frame.winfo_children():
+            widget.destroy()
+        
+        if not self.cube:
+            return
+        
+        order = self._drill_order()
+        dim = order[len(self.drill_path)]
+        can_drill = len(self.drill_path) + 1 < len(order)
+        
+        # Breadcrumb
+        if self.drill_path:
+            crumbs_frame = ctk.CTkFrame(self.breakdown_frame, fg_color="transparent")
+            crumbs_frame.pack(fill="x", pady=(0, 5))
+            ctk.CTkButton(
+                crumbs_frame,
+                text="⬅ Назад",
+                command=self._drill_up,
+                width=90,
+                height=28,
+                font=get_font(12)
+            ).pack(side="left", padx=5)
+            crumbs = " › ".join(
+                f"{DIMENSION_LABELS[d]}: {self.cube.name(d, key)}" for d, key in self.drill_path
+            )
+            ctk.CTkLabel(
+                crumbs_frame,
+                text=crumbs,
+                font=get_font(12),
+                anchor="w"
+            ).pack(side="left", padx=10)
+        
+        headers = [DIMENSION_LABELS[dim]] + [MEASURE_LABELS[m] for m in MEASURES]
+        table = ctk.CTkFrame(self.breakdown_frame, corner_radius=5)
+        table.pack(fill="x")
+        table.grid_columnconfigure(0, weight=1)
+        for col, header in enumerate(headers):
+            ctk.CTkLabel(
+                table,
+                text=header,
+                font=get_font(12, "bold"),
+                anchor="w" if col == 0 else "e"
+            ).grid(row=0, column=col, padx=8, pady=6, sticky="ew")
+        
+        rows = self.cube.breakdown(dim, dict(self.drill_path))
+        if not rows:
+            ctk.CTkLabel(table, text="Нет данных", font=get_font(12)).grid(
+                row=1, column=0, columnspan=len(headers), pady=10
+            )
+            return
+        
+        for row_idx, (key, name, totals) in enumerate(rows, start=1):
+            ctk.CTkLabel(
+                table,
+                text=name,
+                font=get_font(12),
+                anchor="w"
+            ).grid(row=row_idx, column=0, padx=8, pady=2, sticky="ew")
+            for col, value in enumerate(totals, start=1):
+                ctk.CTkLabel(
+                    table,
+                    text=str(value),
+                    font=get_font(12),
+                    anchor="e"
+                ).grid(row=row_idx, column=col, padx=8, pady=2, sticky="ew")
+            if can_drill:
+                ctk.CTkButton(
+                    table,
+                    text="▸",
+                    command=lambda d=dim, k=key: self._drill_into(d, k),
+                    width=28,
+                    height=24
+                ).grid(row=row_idx, column=len(headers), padx=5, pady=2)
+    
+    def _render_pivot_section(self):
+        """Render pivot header with column dimension and measure selectors"""
+        section = ctk.CTkFrame(
+            self.scrollable_frame,
+            corner_radius=10,
+            fg_color=("gray75", "gray25")
+        )
+        section.pack(fill="x", padx=5, pady=(15, 5))
+        
+        ctk.CTkLabel(
+            section,
+            text="▦ Сводная таблица",
+            font=get_font(16, "bold")
+        ).pack(side="left", padx=15, pady=10)
+        
+        self.pivot_measure_var = ctk.StringVar(value=MEASURE_LABELS[self.pivot_measure])
+        ctk.CTkSegmentedButton(
+            section,
+            values=list(MEASURE_LABELS.values()),
+            variable=self.pivot_measure_var,
+            command=self._on_pivot_measure_selected
+        ).pack(side="right", padx=15, pady=10)
+        
+        self.pivot_column_var = ctk.StringVar(value=DIMENSION_LABELS[self.pivot_column])
+        ctk.CTkSegmentedButton(
+            section,
+            values=list(DIMENSION_LABELS.values()),
+            variable=self.pivot_column_var,
+            command=self._on_pivot_column_selected
+        ).pack(side="right", padx=5, pady=10)
+        
+        self.pivot_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="transparent")
+        self.pivot_frame.pack(fill="x", padx=5, pady=5)
+        self.pivot_table = ctk.CTkFrame(self.pivot_frame, corner_radius=5)
+        self.pivot_table.grid_columnconfigure(0, weight=1)
+        self.pivot_message = ctk.CTkLabel(self.pivot_frame, text="", font=get_font(12), text_color="gray")
+        # (row, column) -> (label, shown cell state or None when hidden); reused across renders
+        self._pivot_cells: Dict[Tuple[int, int], Tuple[ctk.CTkLabel, Optional[Tuple[str, bool, str]]]] = {}
+        self._render_pivot()
+    
+    def _on_pivot_column_selected(self, label: str):
+        """Handle pivot column dimension change"""
+        for dim, dim_label in DIMENSION_LABELS.items():
+            if dim_label == label:
+                self.pivot_column = dim
+        self._render_pivot()
+    
+    def _on_pivot_measure_selected(self, label: str):
+        """Handle pivot measure change"""
+        for measure, measure_label in MEASURE_LABELS.items():
+            if measure_label == label:
+                self.pivot_measure = measure
+        self._render_pivot()
+    
+    def _render_pivot(self):
+        """Render pivot of the breakdown dimension (rows) by the selected dimension (columns)
+
+        Cell labels are kept between renders and only reconfigured; at most
+        MAX_PIVOT_ROWS x MAX_PIVOT_COLUMNS of the largest rows and columns are shown.
+        """
+        if not self.cube:
+            self._show_pivot_message("")
+            return
+        
+        row_dim = self.root_dimension
+        col_dim = self.pivot_column
+        if col_dim == row_dim:
+            self._show_pivot_message("Выберите для столбцов другое измерение, чем в разбивке")
+            return
+        
+        row_keys, col_keys, matrix = self.cube.pivot(row_dim, col_dim, self.pivot_measure)
+        if not row_keys:
+            self._show_pivot_message("Нет данных")
+            return
+        
+        # Totals cover all data, hidden rows and columns included
+        row_totals = [sum(values) for values in matrix]
+        column_totals = [sum(column) for column in zip(*matrix)]
+        shown_rows = _largest(row_totals, MAX_PIVOT_ROWS)
+        shown_cols = _largest(column_totals, MAX_PIVOT_COLUMNS)
+        
+        cells: Dict[Tuple[int, int], Tuple[str, bool, str]] = {}
+        headers = (
+            [f"{DIMENSION_LABELS[row_dim]} \\ {DIMENSION_LABELS[col_dim]}"]
+            + [self.cube.name(col_dim, col_keys[i]) for i in shown_cols]
+            + ["Итого"]
+        )
+        for col, header in enumerate(headers):
+            cells[(0, col)] = (header, True, "w" if col == 0 else "e")
+        for row, i in enumerate(shown_rows, start=1):
+            cells[(row, 0)] = (self.cube.name(row_dim, row_keys[i]), False, "w")
+            for col, j in enumerate(shown_cols, start=1):
+                value = matrix[i][j]
+                cells[(row, col)] = (str(value) if value else "·", False, "e")
+            cells[(row, len(headers) - 1)] = (str(row_totals[i]), True, "e")
+        totals_row = len(shown_rows) + 1
+        cells[(totals_row, 0)] = ("Итого", True, "w")
+        for col, j in enumerate(shown_cols, start=1):
+            cells[(totals_row, col)] = (str(column_totals[j]), True, "e")
+        cells[(totals_row, len(headers) - 1)] = (str(sum(row_totals)), True, "e")
+        
+        self._bind_pivot_cells(cells)
+        
+        hidden = []
+        if len(shown_rows) < len(row_keys):
+            hidden.append(f"{len(shown_rows)} из {len(row_keys)} строк")
+        if len(shown_cols) < len(col_keys):
+            hidden.append(f"{len(shown_cols)} из {len(col_keys)} столбцов")
+        note = f"Показаны крупнейшие: {', '.join(hidden)}; итоги - по всем данным" if hidden else ""
+        self._show_pivot_message(note, table=True)
+    
+    def _bind_pivot_cells(self, cells: Dict[Tuple[int, int], Tuple[str, bool, str]]):
+        """Show cells in the pivot table, creating labels only for cells not seen before"""
+        for position, (label, state) in self._pivot_cells.items():
+            if position not in cells and state is not None:
+                label.grid_remove()
+                self._pivot_cells[position] = (label, None)
+        
+        for (row, col), state in cells.items():
+            label, shown = self._pivot_cells.get((row, col), (None, None))
+            if shown == state:
+                continue
+            text, bold, anchor = state
+            if label is None:
+                label = ctk.CTkLabel(self.pivot_table, text=text, wraplength=120)
+            label.configure(text=text, font=get_font(12, "bold" if bold else "normal"), anchor=anchor)
+            label.grid(row=row, column=col, padx=8, pady=2, sticky="ew")
+            self._pivot_cells[(row, col)] = (label, state)
+    
+    def _show_pivot_message(self, text: str, table: bool = False):
+        """Show a note under the pivot table, or the note alone when there is no table"""
+        self.pivot_message.pack_forget()
+        if table:
+            self.pivot_table.pack(fill="x")
+        else:
+            self.pivot_table.pack_forget()
+        self.pivot_message.configure(text=text)
+        if text:
+            self.pivot_message.pack(pady=(4, 10) if table else 10)
+        else:
+            self.pivot_message.pack_forget()
+
 
+def _largest(totals: List[int], limit: int) -> List[int]:
+    """Indexes of the `limit` largest totals, in their original order"""
+    if len(totals) <= limit:
+        return list(range(len(totals)))
+    return sorted(sorted(range(len(totals)), key=lambda i: -totals[i])[:limit])
@@ -0,0 +1,363 @@
+"""Virtualized table: a fixed pool of row widgets rebound to data while scrolling"""
+import customtkinter as ctk
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+from app.database.paging import ListDataSource
+from app.gui.background import BackgroundLoader
+from app.gui.fonts import get_font
+
+
+class TableColumn(NamedTuple):
+    """Column definition"""
+    key: str
+    title: str
+    width: int = 120
+    weight: int = 0
+    anchor: str = "w"
+    max_chars: Optional[int] = None
+    formatter: Optional[Callable[[Any], str]] = None
+    badge_colors: Optional[Dict[str, str]] = None
+    bold: bool = False
+    sortable: bool = False
+
+
+def _cell_value(row: Any, key: str) -> Any:
+    if isinstance(row, dict):
+        return row.get(key)
+    return getattr(row, key, None)
+
+
+def _cell_text(column: TableColumn, value: Any) -> str:
+    if column.formatter:
+        text = column.formatter(value)
+    else:
+        text = "-" if value is None or value == "" else str(value)
+    if column.max_chars and len(text) > column.max_chars:
+        text = text[:column.max_chars] + "..."
+    return text
+
+
+class _TableRow:
+    """Row widgets reused for different data rows"""
+
+    def __init__(self, table: "VirtualTable", slot: int):
+        self.table = table
+        self.slot = slot
+        self.frame = ctk.CTkFrame(
+            table.body,
+            height=table.row_height,
+            corner_radius=3,
+            border_width=1,
+            border_color=("gray80", "gray20")
+        )
+        self.frame.grid_propagate(False)
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.labels: List[ctk.CTkLabel] = []
+        self._state: List[Any] = []
+
+        for col, column in enumerate(table.columns):
+            if column.badge_colors is not None:
+                label = ctk.CTkLabel(
+                    self.frame,
+                    text="",
+                    text_color="white",
+                    width=column.width,
+                    corner_radius=10,
+                    font=get_font(11, "bold")
+                )
+                label.grid(row=0, column=col, padx=5, pady=6)
+            else:
+                label = ctk.CTkLabel(
+                    self.frame,
+                    text="",
+                    width=column.width,
+                    anchor=column.anchor,
+                    font=get_font(12, "bold" if column.bold else "normal")
+                )
+                label.grid(row=0, column=col, padx=5, pady=6, sticky="ew")
+            if column.weight:
+                self.frame.grid_columnconfigure(col, weight=column.weight)
+            self.labels.append(label)
+            self._state.append(None)
+
+        for widget in [self.frame] + self.labels:
+            widget.bind("<Button-1>", self._on_click)
+            table._bind_wheel(widget)
+
+        self.frame.pack(fill="x", padx=5, pady=2)
+
+    def bind_row(self, row: Any):
+        """Show a data row, reconfiguring only the cells whose content changed"""
+        for col, column in enumerate(self.table.columns):
+            value = _cell_value(row, column.key)
+            text = _cell_text(column, value)
+            if column.badge_colors is not None:
+                state = (text, column.badge_colors.get(value, "gray"))
+                if self._state[col] != state:
+                    self.labels[col].configure(text=state[0], fg_color=state[1])
+            else:
+                state = (text, self.table.cell_color(row, column))
+                if self._state[col] != state:
+                    self.labels[col].configure(text=state[0], text_color=state[1])
+            self._state[col] = state
+
+    def bind_placeholder(self):
+        """Show a row whose page is still loading"""
+        for col, (column, label) in enumerate(zip(self.table.columns, self.labels)):
+            state = ("…" if col == 0 else "", "placeholder")
+            if self._state[col] != state:
+                if column.badge_colors is not None:
+                    label.configure(text=state[0], fg_color="transparent")
+                else:
+                    label.configure(text=state[0], text_color="gray")
+                self._state[col] = state
+
+    def clear(self):
+        """Blank the row (slot past the end of the data)"""
+        for col, label in enumerate(self.labels):
+            if self._state[col] is not None:
+                label.configure(text="", fg_color="transparent")
+                self._state[col] = None
+
+    def destroy(self):
+        self.frame.destroy()
+
+    def _on_click(self, event=None):
+        self.table._on_row_clicked(self.slot)
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Table that only creates as many row widgets as fit in the viewport
+
+    Data comes from a source with count(), peek_rows(offset, limit) and
+    missing_pages() (see app.database.paging); scrolling rebinds the pooled
+    rows. Rows of pages not cached yet are shown as placeholders while the
+    pages (and their neighbours) are read on a worker thread.
+    """
+
+    def __init__(
+        self,
+        parent,
+        columns: Sequence[TableColumn],
+        row_height: int = 40,
+        on_row_click: Optional[Callable[[Any], None]] = None,
+        empty_text: str = "📭 Нет данных",
+        on_header_click: Optional[Callable[[TableColumn], None]] = None,
+    ):
+        super().__init__(parent, fg_color="transparent")
+        self.row_height = row_height
+        self.on_row_click = on_row_click
+        self.on_header_click = on_header_click
+        self.sort_key: Optional[str] = None
+        self.sort_descending = False
+        self.empty_text = empty_text
+        self.columns: List[TableColumn] = list(columns)
+
+        self.source = ListDataSource([])
+        self.total = 0
+        self.offset = 0
+        self._rows: List[_TableRow] = []
+        self._bound: List[Any] = []
+        self._loading: Optional[tuple] = None  # (source, version, pages) of the pending page load
+        self.loader = BackgroundLoader(self)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.header = ctk.CTkFrame(self, corner_radius=5, fg_color=("gray75", "gray25"))
+        self.header.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=1, column=0, sticky="nsew")
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.message_label = ctk.CTkLabel(self.body, text="", font=get_font(16), justify="center", wraplength=600)
+
+        self._build_header()
+
+    # --- configuration ---
+
+    def set_columns(self, columns: Sequence[TableColumn]):
+        """Replace column definitions (rebuilds header and row pool)"""
+        self.columns = list(columns)
+        for widget in self.header.winfo_children():
+            widget.destroy()
+        self._build_header()
+        for row in self._rows:
+            row.destroy()
+        self._rows = []
+        self._ensure_pool()
+        self._render()
+
+    def _build_header(self):
+        self.header_labels: List[ctk.CTkLabel] = []
+        for col, column in enumerate(self.columns):
+            label = ctk.CTkLabel(
+                self.header,
+                text=column.title,
+                font=get_font(12, "bold"),
+                width=column.width
+            )
+            label.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
+            if column.weight:
+                self.header.grid_columnconfigure(col, weight=column.weight)
+            if column.sortable and self.on_header_click:
+                label.configure(cursor="hand2")
+                label.bind("<Button-1>", lambda e, c=column: self.on_header_click(c))
+            self.header_labels.append(label)
+        self._update_header_titles()
+    
+    def set_sort_indicator(self, key: Optional[str], descending: bool = False):
+        """Mark the sorted column in the header"""
+        self.sort_key = key
+        self.sort_descending = descending
+        self._update_header_titles()
+    
+    def _update_header_titles(self):
+        for column, label in zip(self.columns, self.header_labels):
+            title = column.title
+            if column.key == self.sort_key:
+                title += " ▼" if self.sort_descending else " ▲"
+            label.configure(text=title)
+
+    def cell_color(self, row: Any, column: TableColumn):
+        """Text color of a regular cell (override or replace for highlighting)"""
+        return ("gray10", "gray90")
+
+    # --- data ---
+
+    def set_source(self, source, keep_offset: bool = False):
+        """Bind a data source and render from the top (or the current offset)"""
+        self.source = source
+        self.total = source.count()
+        if not keep_offset:
+            self.offset = 0
+        self._clamp_offset()
+        self._render()
+
+    def refresh(self):
+        """Re-read count and visible rows from the current source"""
+        self.total = self.source.count()
+        self._clamp_offset()
+        self._render()
+
+    def show_message(self, text: str, color: Optional[str] = None):
+        """Replace rows with a centered message (empty/error states)"""
+        self.source = ListDataSource([])
+        self.total = 0
+        self.offset = 0
+        self._render(message=text, color=color)
+
+    def visible_rows(self) -> List[Any]:
+        """Data rows currently bound to widgets (placeholders excluded)"""
+        return [row for row in self._bound if row is not None]
+
+    # --- viewport ---
+
+    def _visible_capacity(self) -> int:
+        height = self.body.winfo_height()
+        slot = self._apply_widget_scaling(self.row_height + 4)
+        return max(1, int(height // slot)) if height > 1 else 1
+
+    def _ensure_pool(self) -> bool:
+        """Grow/shrink the row pool to the viewport; returns True if it changed"""
+        capacity = self._visible_capacity()
+        changed = False
+        while len(self._rows) < capacity:
+            self._rows.append(_TableRow(self, len(self._rows)))
+            changed = True
+        while len(self._rows) > capacity:
+            self._rows.pop().destroy()
+            changed = True
+        return changed
+
+    def _clamp_offset(self):
+        max_offset = max(0, self.total - len(self._rows))
+        self.offset = min(max(0, self.offset), max_offset)
+
+    def _on_resize(self, event=None):
+        if self._ensure_pool():
+            self._clamp_offset()
+            self._render()
+
+    def _render(self, message: Optional[str] = None, color: Optional[str] = None):
+        if self.total == 0:
+            for row in self._rows:
+                row.clear()
+            self._bound = []
+            self.message_label.configure(text=message or self.empty_text, text_color=color or ("gray10", "gray90"))
+            self.message_label.place(relx=0.5, rely=0.1, anchor="n")
+            self.message_label.lift()
+            self.scrollbar.set(0, 1)
+            return
+
+        self.message_label.place_forget()
+        self._bound = list(self.source.peek_rows(self.offset, len(self._rows)))
+        for slot, row in enumerate(self._rows):
+            if slot >= len(self._bound):
+                row.clear()
+            elif self._bound[slot] is None:
+                row.bind_placeholder()
+            else:
+                row.bind_row(self._bound[slot])
+        self._load_missing_pages()
+
+        first = self.offset / self.total
+        last = min(1.0, (self.offset + len(self._rows)) / self.total)
+        self.scrollbar.set(first, last)
+
+    def _load_missing_pages(self):
+        """Read uncached pages around the viewport in the background, then rebind"""
+        source = self.source
+        missing = source.missing_pages(self.offset, len(self._rows))
+        if not missing:
+            return
+        version = source.version
+        if self.loader.is_pending("pages") and self._loading == (source, version, missing):
+            return
+        self._loading = (source, version, missing)
+
+        def stored(pages):
+            if self.source is source and source.store_pages(pages, version):
+                self._render()
+
+        self.loader.submit("pages", lambda: source.fetch_pages(missing), stored, self._on_pages_error)
+
+    def _on_pages_error(self, e: Exception):
+        self.show_message(f"❌ Ошибка загрузки строк: {e}", color="red")
+
+    def scroll_to(self, offset: int):
+        """Scroll so that row `offset` is the first visible one"""
+        previous = self.offset
+        self.offset = offset
+        self._clamp_offset()
+        if self.offset != previous:
+            self._render()
+
+    def _on_scrollbar(self, action: str, value, unit: Optional[str] = None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.total))
+        elif action == "scroll":
+            step = int(value)
+            if unit == "pages":
+                step *= len(self._rows)
+            self.scroll_to(self.offset + step)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mouse_wheel)
+        widget.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 3))
+        widget.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 3))
+
+    def _on_mouse_wheel(self, event):
+        if abs(event.delta) >= 120:
+            steps = -int(event.delta / 40)  # Windows: 120 per notch -> 3 rows
+        else:
+            steps = -event.delta  # macOS: small deltas
+        self.scroll_to(self.offset + steps)
+
+    def _on_row_clicked(self, slot: int):
+        if self.on_row_click and slot < len(self._bound) and self._bound[slot] is not None:
+            self.on_row_click(self._bound[slot])
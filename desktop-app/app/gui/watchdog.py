@@ -0,0 +1,191 @@
+"""Main loop responsiveness watchdog (opt-in instrumentation)
+
+A heartbeat after() callback stamps the time each time the Tk event loop gets
+to run it; a watchdog thread notices when the stamp gets old (a stall),
+samples the main thread's stack while it lasts and attributes the stalled
+time to the view method that was running.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.utils.logger import logger
+
+APP_DIR = str(Path(__file__).resolve().parent.parent)
+
+
+def _frame_label(frame) -> Optional[str]:
+    """'ViewClass.method' for frames of bound methods inside the app package"""
+    code = frame.f_code
+    if not code.co_filename.startswith(APP_DIR):
+        return None
+    owner = frame.f_locals.get("self")
+    if owner is None:
+        return f"{Path(code.co_filename).stem}.{code.co_name}"
+    return f"{type(owner).__name__}.{code.co_name}"
+
+
+def attribute_stack(frame) -> Tuple[Optional[str], List[str]]:
+    """(innermost app method, stack labels outermost first) of a sampled frame
+
+    refresh_* methods take precedence over helpers they call, so the report
+    names the refresh that caused the stall.
+    """
+    labels = []
+    while frame is not None:
+        label = _frame_label(frame)
+        if label:
+            labels.append(label)
+        frame = frame.f_back
+    labels.reverse()
+
+    for label in reversed(labels):
+        if ".refresh_" in label:
+            return label, labels
+    return (labels[-1] if labels else None), labels
+
+
+class MainLoopWatchdog:
+    """Measures event-loop latency and samples the main thread during stalls"""
+
+    def __init__(
+        self,
+        root,
+        interval_ms: int = 50,
+        stall_threshold: float = 0.2,
+        sample_interval: float = 0.02,
+    ):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.stall_threshold = stall_threshold
+        self.sample_interval = sample_interval
+
+        self._main_thread_id = threading.main_thread().ident
+        self._last_beat = time.perf_counter()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Frame times: heartbeat lateness, in seconds
+        self.beats = 0
+        self.max_lateness = 0.0
+        self._lateness: List[float] = []
+
+        # Stalls
+        self.stalls: List[Dict] = []
+        self._stall_samples: Counter = Counter()
+        self._stall_stacks: Counter = Counter()
+        self._stall_started: Optional[float] = None
+        self.method_time: Counter = Counter()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._last_beat = time.perf_counter()
+        self.root.after(self.interval_ms, self._heartbeat)
+        self._thread = threading.Thread(target=self._watch, name="ui-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"UI watchdog started (heartbeat {self.interval_ms} ms, stall threshold {self.stall_threshold * 1000:.0f} ms)"
+        )
+
+    def stop(self):
+        self._running = False
+
+    def _heartbeat(self):
+        if not self._running:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            lateness = max(0.0, now - self._last_beat - self.interval_ms / 1000)
+            self._last_beat = now
+            self.beats += 1
+            self.max_lateness = max(self.max_lateness, lateness)
+            self._lateness.append(lateness)
+            if len(self._lateness) > 10000:
+                del self._lateness[:5000]
+            stall_started = self._stall_started
+            self._stall_started = None
+        if stall_started is not None:
+            self._finish_stall(now - stall_started)
+        try:
+            self.root.after(self.interval_ms, self._heartbeat)
+        except Exception:
+            self._running = False
+
+    def _watch(self):
+        while self._running:
+            time.sleep(self.sample_interval)
+            with self._lock:
+                lag = time.perf_counter() - self._last_beat - self.interval_ms / 1000
+                if lag < self.stall_threshold:
+                    continue
+                if self._stall_started is None:
+                    self._stall_started = self._last_beat + self.interval_ms / 1000
+            self._sample()
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is None:
+            return
+        method, labels = attribute_stack(frame)
+        with self._lock:
+            self._stall_samples[method or "<tk/idle>"] += 1
+            self._stall_stacks[" > ".join(labels) or "<tk/idle>"] += 1
+
+    def _finish_stall(self, duration: float):
+        with self._lock:
+            samples, self._stall_samples = self._stall_samples, Counter()
+            stacks, self._stall_stacks = self._stall_stacks, Counter()
+
+        total = sum(samples.values())
+        culprit = samples.most_common(1)[0][0] if samples else "<unknown>"
+        for method, count in samples.items():
+            # Split the stall between sampled methods proportionally
+            self.method_time[method] += duration * count / total
+        self.stalls.append({
+            "duration": duration,
+            "method": culprit,
+            "stack": stacks.most_common(1)[0][0] if stacks else "",
+        })
+        logger.warning(f"UI stall {duration * 1000:.0f} ms in {culprit}")
+
+    def frame_stats(self) -> Dict[str, float]:
+        """Heartbeat lateness percentiles (ms)"""
+        with self._lock:
+            values = sorted(self._lateness)
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "p50": values[len(values) // 2] * 1000,
+            "p95": values[int(len(values) * 0.95) - 1 if len(values) > 1 else 0] * 1000,
+            "max": self.max_lateness * 1000,
+        }
+
+    def report(self) -> str:
+        """Human-readable summary: frame times, stalls and slow methods"""
+        stats = self.frame_stats()
+        lines = [
+            "UI watchdog report",
+            f"  heartbeats: {self.beats}, lateness p50 {stats['p50']:.0f} ms, "
+            f"p95 {stats['p95']:.0f} ms, max {stats['max']:.0f} ms",
+            f"  stalls over {self.stall_threshold * 1000:.0f} ms: {len(self.stalls)}, "
+            f"total {sum(s['duration'] for s in self.stalls) * 1000:.0f} ms",
+        ]
+        if self.method_time:
+            lines.append("  time in stalls by method:")
+            for method, seconds in self.method_time.most_common(15):
+                marker = "  <- slow refresh" if ".refresh_" in method else ""
+                lines.append(f"    {seconds * 1000:8.0f} ms  {method}{marker}")
+        worst = sorted(self.stalls, key=lambda s: s["duration"], reverse=True)[:5]
+        if worst:
+            lines.append("  longest stalls:")
+            for stall in worst:
+                lines.append(f"    {stall['duration'] * 1000:8.0f} ms  {stall['method']}")
+                if stall["stack"]:
+                    lines.append(f"              {stall['stack']}")
+        return "\n".join(lines)
+
@@ -0,0 +1,130 @@
+"""Accounting queries: event totals (in kopecks) and paged ledger"""
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database.models import AccountingEntry, PaymentMethod, PaidFor
+from app.database.paging import PagedDataSource
+from app.database.types import minor_units
+
+
+class AccountingRow(NamedTuple):
+    """Displayed columns of a ledger entry (amount in kopecks)"""
+    id: int
+    created_at: Optional[datetime]
+    amount: int
+    method: Optional[PaymentMethod]
+    paid_for: Optional[PaidFor]
+    description: Optional[str]
+
+
+class AccountingQueryService:
+    """Computes accounting totals in SQL and pages the ledger separately"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _active_entries(self, local_event_id: int):
+        """Filter conditions for non-deleted entries of an event"""
+        return (
+            AccountingEntry.event_id == local_event_id,
+            AccountingEntry.deleted_at.is_(None),
+        )
+
+    def _sum(self, column):
+        """Integer SUM over a money column (kopecks, no Decimal conversion)"""
+        return func.coalesce(func.sum(minor_units(column)), 0)
+
+    def _grouped(self, local_event_id: int, column) -> List[Tuple[Any, int, int, int]]:
+        """(group key, amount, discount, entries) rows grouped by a column"""
+        rows = self.db.query(
+            column,
+            self._sum(AccountingEntry.amount),
+            self._sum(AccountingEntry.discount_amount),
+            func.count(AccountingEntry.id),
+        ).filter(
+            *self._active_entries(local_event_id)
+        ).group_by(column).all()
+        return [tuple(row) for row in rows]
+
+    def get_totals(self, local_event_id: int) -> Dict[str, Any]:
+        """Totals (kopecks) for the whole event by method, by purpose and by payment group"""
+        by_method = {method: 0 for method in PaymentMethod}
+        by_paid_for = {paid_for: 0 for paid_for in PaidFor}
+        total_amount = 0
+        total_discount = 0
+        entries_count = 0
+
+        for method, amount, discount, count in self._grouped(local_event_id, AccountingEntry.method):
+            by_method[method] = amount
+            total_amount += amount
+            total_discount += discount
+            entries_count += count
+
+        for paid_for, amount, _, _ in self._grouped(local_event_id, AccountingEntry.paid_for):
+            by_paid_for[paid_for] = amount
+
+        groups_rows = self.db.query(
+            AccountingEntry.payment_group_id,
+            func.max(AccountingEntry.payment_group_name),
+            self._sum(AccountingEntry.amount),
+            self._sum(AccountingEntry.discount_amount),
+            func.count(AccountingEntry.id),
+        ).filter(
+            *self._active_entries(local_event_id),
+            AccountingEntry.payment_group_id.isnot(None),
+        ).group_by(AccountingEntry.payment_group_id).all()
+
+        by_group = [
+            {
+                "payment_group_id": group_id,
+                "payment_group_name": name,
+                "amount": amount,
+                "discount": discount,
+                "entries": count,
+            }
+            for group_id, name, amount, discount, count in groups_rows
+        ]
+
+        return {
+            "total": total_amount,
+            "discount": total_discount,
+            "entries": entries_count,
+            "by_method": by_method,
+            "by_paid_for": by_paid_for,
+            "by_group": by_group,
+        }
+
+    def count_entries(self, local_event_id: int) -> int:
+        """Number of non-deleted ledger entries of an event"""
+        return self.db.query(AccountingEntry.id).filter(*self._active_entries(local_event_id)).count()
+
+    def get_rows(self, local_event_id: int, offset: int = 0, limit: int = 100) -> List[AccountingRow]:
+        """Ledger rows (newest first) as compact projections"""
+        rows = self.db.query(
+            AccountingEntry.id,
+            AccountingEntry.created_at,
+            minor_units(AccountingEntry.amount),
+            AccountingEntry.method,
+            AccountingEntry.paid_for,
+            AccountingEntry.description,
+        ).filter(
+            *self._active_entries(local_event_id)
+        ).order_by(
+            AccountingEntry.created_at.desc(), AccountingEntry.id.desc()
+        ).offset(offset).limit(limit).all()
+        return [AccountingRow(*row) for row in rows]
+
+
+class AccountingLedgerSource(PagedDataSource):
+    """Paged ledger of one event, independent from the totals"""
+
+    def __init__(self, local_event_id: int, **kwargs):
+        super().__init__(**kwargs)
+        self.local_event_id = local_event_id
+
+    def _count_rows(self, db: Session) -> int:
+        return AccountingQueryService(db).count_entries(self.local_event_id)
+
+    def _fetch(self, db: Session, offset: int, limit: int) -> List[AccountingRow]:
+        return AccountingQueryService(db).get_rows(self.local_event_id, offset, limit)
@@ -113,6 +113,37 @@ class AuthService:
         
         return False
     
+    def check_token(self) -> Optional[bool]:
+        """Validate the current token: True - valid, False - rejected (auth cleared), None - server unreachable
+        
+        Unlike is_token_valid(), a network failure keeps the saved authentication,
+        so the app can keep working offline and revalidate later.
+        """
+        if not self.token:
+            return False
+        
+        try:
+            self.api.get("/api/reference/events")
+        except AuthenticationError as e:
+            logger.info(f"Saved token rejected: {e}")
+        except APIError as e:
+            if e.status_code not in (401, 403):
+                logger.info(f"Token validation skipped, server unavailable: {e}")
+                return None
+            logger.info(f"Saved token rejected: {e}")
+        except Exception as e:
+            logger.info(f"Token validation skipped, server unavailable: {e}")
+            return None
+        else:
+            if self.current_user:
+                save_auth_data(self.token, self.current_user)
+            return True
+        
+        clear_auth_data()
+        self.current_user = None
+        self.token = None
+        return False
+    
     def is_authenticated(self) -> bool:
         """Check if user is authenticated"""
         return self.token is not None and self.current_user is not None
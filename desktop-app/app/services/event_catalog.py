@@ -0,0 +1,176 @@
+"""In-memory event catalogue shared by all views"""
+import threading
+import weakref
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple
+from app.utils.logger import logger
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+PLACEHOLDER = "Выберите событие"
+
+
+class EventSummary(NamedTuple):
+    """Event fields used by lists and dropdowns"""
+    id: int
+    server_id: Optional[int]
+    name: str
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+    status: str
+
+    @property
+    def label(self) -> str:
+        """Dropdown label"""
+        return f"{self.name} (ID: {self.server_id or self.id})"
+
+
+class EventCatalog:
+    """Events loaded once (newest first) and reused until invalidated
+
+    Loading is thread-safe: views read the catalogue in loader jobs, so the
+    first load and the reload after invalidate() stay off the main thread.
+    invalidate() and subscriber notifications happen on the calling (main) thread;
+    subscribers should only schedule such a job.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], "Session"]] = None):
+        self.session_factory = session_factory  # None - app.database.session, imported on first load
+        self._lock = threading.Lock()
+        self._events: Optional[List[EventSummary]] = None
+        self._dropdowns: Dict[bool, List[str]] = {}
+        # (weak callback, weak widget): a destroyed view is not kept alive by the catalogue
+        self._subscribers: List[Tuple[Callable[[], Optional[Callable[[], None]]], Optional[weakref.ref]]] = []
+
+    def _load(self) -> List[EventSummary]:
+        # Imported here: the login screen and main window do not need the ORM
+        from app.database.models import Event
+
+        if self.session_factory is None:
+            from app.database.session import get_db_session
+            self.session_factory = get_db_session
+        db = self.session_factory()
+        try:
+            rows = db.query(
+                Event.id,
+                Event.server_id,
+                Event.name,
+                Event.start_date,
+                Event.end_date,
+                Event.status,
+            ).order_by(Event.start_date.desc()).all()
+        finally:
+            db.close()
+        return [
+            EventSummary(
+                id=row[0],
+                server_id=row[1],
+                name=row[2],
+                start_date=row[3],
+                end_date=row[4],
+                status=row[5].value if row[5] else "DRAFT",
+            )
+            for row in rows
+        ]
+
+    @property
+    def events(self) -> List[EventSummary]:
+        """All events, loaded on first access"""
+        with self._lock:
+            if self._events is None:
+                self._events = self._load()
+                self._dropdowns = {}
+                logger.debug(f"Event catalogue loaded: {len(self._events)} events")
+            return self._events
+
+    def find(self, event_id: Optional[int]) -> Optional[EventSummary]:
+        """Event by server ID or local ID"""
+        if not event_id:
+            return None
+        for event in self.events:
+            if event.server_id == event_id:
+                return event
+        for event in self.events:
+            if event.id == event_id:
+                return event
+        return None
+
+    def dropdown_values(self, synced_only: bool = False) -> List[str]:
+        """Combobox values (placeholder first), computed once per catalogue load"""
+        events = self.events
+        with self._lock:
+            values = self._dropdowns.get(synced_only)
+            if values is None:
+                values = [PLACEHOLDER] + [
+                    event.label for event in events
+                    if event.server_id is not None or not synced_only
+                ]
+                self._dropdowns[synced_only] = values
+            return values
+
+    def label_for(self, event_id: Optional[int]) -> Optional[str]:
+        """Dropdown label of an event, if it is in the catalogue"""
+        event = self.find(event_id)
+        return event.label if event else None
+
+    def subscribe(self, callback: Callable[[], None], widget=None):
+        """Call callback() after invalidation; dropped once `widget` (or the callback's object) is gone"""
+        if hasattr(callback, "__self__"):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback  # noqa: E731 - plain functions are kept
+        widget_ref = weakref.ref(widget) if widget is not None else None
+        with self._lock:
+            self._subscribers = [entry for entry in self._subscribers if _subscriber_alive(entry)]
+            self._subscribers.append((ref, widget_ref))
+
+    def unsubscribe(self, callback: Callable[[], None]):
+        with self._lock:
+            self._subscribers = [entry for entry in self._subscribers if entry[0]() != callback]
+
+    def invalidate(self):
+        """Drop cached events (e.g. after a sync changed them) and notify subscribers"""
+        with self._lock:
+            self._events = None
+            self._dropdowns = {}
+            self._subscribers = [entry for entry in self._subscribers if _subscriber_alive(entry)]
+            subscribers = list(self._subscribers)
+
+        # Called outside the lock: callbacks may read the catalogue
+        for ref, _ in subscribers:
+            callback = ref()
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error notifying event catalogue subscriber: {e}")
+
+
+def _widget_exists(widget) -> bool:
+    try:
+        return bool(widget.winfo_exists())
+    except Exception:
+        return False
+
+
+def _subscriber_alive(entry) -> bool:
+    ref, widget_ref = entry
+    if ref() is None:
+        return False
+    if widget_ref is None:
+        return True
+    widget = widget_ref()
+    return widget is not None and _widget_exists(widget)
+
+
+_catalog: Optional[EventCatalog] = None
+
+
+def get_event_catalog() -> EventCatalog:
+    """Application-wide event catalogue"""
+    global _catalog
+    if _catalog is None:
+        _catalog = EventCatalog()
+    return _catalog
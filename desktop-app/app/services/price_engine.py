@@ -0,0 +1,175 @@
+"""Local price engine: required/paid amounts and payment statuses per registration
+
+Mirrors recalculateRegistrationPaymentStatus from the backend's paymentService.ts,
+but computes a whole event at once. Amounts are read and compared as raw
+integer kopecks (no Decimal conversion).
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, update, bindparam
+from sqlalchemy.orm import Session
+from app.database.models import (
+    AccountingEntry, Event, EventPrice, Registration, PaidFor, PaymentStatus
+)
+from app.database.types import minor_units
+from app.utils.money import from_minor
+
+
+class RegistrationAmounts(NamedTuple):
+    """Required and paid amounts of a registration, in kopecks"""
+    registration_id: int
+    performance_required: int
+    performance_paid: int
+    diplomas_required: int
+    diplomas_paid: int
+
+
+def payment_status_for(amounts: RegistrationAmounts) -> Tuple[PaymentStatus, bool, bool]:
+    """Payment status and paid flags, following the backend rules"""
+    performance_ok = abs(amounts.performance_paid - amounts.performance_required) < 1
+    diplomas_ok = abs(amounts.diplomas_paid - amounts.diplomas_required) < 1
+
+    if performance_ok and diplomas_ok:
+        status = PaymentStatus.PAID
+    elif performance_ok:
+        status = PaymentStatus.PERFORMANCE_PAID
+    elif diplomas_ok:
+        status = PaymentStatus.DIPLOMAS_PAID
+    else:
+        status = PaymentStatus.UNPAID
+    return status, performance_ok, diplomas_ok
+
+
+class PriceEngine:
+    """Computes amounts and payment statuses for all registrations of an event"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _registration_filter(self, local_event_id: int, registration_ids: Optional[Iterable[int]]) -> list:
+        """Filter conditions selecting the event's registrations (or a subset)"""
+        conditions = [Registration.event_id == local_event_id]
+        if registration_ids is not None:
+            conditions.append(Registration.id.in_(list(registration_ids)))
+        return conditions
+
+    def compute_event(
+        self,
+        local_event_id: int,
+        registration_ids: Optional[Iterable[int]] = None,
+    ) -> List[RegistrationAmounts]:
+        """Required and paid amounts for an event's registrations (or a subset)"""
+        event = self.db.query(
+            minor_units(Event.price_per_diploma), minor_units(Event.price_per_medal)
+        ).filter(Event.id == local_event_id).first()
+        if not event:
+            return []
+        price_per_diploma = event[0] or 0
+        price_per_medal = event[1] or 0
+
+        prices = {
+            nomination_id: (per_participant or 0, per_federation)
+            for nomination_id, per_participant, per_federation in self.db.query(
+                EventPrice.nomination_id,
+                minor_units(EventPrice.price_per_participant),
+                minor_units(EventPrice.price_per_federation_participant),
+            ).filter(EventPrice.event_id == local_event_id).all()
+        }
+
+        reg_filter = self._registration_filter(local_event_id, registration_ids)
+        registrations = self.db.query(
+            Registration.id,
+            Registration.nomination_id,
+            Registration.participants_count,
+            Registration.federation_participants_count,
+            Registration.diplomas_count,
+            Registration.medals_count,
+        ).filter(*reg_filter).all()
+
+        # Paid amounts: one GROUP BY over the event's non-deleted entries
+        paid: Dict[Tuple[int, PaidFor], int] = {}
+        for registration_id, paid_for, amount in self.db.query(
+            AccountingEntry.registration_id,
+            AccountingEntry.paid_for,
+            func.sum(minor_units(AccountingEntry.amount)),
+        ).join(
+            Registration, AccountingEntry.registration_id == Registration.id
+        ).filter(
+            *reg_filter,
+            AccountingEntry.deleted_at.is_(None),
+        ).group_by(AccountingEntry.registration_id, AccountingEntry.paid_for).all():
+            paid[(registration_id, paid_for)] = amount or 0
+
+        result = []
+        for reg_id, nomination_id, participants, federation, diplomas, medals in registrations:
+            participants = participants or 0
+            federation = federation or 0
+
+            performance_required = 0
+            price = prices.get(nomination_id)
+            if price:
+                per_participant, per_federation = price
+                regular_count = max(0, participants - federation)
+                performance_required = (
+                    per_participant * regular_count
+                    + (per_federation or per_participant) * federation
+                )
+
+            result.append(RegistrationAmounts(
+                registration_id=reg_id,
+                performance_required=performance_required,
+                performance_paid=paid.get((reg_id, PaidFor.PERFORMANCE), 0),
+                diplomas_required=price_per_diploma * (diplomas or 0) + price_per_medal * (medals or 0),
+                diplomas_paid=paid.get((reg_id, PaidFor.DIPLOMAS_MEDALS), 0),
+            ))
+        return result
+
+    def recalculate_event(
+        self,
+        local_event_id: int,
+        registration_ids: Optional[Iterable[int]] = None,
+    ) -> int:
+        """Recompute payment statuses of an event and write back changed rows; returns changed count"""
+        amounts = self.compute_event(local_event_id, registration_ids)
+        if not amounts:
+            return 0
+
+        current = {
+            row[0]: row[1:]
+            for row in self.db.query(
+                Registration.id,
+                Registration.payment_status,
+                Registration.performance_paid,
+                Registration.diplomas_and_medals_paid,
+                minor_units(Registration.paid_amount),
+            ).filter(*self._registration_filter(local_event_id, registration_ids)).all()
+        }
+
+        changes = []
+        for item in amounts:
+            status, performance_ok, diplomas_ok = payment_status_for(item)
+            paid_total = item.performance_paid + item.diplomas_paid
+            new_values = (status, performance_ok, diplomas_ok, paid_total)
+            old_status, old_performance, old_diplomas, old_paid = current.get(item.registration_id, (None,) * 4)
+            if (old_status, bool(old_performance), bool(old_diplomas), old_paid or 0) != new_values:
+                changes.append({
+                    "reg_id": item.registration_id,
+                    "payment_status": status,
+                    "performance_paid": performance_ok,
+                    "diplomas_and_medals_paid": diplomas_ok,
+                    "paid_amount": from_minor(paid_total),
+                })
+
+        if changes:
+            self.db.execute(
+                update(Registration.__table__).where(
+                    Registration.__table__.c.id == bindparam("reg_id")
+                ).values(
+                    payment_status=bindparam("payment_status"),
+                    performance_paid=bindparam("performance_paid"),
+                    diplomas_and_medals_paid=bindparam("diplomas_and_medals_paid"),
+                    paid_amount=bindparam("paid_amount"),
+                ),
+                changes,
+            )
+            self.db.commit()
+        return len(changes)
@@ -0,0 +1,161 @@
+"""Multi-dimensional statistics over an event's registrations"""
+from array import array
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.database.models import Registration, Discipline, Nomination, Age, Category
+
+# Dimension name -> (registration column, reference model)
+DIMENSIONS = {
+    "discipline": (Registration.discipline_id, Discipline),
+    "nomination": (Registration.nomination_id, Nomination),
+    "age": (Registration.age_id, Age),
+    "category": (Registration.category_id, Category),
+}
+
+DIMENSION_LABELS = {
+    "discipline": "Дисциплина",
+    "nomination": "Номинация",
+    "age": "Возраст",
+    "category": "Категория",
+}
+
+MEASURES = ("count", "participants", "federation_participants", "diplomas", "medals")
+
+MEASURE_COLUMNS = (
+    Registration.participants_count,
+    Registration.federation_participants_count,
+    Registration.diplomas_count,
+    Registration.medals_count,
+)
+
+Key = Tuple[int, ...]
+Totals = List[int]
+
+
+def _add(target: Totals, source: Sequence[int]):
+    """Add measure vector in place"""
+    for i, value in enumerate(source):
+        target[i] += value
+
+
+class EventCube:
+    """Columnar registration data of one event with cached group-by cubes"""
+
+    def __init__(self, columns: Dict[str, array], names: Dict[str, Dict[int, str]]):
+        self.columns = columns
+        self.names = names
+        self.size = len(columns["discipline"])
+        self._base = self._group_base()
+        self._cubes: Dict[Tuple[str, ...], Dict[Key, Totals]] = {}
+
+    def _group_base(self) -> Dict[Key, Totals]:
+        """Single pass over the rows, grouping by all dimensions at once"""
+        base: Dict[Key, Totals] = {}
+        keys = zip(*(self.columns[dim] for dim in DIMENSIONS))
+        values = zip(*(self.columns[m] for m in MEASURES[1:]))
+        for key, (participants, federation, diplomas, medals) in zip(keys, values):
+            totals = base.get(key)
+            if totals is None:
+                base[key] = [1, participants, federation, diplomas, medals]
+            else:
+                totals[0] += 1
+                totals[1] += participants
+                totals[2] += federation
+                totals[3] += diplomas
+                totals[4] += medals
+        return base
+
+    def cube(self, dims: Sequence[str], filters: Optional[Dict[str, int]] = None) -> Dict[Key, Totals]:
+        """Totals grouped by the given dimensions, optionally restricted by filters"""
+        dims = tuple(dims)
+        if not filters and dims in self._cubes:
+            return self._cubes[dims]
+
+        all_dims = tuple(DIMENSIONS)
+        positions = [all_dims.index(dim) for dim in dims]
+        conditions = [(all_dims.index(dim), value) for dim, value in (filters or {}).items()]
+
+        # Roll up from the finest grouping instead of rescanning rows
+        result: Dict[Key, Totals] = {}
+        for base_key, totals in self._base.items():
+            if any(base_key[pos] != value for pos, value in conditions):
+                continue
+            key = tuple(base_key[pos] for pos in positions)
+            target = result.get(key)
+            if target is None:
+                result[key] = list(totals)
+            else:
+                _add(target, totals)
+
+        if not filters:
+            self._cubes[dims] = result
+        return result
+
+    def all_cubes(self) -> Dict[Tuple[str, ...], Dict[Key, Totals]]:
+        """Every group-by combination of the dimensions (including the grand total)"""
+        dims = tuple(DIMENSIONS)
+        for size in range(len(dims) + 1):
+            for combo in combinations(dims, size):
+                self.cube(combo)
+        return dict(self._cubes)
+
+    def totals(self) -> Totals:
+        """Grand totals"""
+        return self.cube(()).get((), [0] * len(MEASURES))
+
+    def pivot(self, row_dim: str, col_dim: str, measure: str = "count") -> Tuple[List[int], List[int], List[List[int]]]:
+        """Pivot table of one measure: row keys, column keys and value matrix"""
+        index = MEASURES.index(measure)
+        cells = self.cube((row_dim, col_dim))
+        row_keys = sorted({key[0] for key in cells}, key=lambda k: self.name(row_dim, k))
+        col_keys = sorted({key[1] for key in cells}, key=lambda k: self.name(col_dim, k))
+        matrix = [
+            [cells[(row, col)][index] if (row, col) in cells else 0 for col in col_keys]
+            for row in row_keys
+        ]
+        return row_keys, col_keys, matrix
+
+    def breakdown(self, dim: str, filters: Optional[Dict[str, int]] = None) -> List[Tuple[int, str, Totals]]:
+        """Rows of (key, name, totals) for one dimension, sorted by count descending"""
+        groups = self.cube((dim,), filters)
+        rows = [(key[0], self.name(dim, key[0]), totals) for key, totals in groups.items()]
+        rows.sort(key=lambda row: (-row[2][0], row[1]))
+        return rows
+
+    def name(self, dim: str, key: int) -> str:
+        """Display name of a dimension value"""
+        if not key:
+            return "—"
+        return self.names[dim].get(key, f"#{key}")
+
+
+class StatisticsEngine:
+    """Builds event cubes from the local database"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(self, local_event_id: int) -> EventCube:
+        """Load the event's integer columns in one query into columnar arrays"""
+        rows = self.db.query(
+            *(column for column, _ in DIMENSIONS.values()),
+            *MEASURE_COLUMNS,
+        ).filter(
+            Registration.event_id == local_event_id
+        ).all()
+
+        names = list(DIMENSIONS) + list(MEASURES[1:])
+        columns = {name: array("q") for name in names}
+        if rows:
+            for name, values in zip(names, zip(*rows)):
+                columns[name].extend(value or 0 for value in values)
+
+        return EventCube(columns, self._load_names())
+
+    def _load_names(self) -> Dict[str, Dict[int, str]]:
+        """Reference names for each dimension"""
+        return {
+            dim: dict(self.db.query(model.id, model.name).all())
+            for dim, (_, model) in DIMENSIONS.items()
+        }
@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     # API Configuration
     api_base_url: str = "http://localhost:5000/api"
     api_timeout: int = 30
+    api_capture: str = ""  # file or directory to record API traffic into (empty - off)
     
     # Sync Configuration
     sync_interval: int = 60  # seconds
@@ -26,6 +27,15 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
     log_file: str = "./logs/app.log"
+    log_json: bool = False  # structured (JSON lines) log file
+    
+    # Diagnostics
+    ui_watchdog: bool = False  # main loop stall detection and sampling
+    ui_stall_threshold_ms: int = 200
+    memory_monitor: bool = False  # periodic memory samples and leak report
+    memory_interval_s: int = 300
+    profile_span: str = ""  # span name or glob to profile, e.g. sync.registrations
+    profile_mode: str = "cprofile"  # cprofile | sample
     
     # Application
     app_name: str = "FTR Registration"
@@ -1,6 +1,9 @@
 """Logging configuration"""
 import sys
+import threading
+from collections import Counter
 from pathlib import Path
+from typing import Dict, Optional
 from loguru import logger
 from app.utils.config import get_log_dir, settings
 
@@ -19,16 +22,73 @@ logger.add(
     colorize=True,
 )
 
-# Add file handler
+# Add file handler - written by a background thread (enqueue) so logging never
+# waits on disk or rotation; LOG_JSON=true writes one JSON object per line
 logger.add(
-    log_dir / "app.log",
+    log_dir / ("app.jsonl" if settings.log_json else "app.log"),
     format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}",
     level=settings.log_level,
     rotation="10 MB",
     retention="7 days",
     compression="zip",
+    enqueue=True,
+    serialize=settings.log_json,
 )
 
+
+class LogAggregator:
+    """Collapses repeated messages of a hot loop into counts
+    
+    The first `limit` messages per key are logged as usual, further ones are
+    only counted; flush() (called when the phase changes and at the end) logs
+    one summary line per key that was suppressed.
+    """
+    
+    def __init__(self, limit: int = 5, level: str = "WARNING"):
+        self.limit = limit
+        self.level = level
+        self.phase: Optional[str] = None
+        self._counts: Counter = Counter()
+        self._levels: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def set_phase(self, phase: Optional[str]):
+        """Start a new phase, summarising the previous one"""
+        if phase != self.phase:
+            self.flush()
+            self.phase = phase
+    
+    def log(self, key: str, message: str, level: Optional[str] = None):
+        """Log `message` unless `key` was already logged `limit` times in this phase"""
+        level = level or self.level
+        with self._lock:
+            self._counts[key] += 1
+            self._levels[key] = level
+            count = self._counts[key]
+        if count <= self.limit:
+            logger.opt(depth=1).log(level, message)
+            if count == self.limit:
+                logger.opt(depth=1).log(level, f"Further '{key}' messages are counted, not logged")
+    
+    def counts(self) -> Dict[str, int]:
+        """Messages per key in the current phase"""
+        with self._lock:
+            return dict(self._counts)
+    
+    def flush(self):
+        """Log one summary line per suppressed key and reset the counts"""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            levels, self._levels = self._levels, {}
+        for key, count in counts.most_common():
+            if count > self.limit:
+                phase = f" during {self.phase}" if self.phase else ""
+                logger.log(
+                    levels.get(key, self.level),
+                    f"{key}: {count} times{phase} ({count - self.limit} not logged individually)",
+                )
+
+
 # Export logger
-__all__ = ["logger"]
+__all__ = ["logger", "LogAggregator"]
 
@@ -0,0 +1,27 @@
+"""Money helpers: amounts are stored as integer minor units (kopecks)"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Optional
+
+MINOR_UNITS = 100
+
+
+def to_minor(value: Any, scale: int = MINOR_UNITS) -> Optional[int]:
+    """Convert a major-unit value (Decimal/float/int/str) to integer minor units"""
+    if value is None or value == "":
+        return None
+    return int((Decimal(str(value)) * scale).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor(value: Optional[int], scale: int = MINOR_UNITS) -> Optional[Decimal]:
+    """Convert integer minor units to a Decimal in major units"""
+    if value is None:
+        return None
+    return (Decimal(int(value)) / scale).quantize(Decimal(1) / scale)
+
+
+def format_rub(kopecks: Optional[int]) -> str:
+    """Format kopecks as rubles, e.g. 150050 -> '1500.50 ₽'"""
+    kopecks = kopecks or 0
+    sign = "-" if kopecks < 0 else ""
+    rubles, rest = divmod(abs(kopecks), MINOR_UNITS)
+    return f"{sign}{rubles}.{rest:02d} ₽"
@@ -0,0 +1,300 @@
+"""Named timing spans with SQL query counts
+
+    with span("sync.registrations") as s:
+        ...
+    logger.info(f"{s.elapsed:.2f} s, {s.queries} SQL queries")
+
+    @span("ui.events.refresh")
+    def refresh_events(self): ...
+
+Spans are always collected (a couple of perf_counter calls each) and
+aggregated per name; statements executed on an engine passed to
+install_query_counter() are counted towards every span open on the same
+thread. PROFILE_SPAN=<name or glob> additionally runs cProfile (or a stack
+sampler, PROFILE_MODE=sample) for each matching span and saves the output to
+logs/profiles/.
+"""
+import cProfile
+import fnmatch
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from app.utils.config import get_log_dir, settings
+from app.utils.logger import logger
+
+
+class SpanRecord:
+    """One open (or finished) span; counters are inclusive of nested spans"""
+
+    __slots__ = ("name", "started", "elapsed", "queries", "sql_seconds", "_queries0", "_sql0", "_profile")
+
+    def __init__(self, name: str, queries: int, sql_seconds: float):
+        self.name = name
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self._queries0 = queries
+        self._sql0 = sql_seconds
+        self._profile = None
+
+
+class SpanStats:
+    """Aggregate of all finished spans with one name"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+    def add(self, record: SpanRecord):
+        self.calls += 1
+        self.total += record.elapsed
+        self.max = max(self.max, record.elapsed)
+        self.queries += record.queries
+        self.sql_seconds += record.sql_seconds
+
+
+class _ThreadState(threading.local):
+    def __init__(self):
+        self.stack: List[SpanRecord] = []
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statement_started: List[float] = []
+
+
+class Profiler:
+    """Span aggregation, SQL counting and on-demand profiling of chosen spans"""
+
+    def __init__(self, target: str = "", mode: str = "cprofile"):
+        self.target = target    # span name or glob to profile, "" - none
+        self.mode = mode        # "cprofile" or "sample"
+        self.stats: Dict[str, SpanStats] = {}
+        self._lock = threading.Lock()
+        self._local = _ThreadState()
+        self._profiling = False  # only one profiler can be active per process
+
+    # Spans
+
+    def enter(self, name: str) -> SpanRecord:
+        state = self._local
+        record = SpanRecord(name, state.queries, state.sql_seconds)
+        state.stack.append(record)
+        if self.target and fnmatch.fnmatchcase(name, self.target):
+            record._profile = self._start_profile(name)
+        return record
+
+    def exit(self, record: SpanRecord):
+        state = self._local
+        record.elapsed = time.perf_counter() - record.started
+        record.queries = state.queries - record._queries0
+        record.sql_seconds = state.sql_seconds - record._sql0
+        if state.stack and state.stack[-1] is record:
+            state.stack.pop()
+        elif record in state.stack:
+            state.stack.remove(record)
+        if record._profile is not None:
+            self._finish_profile(record)
+        with self._lock:
+            stats = self.stats.get(record.name)
+            if stats is None:
+                stats = self.stats[record.name] = SpanStats()
+            stats.add(record)
+
+    def current(self) -> Optional[SpanRecord]:
+        """Innermost open span of the calling thread"""
+        stack = self._local.stack
+        return stack[-1] if stack else None
+
+    # SQL
+
+    def install_query_counter(self, engine):
+        """Count statements (and their time) executed on `engine`"""
+        from sqlalchemy import event
+
+        state = self._local
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            state.statement_started.append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            state.queries += 1
+            if state.statement_started:
+                state.sql_seconds += time.perf_counter() - state.statement_started.pop()
+
+        @event.listens_for(engine, "handle_error")
+        def _error(context):
+            if state.statement_started:
+                state.statement_started.pop()
+
+    # Reports
+
+    def snapshot(self) -> Dict[str, SpanStats]:
+        with self._lock:
+            return dict(self.stats)
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def report(self) -> str:
+        """Table of spans by total time"""
+        stats = self.snapshot()
+        lines = [
+            "Spans:",
+            f"  {'span':<36} {'calls':>6} {'total ms':>10} {'max ms':>9} {'queries':>8} {'sql ms':>9}",
+        ]
+        for name, item in sorted(stats.items(), key=lambda pair: -pair[1].total):
+            lines.append(
+                f"  {name:<36} {item.calls:6d} {item.total * 1000:10.1f} {item.max * 1000:9.1f} "
+                f"{item.queries:8d} {item.sql_seconds * 1000:9.1f}"
+            )
+        if not stats:
+            lines.append("  (none)")
+        return "\n".join(lines)
+
+    # Profiling of the target span
+
+    def _start_profile(self, name: str):
+        with self._lock:
+            if self._profiling:
+                return None
+            self._profiling = True
+        try:
+            if self.mode == "sample":
+                profile = StackSampler(threading.get_ident())
+                profile.start()
+            else:
+                profile = cProfile.Profile()
+                profile.enable()
+        except Exception as e:
+            # e.g. another profiler or debugger already active
+            logger.warning(f"Cannot profile span {name}: {e}")
+            with self._lock:
+                self._profiling = False
+            return None
+        return profile
+
+    def _finish_profile(self, record: SpanRecord):
+        profile = record._profile
+        record._profile = None
+        try:
+            if isinstance(profile, StackSampler):
+                profile.stop()
+            else:
+                profile.disable()
+        finally:
+            with self._lock:
+                self._profiling = False
+
+        try:
+            directory = get_log_dir() / "profiles"
+            directory.mkdir(parents=True, exist_ok=True)
+            stem = f"{record.name}-{datetime.now():%Y%m%d-%H%M%S-%f}"
+            if isinstance(profile, StackSampler):
+                path = directory / f"{stem}.folded"
+                path.write_text(profile.folded(), encoding="utf-8")
+            else:
+                path = directory / f"{stem}.prof"
+                profile.dump_stats(str(path))
+                text = io.StringIO()
+                pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(40)
+                (directory / f"{stem}.txt").write_text(text.getvalue(), encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not save profile of span {record.name}: {e}")
+            return
+        logger.info(
+            f"Profiled span {record.name}: {record.elapsed:.2f} s, {record.queries} SQL queries -> {path}"
+        )
+
+
+class StackSampler:
+    """Samples one thread's stack into collapsed stacks (flamegraph.pl / speedscope input)"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="span-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class span:
+    """Time a block or a function under `name` (context manager or decorator)"""
+
+    __slots__ = ("name", "_records")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._records: List[SpanRecord] = []
+
+    def __enter__(self) -> SpanRecord:
+        record = get_profiler().enter(self.name)
+        self._records.append(record)
+        return record
+
+    def __exit__(self, exc_type, exc, tb):
+        get_profiler().exit(self._records.pop())
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        name = self.name
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = get_profiler()
+            record = profiler.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit(record)
+
+        return wrapper
+
+
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Profiler:
+    """Process-wide span profiler"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(settings.profile_span, settings.profile_mode)
+    return _profiler
+
+
+__all__ = ["span", "get_profiler", "Profiler", "SpanRecord", "SpanStats"]
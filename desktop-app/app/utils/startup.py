@@ -0,0 +1,82 @@
+"""Startup timing breakdown (--profile-startup) and deferred database setup
+
+Standard library only, so it can be imported before anything heavy.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+
+class StartupProfiler:
+    """Records named startup phases relative to process start"""
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float, float]] = []  # (name, start, end)
+        self._depth = 0
+        self._reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; nested phases are indented in the report"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases.append(("  " * self._depth + name, start, time.perf_counter()))
+
+    def mark(self, name: str):
+        """Record a point in time (e.g. first paint)"""
+        if self.enabled:
+            now = time.perf_counter()
+            self.phases.append((name, now, now))
+
+    def report(self) -> str:
+        """Phases in start order with durations and offsets from process start"""
+        lines = ["Startup profile (ms):", f"  {'phase':<36} {'took':>8} {'at':>8}"]
+        for name, start, end in sorted(self.phases, key=lambda p: (p[1], -p[2])):
+            took = f"{(end - start) * 1000:8.1f}" if end > start else f"{'':>8}"
+            lines.append(f"  {name:<36} {took} {(end - self.started) * 1000:8.1f}")
+        return "\n".join(lines)
+
+    def print_report(self, stream=None):
+        """Print the report once (to stderr by default)"""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        print(self.report(), file=stream or sys.stderr, flush=True)
+
+
+_profiler: Optional[StartupProfiler] = None
+_database_ready = False
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Process-wide startup profiler (disabled unless main enables it)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+    return _profiler
+
+
+def init_database():
+    """Import the database layer (SQLAlchemy, models) and run init_db(), once
+
+    Called before the first view needs data; the login screen is shown without it.
+    """
+    global _database_ready
+    if _database_ready:
+        return
+    profiler = get_startup_profiler()
+    with profiler.phase("import database"):
+        from app.database.session import init_db
+    with profiler.phase("init_db"):
+        init_db()
+    _database_ready = True
@@ -1,93 +1,195 @@
 """Storage utilities for persisting data"""
+import atexit
+import copy
 import json
 import os
+import shutil
+import tempfile
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from app.utils.config import get_data_dir
 from app.utils.logger import logger
 
 
 class Storage:
-    """Simple file-based storage"""
+    """Simple file-based storage
     
-    def __init__(self, filename: str = "app_data.json"):
+    Keeps the parsed file in memory (re-read only when the file's mtime/size
+    changes), writes atomically via a temp file + rename and coalesces rapid
+    saves into one delayed flush.
+    """
+    
+    def __init__(self, filename: str = "app_data.json", flush_delay: float = 0.5):
         """Initialize storage"""
-        self.data_dir = Path.home() / ".local" / "share" / "ftr_registration"
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.data_dir = get_data_dir()
         self.file_path = self.data_dir / filename
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._stamp: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of the cached file
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._migrate_legacy_file(filename)
     
-    def save(self, data: Dict[str, Any]) -> bool:
-        """Save data to file"""
+    def _migrate_legacy_file(self, filename: str):
+        """Move the file from the old fixed location (~/.local/share) if get_data_dir() differs"""
+        legacy = Path.home() / ".local" / "share" / "ftr_registration" / filename
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            logger.error(f"Error saving data: {e}")
-            return False
+            if legacy.exists() and not self.file_path.exists() and legacy.resolve() != self.file_path.resolve():
+                shutil.move(str(legacy), str(self.file_path))
+                logger.info(f"Moved {filename} to {self.data_dir}")
+        except OSError as e:
+            logger.warning(f"Could not move {legacy}: {e}")
     
-    def load(self) -> Dict[str, Any]:
-        """Load data from file"""
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
         try:
-            if not self.file_path.exists():
-                return {}
+            stat = self.file_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _cached(self) -> Dict[str, Any]:
+        """Cached data, re-read if the file changed on disk (pending writes win)"""
+        if self._dirty and self._data is not None:
+            return self._data
+        stamp = self._file_stamp()
+        if self._data is None or stamp != self._stamp:
+            data: Dict[str, Any] = {}
+            if stamp is not None:
+                try:
+                    with open(self.file_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    logger.error(f"Error loading data: {e}")
+            self._data = data
+            self._stamp = stamp
+        return self._data
+    
+    def load(self) -> Dict[str, Any]:
+        """Load data (a copy; use save() to change it)"""
+        with self._lock:
+            return copy.deepcopy(self._cached())
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value of one top-level key"""
+        with self._lock:
+            return copy.deepcopy(self._cached().get(key, default))
+    
+    def save(self, data: Dict[str, Any], immediate: bool = False) -> bool:
+        """Replace stored data; written after flush_delay unless immediate"""
+        with self._lock:
+            if data == self._cached():
+                return True  # unchanged, nothing to write
+            self._data = copy.deepcopy(data)
+            self._dirty = True
+            if immediate or self.flush_delay <= 0:
+                return self.flush()
+            self._schedule_flush()
+            return True
+    
+    def set(self, key: str, value: Any, immediate: bool = False) -> bool:
+        """Set one top-level key"""
+        with self._lock:
+            data = dict(self._cached())
+            data[key] = value
+            return self.save(data, immediate=immediate)
+    
+    def remove(self, key: str, immediate: bool = False) -> bool:
+        """Remove one top-level key"""
+        with self._lock:
+            data = dict(self._cached())
+            if data.pop(key, None) is None:
+                return True
+            return self.save(data, immediate=immediate)
+    
+    def _schedule_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def flush(self) -> bool:
+        """Write pending changes to disk (atomically)"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
             
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading data: {e}")
-            return {}
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.data_dir, prefix=f".{self.file_path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.file_path)
+            except Exception as e:
+                logger.error(f"Error saving data: {e}")
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                return False
+            
+            self._dirty = False
+            self._stamp = self._file_stamp()
+            return True
     
     def clear(self) -> bool:
         """Clear stored data"""
-        try:
-            if self.file_path.exists():
-                self.file_path.unlink()
-            return True
-        except Exception as e:
-            logger.error(f"Error clearing data: {e}")
-            return False
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._data = {}
+            self._dirty = False
+            try:
+                if self.file_path.exists():
+                    self.file_path.unlink()
+                self._stamp = None
+                return True
+            except Exception as e:
+                logger.error(f"Error clearing data: {e}")
+                return False
 
 
 # Global storage instance
 _storage = Storage()
+atexit.register(_storage.flush)
 
 
 def save_auth_data(token: str, user: Dict[str, Any]) -> bool:
     """Save authentication data"""
-    return _storage.save({
-        "auth": {
-            "token": token,
-            "user": user,
-        }
-    })
+    # Written right away: losing a login to a crash is worse than one extra write
+    return _storage.set("auth", {
+        "token": token,
+        "user": user,
+    }, immediate=True)
 
 
 def load_auth_data() -> Optional[Dict[str, Any]]:
     """Load authentication data"""
-    data = _storage.load()
-    return data.get("auth")
+    return _storage.get("auth")
 
 
 def clear_auth_data() -> bool:
     """Clear authentication data"""
-    data = _storage.load()
-    if "auth" in data:
-        del data["auth"]
-        return _storage.save(data)
-    return True
+    return _storage.remove("auth", immediate=True)
 
 
 def save_display_settings(settings: Dict[str, Any]) -> bool:
     """Save display settings"""
-    data = _storage.load()
-    data["display_settings"] = settings
-    return _storage.save(data)
+    return _storage.set("display_settings", settings)
 
 
 def load_display_settings() -> Dict[str, Any]:
     """Load display settings"""
-    data = _storage.load()
-    return data.get("display_settings", {
+    return _storage.get("display_settings", {
         "registration_columns": {
             "number": True,
             "collective": True,
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Synthetic datasets for benchmarks: API payloads and matching local databases
+
+The same seed always produces the same data. Payloads have the shape the
+server returns, so they can be fed to SyncService (see FakeAPI) or served over
+HTTP by benchmarks/mock_server.py.
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DANCE_WORDS = [
+    "Весна", "Калинка", "Метелица", "Огонёк", "Рассвет", "Хоровод", "Вихрь", "Радуга",
+    "Storm", "Fusion", "Tango", "Jazz Funk", "Vogue", "Breaking", "Waltz", "Flamenco",
+]
+COLLECTIVE_WORDS = [
+    "Ансамбль", "Студия", "Театр танца", "Школа", "Dance Crew", "Коллектив", "Team",
+]
+CITIES = ["Москва", "Казань", "Самара", "Пермь", "Уфа", "Тверь", "Омск", "Сочи"]
+
+
+class DatasetSpec(NamedTuple):
+    """Size and seed of a synthetic dataset"""
+    events: int = 3
+    registrations_per_event: int = 1000
+    collectives: int = 300
+    accounting_per_event: int = 500
+    disciplines: int = 12
+    nominations: int = 8
+    ages: int = 10
+    categories: int = 5
+    seed: int = 42
+
+
+SCALES: Dict[str, DatasetSpec] = {
+    "small": DatasetSpec(events=2, registrations_per_event=200, collectives=60, accounting_per_event=100),
+    "medium": DatasetSpec(events=3, registrations_per_event=2000, collectives=400, accounting_per_event=1000),
+    "large": DatasetSpec(events=5, registrations_per_event=10000, collectives=1500, accounting_per_event=5000),
+}
+
+
+class SyntheticDataset:
+    """API payloads of a generated dataset"""
+
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        rng = random.Random(spec.seed)
+        base_date = datetime(2025, 3, 1, 9, 0)
+
+        def reference(prefix: str, count: int) -> List[Dict[str, Any]]:
+            return [{"id": i, "name": f"{prefix} {i}"} for i in range(1, count + 1)]
+
+        self.disciplines = reference("Дисциплина", spec.disciplines)
+        self.nominations = reference("Номинация", spec.nominations)
+        self.ages = reference("Возраст", spec.ages)
+        self.categories = reference("Категория", spec.categories)
+
+        self.collectives = [
+            {
+                "id": i,
+                "name": f"{rng.choice(COLLECTIVE_WORDS)} «{rng.choice(DANCE_WORDS)}» #{i}",
+                "city": rng.choice(CITIES),
+            }
+            for i in range(1, spec.collectives + 1)
+        ]
+
+        self.events: List[Dict[str, Any]] = []
+        self.prices: Dict[int, List[Dict[str, Any]]] = {}
+        self.registrations: Dict[int, List[Dict[str, Any]]] = {}
+        self.accounting: Dict[int, List[Dict[str, Any]]] = {}
+        registration_id = 1
+        price_id = 1
+        entry_id = 1
+        for e in range(1, spec.events + 1):
+            start = base_date + timedelta(days=30 * e)
+            self.events.append({
+                "id": e,
+                "name": f"Фестиваль {e} «{rng.choice(DANCE_WORDS)}»",
+                "startDate": start.isoformat() + "Z",
+                "endDate": (start + timedelta(days=2)).isoformat() + "Z",
+                "description": None,
+                "status": "ACTIVE",
+                "isOnline": False,
+                "paymentEnable": True,
+                "categoryEnable": True,
+                "calculatorToken": f"calc-{spec.seed}-{e}",
+                "pricePerDiploma": "350.00",
+                "pricePerMedal": "450.00",
+                "discountTiers": None,
+            })
+
+            self.prices[e] = []
+            for nomination in self.nominations:
+                self.prices[e].append({
+                    "id": price_id,
+                    "nominationId": nomination["id"],
+                    "pricePerParticipant": f"{rng.randint(8, 40) * 50}.00",
+                    "pricePerFederationParticipant": f"{rng.randint(6, 30) * 50}.00",
+                })
+                price_id += 1
+
+            regs = []
+            for n in range(1, spec.registrations_per_event + 1):
+                collective = rng.choice(self.collectives) if self.collectives else None
+                participants = rng.choice([1, 1, 2, 2, 3, 5, 8, 12, 16, 24])
+                payment = rng.choices(
+                    ["UNPAID", "PERFORMANCE_PAID", "DIPLOMAS_PAID", "PAID"], weights=[5, 2, 1, 4]
+                )[0]
+                regs.append({
+                    "id": registration_id,
+                    "eventId": e,
+                    "collectiveId": collective["id"] if collective else None,
+                    "collective": {"id": collective["id"], "name": collective["name"]} if collective else None,
+                    "disciplineId": rng.randint(1, spec.disciplines),
+                    "nominationId": rng.randint(1, spec.nominations),
+                    "ageId": rng.randint(1, spec.ages),
+                    "categoryId": rng.randint(1, spec.categories) if rng.random() < 0.7 else None,
+                    "danceName": f"{rng.choice(DANCE_WORDS)} {rng.choice(DANCE_WORDS).lower()}",
+                    "duration": f"0{rng.randint(1, 4)}:{rng.randint(0, 59):02d}",
+                    "participantsCount": participants,
+                    "federationParticipantsCount": rng.randint(0, participants),
+                    "diplomasCount": rng.randint(0, participants),
+                    "medalsCount": rng.randint(0, participants),
+                    "diplomasList": None,
+                    "paymentStatus": payment,
+                    "paidAmount": f"{participants * rng.randint(8, 40) * 50}.00" if payment != "UNPAID" else None,
+                    "performancePaid": payment in ("PERFORMANCE_PAID", "PAID"),
+                    "diplomasAndMedalsPaid": payment in ("DIPLOMAS_PAID", "PAID"),
+                    "diplomasPrinted": rng.random() < 0.2,
+                    "status": rng.choices(["PENDING", "APPROVED", "REJECTED"], weights=[3, 6, 1])[0],
+                    "notes": rng.choice([None, None, None, "Нужен свет", "Поменять трек", "Опоздают"]),
+                    "number": n,
+                    "blockNumber": (n - 1) // 25 + 1,
+                    "videoUrl": None,
+                    "songUrl": None,
+                    "agreement": True,
+                    "agreement2": rng.random() < 0.9,
+                })
+                registration_id += 1
+            self.registrations[e] = regs
+
+            entries = []
+            for _ in range(spec.accounting_per_event if regs else 0):
+                reg = rng.choice(regs)
+                entries.append({
+                    "id": entry_id,
+                    "registrationId": reg["id"],
+                    "collectiveId": reg["collectiveId"],
+                    "eventId": e,
+                    "amount": f"{rng.randint(1, 60) * 100}.00",
+                    "discountAmount": "0.00",
+                    "discountPercent": rng.choice(["0", "0", "5", "10"]),
+                    "method": rng.choice(["CASH", "CARD", "TRANSFER"]),
+                    "paidFor": rng.choice(["PERFORMANCE", "DIPLOMAS_MEDALS"]),
+                    "paymentGroupId": None,
+                    "paymentGroupName": None,
+                    "description": None,
+                    "deletedAt": None,
+                })
+                entry_id += 1
+            self.accounting[e] = entries
+
+    @property
+    def total_registrations(self) -> int:
+        return sum(len(regs) for regs in self.registrations.values())
+
+    def registrations_page(self, event_id: int, page: int = 1, limit: int = 100) -> Dict[str, Any]:
+        """Paginated /api/registrations response"""
+        regs = self.registrations.get(event_id, [])
+        total_pages = max(1, math.ceil(len(regs) / limit))
+        start = (page - 1) * limit
+        return {
+            "registrations": regs[start:start + limit],
+            "pagination": {"page": page, "limit": limit, "total": len(regs), "totalPages": total_pages},
+        }
+
+    def handle(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Response body for a GET endpoint used by the client; KeyError if unknown"""
+        params = params or {}
+        path = "/" + endpoint.strip("/")
+        if not path.startswith("/api/"):
+            path = "/api" + path if path != "/health" else path
+
+        if path == "/health":
+            return {"status": "ok"}
+        if path.startswith("/api/reference/"):
+            kind = path.rsplit("/", 1)[1]
+            payloads = {
+                "disciplines": self.disciplines,
+                "nominations": self.nominations,
+                "ages": self.ages,
+                "categories": self.categories,
+                "events": self.events,
+            }
+            return payloads[kind]
+        if path.startswith("/api/events/") and path.endswith("/prices"):
+            event_id = int(path.split("/")[3])
+            return self.prices.get(event_id, [])
+        if path == "/api/registrations":
+            return self.registrations_page(
+                int(params.get("eventId", 0)),
+                int(params.get("page", 1)),
+                int(params.get("limit", 100)),
+            )
+        raise KeyError(path)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "spec": self.spec._asdict(),
+            "reference": {
+                "disciplines": self.disciplines,
+                "nominations": self.nominations,
+                "ages": self.ages,
+                "categories": self.categories,
+            },
+            "collectives": self.collectives,
+            "events": self.events,
+            "prices": self.prices,
+            "registrations": self.registrations,
+            "accounting": self.accounting,
+        }
+
+
+class FakeAPI:
+    """In-process stand-in for APIClient serving a dataset (no HTTP)"""
+
+    def __init__(self, dataset: SyntheticDataset):
+        self.dataset = dataset
+        self.token: Optional[str] = None
+        self.requests = 0
+
+    def set_token(self, token: str):
+        self.token = token
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        self.requests += 1
+        try:
+            return self.dataset.handle(endpoint, params)
+        except KeyError:
+            from app.api.client import APIError
+            raise APIError(f"HTTP error: 404 for {endpoint}", status_code=404)
+
+
+def populate_database(dataset: SyntheticDataset, db, include_registrations: bool = True) -> Dict[str, int]:
+    """Write a dataset straight into the local DB (no sync); local IDs equal server IDs"""
+    from decimal import Decimal
+    from sqlalchemy import insert
+    from app.database.models import (
+        Age, Category, Collective, Discipline, Event, EventPrice, Nomination, Registration,
+        EventStatus, PaymentStatus, RegistrationStatus,
+    )
+
+    def parse(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", ""))
+
+    for model, rows in (
+        (Discipline, dataset.disciplines),
+        (Nomination, dataset.nominations),
+        (Age, dataset.ages),
+        (Category, dataset.categories),
+    ):
+        db.execute(insert(model), [{"id": r["id"], "server_id": r["id"], "name": r["name"]} for r in rows])
+
+    if dataset.collectives:
+        db.execute(insert(Collective), [
+            {"id": c["id"], "server_id": c["id"], "name": c["name"], "city": c["city"]}
+            for c in dataset.collectives
+        ])
+
+    db.execute(insert(Event), [
+        {
+            "id": e["id"], "server_id": e["id"], "name": e["name"],
+            "start_date": parse(e["startDate"]), "end_date": parse(e["endDate"]),
+            "status": EventStatus(e["status"]), "calculator_token": e["calculatorToken"],
+            "price_per_diploma": Decimal(e["pricePerDiploma"]), "price_per_medal": Decimal(e["pricePerMedal"]),
+        }
+        for e in dataset.events
+    ])
+    db.execute(insert(EventPrice), [
+        {
+            "server_id": p["id"], "event_id": event_id, "nomination_id": p["nominationId"],
+            "price_per_participant": Decimal(p["pricePerParticipant"]),
+            "price_per_federation_participant": Decimal(p["pricePerFederationParticipant"]),
+        }
+        for event_id, prices in dataset.prices.items() for p in prices
+    ])
+
+    counts = {"events": len(dataset.events), "registrations": 0, "accounting_entries": 0}
+    if include_registrations:
+        started = datetime(2025, 1, 1)
+        for event_id, regs in dataset.registrations.items():
+            if not regs:
+                continue
+            db.execute(insert(Registration), [
+                {
+                    "id": r["id"], "server_id": r["id"], "event_id": event_id,
+                    "collective_id": r["collectiveId"], "discipline_id": r["disciplineId"],
+                    "nomination_id": r["nominationId"], "age_id": r["ageId"], "category_id": r["categoryId"],
+                    "dance_name": r["danceName"], "duration": r["duration"],
+                    "participants_count": r["participantsCount"],
+                    "federation_participants_count": r["federationParticipantsCount"],
+                    "diplomas_count": r["diplomasCount"], "medals_count": r["medalsCount"],
+                    "payment_status": PaymentStatus(r["paymentStatus"]),
+                    "paid_amount": Decimal(r["paidAmount"]) if r["paidAmount"] else None,
+                    "performance_paid": r["performancePaid"],
+                    "diplomas_and_medals_paid": r["diplomasAndMedalsPaid"],
+                    "status": RegistrationStatus(r["status"]), "notes": r["notes"],
+                    "number": r["number"], "block_number": r["blockNumber"],
+                    "created_at": started + timedelta(seconds=r["id"]),
+                }
+                for r in regs
+            ])
+            counts["registrations"] += len(regs)
+
+    counts["accounting_entries"] = populate_accounting(dataset, db)
+    db.commit()
+    return counts
+
+
+def populate_accounting(dataset: SyntheticDataset, db) -> int:
+    """Insert the dataset's accounting entries (sync does not download them yet)"""
+    from decimal import Decimal
+    from sqlalchemy import insert, select
+    from app.database.models import AccountingEntry, Event, PaidFor, PaymentMethod, Registration
+
+    # Map server IDs to local ones - the DB may have been filled by a sync
+    event_ids = dict(db.execute(select(Event.server_id, Event.id)).all())
+    registration_ids = dict(db.execute(select(Registration.server_id, Registration.id)).all())
+
+    rows = []
+    for server_event_id, entries in dataset.accounting.items():
+        for entry in entries:
+            rows.append({
+                "server_id": entry["id"],
+                "registration_id": registration_ids.get(entry["registrationId"]),
+                "event_id": event_ids.get(server_event_id),
+                "amount": Decimal(entry["amount"]),
+                "discount_amount": Decimal(entry["discountAmount"]),
+                "discount_percent": Decimal(entry["discountPercent"]),
+                "method": PaymentMethod(entry["method"]),
+                "paid_for": PaidFor(entry["paidFor"]),
+            })
+    if rows:
+        db.execute(insert(AccountingEntry), rows)
+    db.commit()
+    return len(rows)
+
+
+def spec_from_args(args: argparse.Namespace) -> DatasetSpec:
+    """DatasetSpec from --scale plus explicit overrides"""
+    spec = SCALES[args.scale]
+    overrides = {
+        "events": args.events,
+        "registrations_per_event": args.registrations,
+        "collectives": args.collectives,
+        "accounting_per_event": args.accounting,
+        "seed": args.seed,
+    }
+    return spec._replace(**{k: v for k, v in overrides.items() if v is not None})
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="preset dataset size")
+    parser.add_argument("--events", type=int, help="number of events")
+    parser.add_argument("--registrations", type=int, help="registrations per event")
+    parser.add_argument("--collectives", type=int, help="number of collectives")
+    parser.add_argument("--accounting", type=int, help="accounting entries per event")
+    parser.add_argument("--seed", type=int, help="random seed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic local database and/or API payloads")
+    add_spec_arguments(parser)
+    parser.add_argument("--db", help="SQLite file to create (must not exist)")
+    parser.add_argument("--payloads", help="write API payloads to this .json or .json.gz file")
+    args = parser.parse_args()
+
+    spec = spec_from_args(args)
+    dataset = SyntheticDataset(spec)
+    print(f"Generated {len(dataset.events)} events, {dataset.total_registrations} registrations (seed {spec.seed})")
+
+    if args.payloads:
+        opener = gzip.open if args.payloads.endswith(".gz") else open
+        with opener(args.payloads, "wt", encoding="utf-8") as f:
+            json.dump(dataset.to_json(), f, ensure_ascii=False)
+        print(f"Payloads written to {args.payloads}")
+
+    if args.db:
+        db_path = Path(args.db).resolve()
+        if db_path.exists():
+            parser.error(f"{db_path} already exists")
+        # The app reads DB_PATH when its database module is first imported
+        os.environ["DB_PATH"] = str(db_path)
+        from app.database.session import get_db_session, init_db
+        init_db()
+        db = get_db_session()
+        try:
+            counts = populate_database(dataset, db)
+        finally:
+            db.close()
+        print(f"Database written to {db_path}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
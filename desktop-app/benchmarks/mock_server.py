@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Local stand-in for the backend API, serving a synthetic dataset
+
+Implements the endpoints the desktop client uses (auth, reference data, event
+prices, paginated registrations, health) with optional network faults:
+
+    python benchmarks/mock_server.py --scale medium --port 5055 --latency 80 --jitter 40 \\
+        --bandwidth 256 --rate-limit 0.05 --disconnect 0.01
+
+Then point the app at it with API_BASE_URL=http://127.0.0.1:5055/api.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.datagen import SyntheticDataset, add_spec_arguments, spec_from_args  # noqa: E402
+
+
+class NetworkProfile(NamedTuple):
+    """Simulated network conditions and faults"""
+    latency_ms: float = 0.0          # added before every response
+    jitter_ms: float = 0.0           # +- uniform random on top of latency
+    bandwidth_kbps: float = 0.0      # response body rate cap in KiB/s (0 - unlimited)
+    rate_limit: float = 0.0          # probability of answering 429
+    retry_after: int = 1             # Retry-After seconds sent with 429
+    disconnect: float = 0.0          # probability of dropping the connection mid-body
+    seed: int = 0                    # fault RNG seed
+
+
+class MockServer:
+    """Threaded HTTP server over a SyntheticDataset; usable from scripts and benchmarks"""
+
+    def __init__(
+        self,
+        dataset: SyntheticDataset,
+        profile: NetworkProfile = NetworkProfile(),
+        host: str = "127.0.0.1",
+        port: int = 0,
+        password: Optional[str] = None,
+    ):
+        self.dataset = dataset
+        self.profile = profile
+        self.password = password
+        self.token = f"mock-token-{dataset.spec.seed}"
+        self.user = {"id": 1, "email": "admin@example.com", "name": "Mock Admin", "role": "ADMIN"}
+        self._rng = random.Random(profile.seed)
+        self._rng_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "rate_limited": 0, "disconnected": 0, "bytes": 0}
+        self._stats_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL in the form the app expects (API_BASE_URL)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self) -> "MockServer":
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def delay(self) -> float:
+        """Seconds to wait before answering"""
+        profile = self.profile
+        if not profile.latency_ms and not profile.jitter_ms:
+            return 0.0
+        with self._rng_lock:
+            jitter = self._rng.uniform(-profile.jitter_ms, profile.jitter_ms)
+        return max(0.0, profile.latency_ms + jitter) / 1000
+
+    def count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+
+def _make_handler(server: MockServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any):
+            pass  # keep benchmark output readable
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def _handle(self, method: str):
+            server.count("requests")
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+
+            delay = server.delay()
+            if delay:
+                time.sleep(delay)
+
+            profile = server.profile
+            if profile.rate_limit and server.random() < profile.rate_limit:
+                server.count("rate_limited")
+                self._send(429, {"error": "Too many requests"}, {"Retry-After": str(profile.retry_after)})
+                return
+
+            parsed = urlparse(self.path)
+            path = parsed.path.rstrip("/") or "/"
+            params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+
+            if method == "POST" and path == "/api/auth/login":
+                self._login(body)
+                return
+            if method != "GET":
+                self._send(404, {"error": f"No route {method} {path}"})
+                return
+            if path == "/health":
+                self._send(200, {"status": "ok"})
+                return
+            if self.headers.get("Authorization") != f"Bearer {server.token}":
+                self._send(401, {"error": "Unauthorized"})
+                return
+            if path == "/api/auth/me":
+                self._send(200, server.user)
+                return
+            try:
+                payload = server.dataset.handle(path, params)
+            except (KeyError, ValueError):
+                self._send(404, {"error": f"No route GET {path}"})
+                return
+            self._send(200, payload)
+
+        def _login(self, body: bytes):
+            try:
+                credentials = json.loads(body or b"{}")
+            except ValueError:
+                self._send(400, {"error": "Invalid JSON"})
+                return
+            if not credentials.get("email") or (
+                server.password is not None and credentials.get("password") != server.password
+            ):
+                self._send(401, {"error": "Invalid credentials"})
+                return
+            user = dict(server.user, email=credentials["email"])
+            self._send(200, {"accessToken": server.token, "refreshToken": f"{server.token}-refresh", "user": user})
+
+        def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+
+            profile = server.profile
+            drop_at = None
+            if profile.disconnect and status == 200 and server.random() < profile.disconnect:
+                drop_at = int(len(data) * server.random())
+
+            chunk = 16 * 1024
+            rate = profile.bandwidth_kbps * 1024
+            sent = 0
+            try:
+                while sent < len(data):
+                    end = min(len(data), sent + chunk)
+                    if drop_at is not None and end >= drop_at:
+                        self.wfile.write(data[sent:drop_at])
+                        self.wfile.flush()
+                        server.count("disconnected")
+                        server.count("bytes", drop_at - sent)
+                        self.close_connection = True
+                        self.connection.close()
+                        return
+                    self.wfile.write(data[sent:end])
+                    server.count("bytes", end - sent)
+                    if rate:
+                        time.sleep((end - sent) / rate)
+                    sent = end
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+    return Handler
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=0.0, help="added latency per response, ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+- random latency, ms")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="response rate cap, KiB/s (0 - unlimited)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability of a 429 response")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    parser.add_argument("--disconnect", type=float, default=0.0, help="probability of dropping a response mid-body")
+    parser.add_argument("--fault-seed", type=int, default=0, help="seed of latency/fault randomness")
+
+
+def profile_from_args(args: argparse.Namespace) -> NetworkProfile:
+    return NetworkProfile(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        bandwidth_kbps=args.bandwidth,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        disconnect=args.disconnect,
+        seed=args.fault_seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock backend API serving synthetic data")
+    add_spec_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--password", help="require this password on login (default: any)")
+    args = parser.parse_args()
+
+    dataset = SyntheticDataset(spec_from_args(args))
+    server = MockServer(dataset, profile_from_args(args), args.host, args.port, args.password)
+    print(f"Serving {len(dataset.events)} events, {dataset.total_registrations} registrations at {server.url}")
+    print(f"Network: {server.profile._asdict()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
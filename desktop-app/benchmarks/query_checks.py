@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""SQL query budgets and query-plan snapshots
+
+Runs the main data paths (sync a page, load a table page, statistics, ...) on
+a synthetic dataset, counts the SELECT statements each one executes and fails
+when a budget is exceeded - an N+1 shows up as a count that grows with the
+data. (Writes are reported but not budgeted: one INSERT per new row is expected.)
+Every SELECT is also run through EXPLAIN QUERY PLAN and compared with the
+snapshot in query_plans.json, so a dropped index or a new table scan fails too:
+
+    python benchmarks/query_checks.py                # check (exit code 1 on failure)
+    python benchmarks/query_checks.py --update       # accept current plans
+"""
+import argparse
+import json
+import math
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.datagen import FakeAPI, SyntheticDataset, add_spec_arguments, populate_accounting, spec_from_args  # noqa: E402
+from benchmarks.suite import isolate  # noqa: E402
+
+SNAPSHOT_PATH = Path(__file__).resolve().parent / "query_plans.json"
+
+
+class Budget(NamedTuple):
+    """Most SELECT statements allowed per unit (call, page of sync) of a scenario"""
+    queries: int
+    unit: str = "call"
+
+
+# Kept independent of the dataset size on purpose: a per-row query pattern
+# overshoots them on any scale but the tiniest
+BUDGETS: Dict[str, Budget] = {
+    "sync.initial": Budget(6, "page"),
+    "sync.unchanged": Budget(6, "page"),
+    "registrations.first_page": Budget(4),
+    "registrations.search": Budget(4),
+    "registrations.sort": Budget(5),
+    "accounting.totals_and_ledger": Budget(8),
+    "statistics.load": Budget(6),
+    "events.catalog": Budget(3),
+    "prices.recalculate_event": Budget(5),
+}
+
+
+class StatementLog:
+    """Statements executed on an engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements: List[Tuple[str, Any]] = []
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, None if executemany else parameters))
+
+    def __enter__(self) -> "StatementLog":
+        from sqlalchemy import event
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        from sqlalchemy import event
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        return False
+
+
+def statement_key(statement: str) -> str:
+    """Statement text with IN lists of any length collapsed, for snapshot keys"""
+    text = " ".join(statement.split())
+    return re.sub(r"\(\?(?:, \?)*\)", "(?...)", text)
+
+
+def explain(engine, statement: str, parameters: Any) -> List[str]:
+    """EXPLAIN QUERY PLAN lines, indented by nesting"""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+class QueryChecks:
+    """Scenarios over one synced synthetic dataset"""
+
+    def __init__(self, dataset: SyntheticDataset):
+        self.dataset = dataset
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.plans: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.local_event_id = None
+
+    def run(self, name: str, fn: Callable[[], Any], units: int = 1):
+        from app.database.session import engine
+        from app.utils.profiling import span
+
+        with StatementLog(engine) as log, span(f"check.{name}") as record:
+            fn()
+        plans: Dict[str, Dict[str, Any]] = {}
+        reads = 0
+        for statement, parameters in log.statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                continue
+            reads += 1
+            key = statement_key(statement)
+            if key not in plans:
+                plans[key] = {"plan": explain(engine, statement, parameters)}
+        self.plans[name] = plans
+
+        budget = BUDGETS[name]
+        per_unit = reads / max(1, units)
+        self.results[name] = {
+            "queries": record.queries,
+            "reads": reads,
+            "units": units,
+            "per_unit": round(per_unit, 2),
+            "budget": budget.queries,
+            "ok": per_unit <= budget.queries,
+        }
+        status = "ok" if per_unit <= budget.queries else "OVER BUDGET"
+        print(f"  {name:<30} {record.queries:6d} queries {reads:5d} reads  {per_unit:7.2f}/{budget.unit} "
+              f"(budget {budget.queries})  {status}")
+
+    def run_all(self):
+        from app.api.sync import SyncService
+        from app.database.queries import RegistrationFilter, RegistrationsSource, find_event, load_event_stats
+        from app.database.session import get_db_session
+        from app.services.accounting_service import AccountingLedgerSource, AccountingQueryService
+        from app.services.event_catalog import EventCatalog
+        from app.services.price_engine import PriceEngine
+        from app.services.statistics_service import StatisticsEngine
+
+        pages = sum(max(1, math.ceil(len(regs) / 100)) for regs in self.dataset.registrations.values())
+
+        def sync():
+            db = get_db_session()
+            try:
+                result = SyncService(FakeAPI(self.dataset), db).sync_all()
+            finally:
+                db.close()
+            if not result["success"]:
+                raise RuntimeError(f"sync failed: {result['errors']}")
+
+        self.run("sync.initial", sync, pages)
+        self.run("sync.unchanged", sync, pages)
+
+        db = get_db_session()
+        try:
+            populate_accounting(self.dataset, db)
+            self.local_event_id = find_event(db, self.dataset.events[0]["id"]).id
+        finally:
+            db.close()
+        event_id = self.local_event_id
+
+        def first_page():
+            source = RegistrationsSource(event_id)
+            source.prefetch()
+            source.get_rows(0, 50)
+
+        def search():
+            source = RegistrationsSource(event_id, RegistrationFilter(search="вес"))
+            source.prefetch()
+
+        def sort():
+            source = RegistrationsSource(event_id)
+            source.load_sort_index()
+            source.set_sort("collective_name", descending=True)
+            source.get_rows(0, 50)
+
+        def accounting():
+            db = get_db_session()
+            try:
+                AccountingQueryService(db).get_totals(event_id)
+            finally:
+                db.close()
+            AccountingLedgerSource(event_id).prefetch()
+
+        def statistics():
+            db = get_db_session()
+            try:
+                load_event_stats(db, event_id)
+                StatisticsEngine(db).load(event_id).all_cubes()
+            finally:
+                db.close()
+
+        def prices():
+            db = get_db_session()
+            try:
+                PriceEngine(db).recalculate_event(event_id)
+            finally:
+                db.close()
+
+        self.run("registrations.first_page", first_page)
+        self.run("registrations.search", search)
+        self.run("registrations.sort", sort)
+        self.run("accounting.totals_and_ledger", accounting)
+        self.run("statistics.load", statistics)
+        self.run("events.catalog", lambda: EventCatalog().events)
+        self.run("prices.recalculate_event", prices)
+
+
+def compare_plans(current: Dict[str, Dict[str, Any]], snapshot: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Differences of current plans against the snapshot"""
+    problems = []
+    for scenario, plans in current.items():
+        known = snapshot.get(scenario)
+        if known is None:
+            problems.append(f"{scenario}: no snapshot (run with --update)")
+            continue
+        for key, entry in plans.items():
+            old = known.get(key)
+            if old is None:
+                scans = [line.strip() for line in entry["plan"] if line.strip().startswith("SCAN")]
+                problems.append(f"{scenario}: new query{' with ' + ', '.join(scans) if scans else ''}:\n    {key}")
+            elif old["plan"] != entry["plan"]:
+                problems.append(
+                    f"{scenario}: plan changed for\n    {key}\n    was: {old['plan']}\n    now: {entry['plan']}"
+                )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL query budgets and EXPLAIN QUERY PLAN snapshots")
+    add_spec_arguments(parser)
+    parser.add_argument("--update", action="store_true", help="write current plans to the snapshot")
+    parser.add_argument("--snapshot", type=Path, default=SNAPSHOT_PATH, help="query plan snapshot file")
+    parser.add_argument("--verbose", action="store_true", help="show app logs")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="ftr-queries-"))
+    isolate(workdir, args.verbose)
+    try:
+        from app.database.session import engine, init_db
+        init_db()
+
+        dataset = SyntheticDataset(spec_from_args(args))
+        print(f"Dataset: {dataset.total_registrations} registrations in {len(dataset.events)} events")
+        checks = QueryChecks(dataset)
+        checks.run_all()
+        engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    failed = [name for name, result in checks.results.items() if not result["ok"]]
+
+    if args.update:
+        with open(args.snapshot, "w", encoding="utf-8") as f:
+            json.dump(checks.plans, f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.write("\n")
+        print(f"Query plans written to {args.snapshot}")
+    else:
+        snapshot = {}
+        if args.snapshot.exists():
+            with open(args.snapshot, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        problems = compare_plans(checks.plans, snapshot)
+        if problems:
+            print("\nQuery plan changes (review, then accept with --update):")
+            for problem in problems:
+                print(f"  {problem}")
+            failed.append("query plans")
+
+    if failed:
+        print(f"\nFAILED: {', '.join(failed)}")
+        sys.exit(1)
+    print("\nAll query checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Replay a recorded API capture into SyncService, offline
+
+Record a real sync with API_CAPTURE=./captures (or `--record` against any
+server), then re-run it without the network on a fresh database:
+
+    python benchmarks/replay_sync.py captures/capture-20260101-120000.jsonl.gz
+    python benchmarks/replay_sync.py capture.jsonl.gz --speed recorded
+    python benchmarks/replay_sync.py --record capture.jsonl.gz --url http://127.0.0.1:5055/api --email admin@example.com
+
+The database starts empty, so the capture should be of a sync into an empty
+database (first sync after install) for the replay to make the same requests.
+"""
+import argparse
+import getpass
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.suite import isolate  # noqa: E402
+
+
+def sync(api) -> dict:
+    from app.api.sync import SyncService
+    from app.database.session import get_db_session, init_db
+
+    init_db()
+    db = get_db_session()
+    try:
+        started = time.perf_counter()
+        result = SyncService(api, db).sync_all()
+        result["elapsed"] = time.perf_counter() - started
+    finally:
+        db.close()
+    return result
+
+
+def print_result(result: dict):
+    print(f"Sync {'ok' if result['success'] else 'FAILED'} in {result['elapsed']:.2f} s")
+    print(f"  changes: {result['changes'].summary()}")
+    for error in result["errors"]:
+        print(f"  error: {error}")
+
+
+def record(args: argparse.Namespace) -> int:
+    from app.api.client import APIClient
+    from app.services.auth_service import AuthService
+
+    api = APIClient(base_url=args.url)
+    api.start_capture(args.capture)
+    try:
+        password = args.password if args.password is not None else getpass.getpass("Password: ")
+        AuthService(api).login(args.email, password)
+        result = sync(api)
+    finally:
+        api.stop_capture()
+    print_result(result)
+    print(f"Capture: {args.capture} ({Path(args.capture).stat().st_size / 1024:.1f} KiB)")
+    return 0 if result["success"] else 1
+
+
+def replay(args: argparse.Namespace) -> int:
+    from app.api.capture import ReplayTransport
+    from app.api.client import APIClient
+
+    speed = args.speed if args.speed in ("max", "recorded") else float(args.speed)
+    transport = ReplayTransport(args.capture, speed=speed)
+    api = APIClient(base_url="http://replay/api", token="replay", transport=transport)
+    result = sync(api)
+    print_result(result)
+    print(f"Replayed {transport.replayed} of {len(transport.entries)} exchanges "
+          f"(recorded network time {transport.recorded_seconds:.2f} s)")
+    if transport.remaining():
+        print(f"  {transport.remaining()} recorded exchanges were not requested")
+    return 0 if result["success"] else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay (or record) an API capture through SyncService")
+    parser.add_argument("capture", help="capture file (.jsonl.gz)")
+    parser.add_argument("--speed", default="max",
+                        help="max (no waiting), recorded (recorded response times) or a time scale factor")
+    parser.add_argument("--record", action="store_true", help="record a new capture from --url instead")
+    parser.add_argument("--url", help="server API base URL for --record")
+    parser.add_argument("--email", help="login for --record")
+    parser.add_argument("--password", help="password for --record (prompted if omitted)")
+    parser.add_argument("--workdir", type=Path, help="keep the database here instead of a temporary directory")
+    parser.add_argument("--verbose", action="store_true", help="app log at INFO level")
+    args = parser.parse_args()
+
+    if args.record and not (args.url and args.email):
+        parser.error("--record needs --url and --email")
+
+    args.capture = os.path.abspath(args.capture)
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="ftr-replay-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    isolate(workdir.resolve(), args.verbose)
+    os.environ.pop("API_CAPTURE", None)
+    try:
+        sys.exit(record(args) if args.record else replay(args))
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
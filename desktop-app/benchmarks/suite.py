@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""Benchmark suite for the desktop client
+
+Times sync, view queries, table rendering and storage/auth round-trips on a
+synthetic dataset in a throw-away data directory, and writes JSON results that
+can be compared with a previous run:
+
+    python benchmarks/suite.py --scale medium --output results.json
+    python benchmarks/suite.py --scale medium --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_ROOT))
+
+from benchmarks.datagen import (  # noqa: E402 - stdlib only, safe before isolate()
+    FakeAPI, SyntheticDataset, add_spec_arguments, populate_accounting, populate_database, spec_from_args,
+)
+from benchmarks.mock_server import MockServer, NetworkProfile, add_profile_arguments, profile_from_args  # noqa: E402
+
+GROUPS = ("sync", "sync_http", "queries", "render", "storage")
+
+
+def isolate(workdir: Path, verbose: bool = False):
+    """Point the app's data dir, DB and logs at `workdir` (before any app import)"""
+    os.environ["HOME"] = str(workdir)
+    os.environ["APPDATA"] = str(workdir)
+    os.environ["DB_PATH"] = str(workdir / "bench.db")
+    os.environ["LOG_LEVEL"] = "INFO" if verbose else "WARNING"
+    os.environ["AUTO_SYNC"] = "false"
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Run fn warmup + repeat times; timings in milliseconds"""
+    extra = None
+    for _ in range(warmup):
+        extra = fn()
+    runs: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extra = fn()
+        runs.append((time.perf_counter() - started) * 1000)
+    result = {
+        "runs_ms": [round(run, 3) for run in runs],
+        "min_ms": round(min(runs), 3),
+        "median_ms": round(statistics.median(runs), 3),
+        "mean_ms": round(statistics.fmean(runs), 3),
+        "max_ms": round(max(runs), 3),
+    }
+    if isinstance(extra, dict):
+        result.update(extra)
+    return result
+
+
+class Suite:
+    """Benchmarks sharing one generated dataset and database"""
+
+    def __init__(self, dataset: SyntheticDataset, repeat: int, render_rows: int):
+        self.dataset = dataset
+        self.repeat = repeat
+        self.render_rows = render_rows
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.local_event_id: Optional[int] = None
+
+    def record(self, name: str, result: Dict[str, Any]):
+        self.results[name] = result
+        if "skipped" in result:
+            print(f"  {name:<34} skipped: {result['skipped']}")
+        else:
+            print(f"  {name:<34} median {result['median_ms']:10.2f} ms  (min {result['min_ms']:.2f})")
+
+    # Setup
+
+    def prepare_database(self, synced: bool):
+        """Fill the DB by running sync (if the sync group ran) or by direct inserts"""
+        from app.database.session import get_db_session
+        from app.database.queries import find_event
+
+        db = get_db_session()
+        try:
+            if synced:
+                populate_accounting(self.dataset, db)
+            else:
+                populate_database(self.dataset, db)
+            event = find_event(db, self.dataset.events[0]["id"])
+            self.local_event_id = event.id if event else None
+        finally:
+            db.close()
+
+    # Groups
+
+    def run_sync(self):
+        from app.api.sync import SyncService
+        from app.database.session import get_db_session
+
+        def sync_once():
+            api = FakeAPI(self.dataset)
+            db = get_db_session()
+            try:
+                result = SyncService(api, db).sync_all()
+            finally:
+                db.close()
+            if not result["success"]:
+                raise RuntimeError(f"sync failed: {result['errors']}")
+            return {"requests": api.requests, "changes": result["changes"].summary()}
+
+        rows = self.dataset.total_registrations
+        initial = measure(sync_once, repeat=1, warmup=0)
+        initial["rows"] = rows
+        initial["rows_per_sec"] = round(rows / (initial["median_ms"] / 1000), 1) if rows else 0.0
+        self.record("sync_all.initial", initial)
+
+        # Nothing changed on the "server": measures change detection cost
+        repeat = measure(sync_once, repeat=max(1, self.repeat // 3), warmup=0)
+        repeat["rows"] = rows
+        self.record("sync_all.unchanged", repeat)
+
+    def run_sync_http(self, profile: NetworkProfile, workdir: Path):
+        """Full sync through APIClient and HTTP against the mock server, into a separate DB"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from app.api.client import APIClient
+        from app.api.sync import SyncService
+        from app.database.event_stats import install_event_stats_triggers
+        from app.database.models import Base
+        from app.services.auth_service import AuthService
+
+        engine = create_engine(f"sqlite:///{workdir / 'sync_http.db'}")
+        Base.metadata.create_all(engine)
+        install_event_stats_triggers(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        server = MockServer(self.dataset, profile).start()
+        rows = self.dataset.total_registrations
+
+        def sync_once():
+            api = APIClient(base_url=server.url)
+            AuthService(api).login("bench@example.com", "bench")
+            db = session_factory()
+            try:
+                result = SyncService(api, db).sync_all()
+            finally:
+                db.close()
+            return {"errors": len(result["errors"]), "success": result["success"]}
+
+        try:
+            for name in ("sync_http.initial", "sync_http.unchanged"):
+                before = dict(server.stats)
+                result = measure(sync_once, repeat=1, warmup=0)
+                result.update({key: server.stats[key] - before[key] for key in server.stats})
+                result["rows"] = rows
+                result["rows_per_sec"] = round(rows / (result["median_ms"] / 1000), 1) if rows else 0.0
+                result["network"] = profile._asdict()
+                self.record(name, result)
+        finally:
+            server.stop()
+            engine.dispose()
+
+    def run_queries(self):
+        from app.database.queries import RegistrationFilter, RegistrationsSource, load_event_stats
+        from app.database.session import get_db_session
+        from app.services.accounting_service import AccountingLedgerSource, AccountingQueryService
+        from app.services.event_catalog import EventCatalog
+        from app.services.price_engine import PriceEngine
+        from app.services.statistics_service import StatisticsEngine
+
+        event_id = self.local_event_id
+
+        def first_page():
+            source = RegistrationsSource(event_id)
+            source.prefetch()
+            return {"rows": source.count()}
+
+        def search():
+            source = RegistrationsSource(event_id, RegistrationFilter(search="вес"))
+            source.prefetch()
+            return {"rows": source.count()}
+
+        def sort():
+            source = RegistrationsSource(event_id)
+            source.load_sort_index()
+            source.set_sort("collective_name", descending=True)
+            source.get_rows(0, 50)
+            return {"rows": source.count()}
+
+        def accounting():
+            db = get_db_session()
+            try:
+                AccountingQueryService(db).get_totals(event_id)
+            finally:
+                db.close()
+            source = AccountingLedgerSource(event_id)
+            source.prefetch()
+            return {"rows": source.count()}
+
+        def stats():
+            db = get_db_session()
+            try:
+                load_event_stats(db, event_id)
+                cube = StatisticsEngine(db).load(event_id)
+            finally:
+                db.close()
+            return {"cubes": len(cube.all_cubes())}
+
+        def catalog():
+            return {"events": len(EventCatalog().events)}
+
+        def prices():
+            db = get_db_session()
+            try:
+                changed = PriceEngine(db).recalculate_event(event_id)
+            finally:
+                db.close()
+            return {"changed": changed}
+
+        for name, fn in (
+            ("registrations.first_page", first_page),
+            ("registrations.search", search),
+            ("registrations.sort", sort),
+            ("accounting.totals_and_ledger", accounting),
+            ("statistics.load_and_cubes", stats),
+            ("events.catalog", catalog),
+            ("prices.recalculate_event", prices),
+        ):
+            self.record(name, measure(fn, self.repeat))
+
+    def run_render(self):
+        try:
+            import customtkinter as ctk
+            root = ctk.CTk()
+        except Exception as e:
+            self.record("render.virtual_table", {"skipped": f"no display ({type(e).__name__})"})
+            return
+
+        from app.database.paging import ListDataSource
+        from app.database.queries import load_registration_rows
+        from app.database.session import get_db_session
+        from app.gui.virtual_table import TableColumn, VirtualTable
+
+        db = get_db_session()
+        try:
+            rows = load_registration_rows(db, self.local_event_id, limit=self.render_rows, offset=0)
+        finally:
+            db.close()
+
+        try:
+            root.geometry("1200x800")
+            table = VirtualTable(root, [
+                TableColumn("number", "№", width=60),
+                TableColumn("collective_name", "Коллектив", width=250, weight=1),
+                TableColumn("dance_name", "Название", width=250, weight=1),
+                TableColumn("status", "Статус", width=120),
+            ])
+            table.pack(fill="both", expand=True)
+            root.update()
+
+            def bind():
+                table.set_source(ListDataSource(rows))
+                root.update()
+                return {"rows": len(rows), "widgets": len(table.visible_rows())}
+
+            def scroll():
+                step = max(1, len(table.visible_rows()))
+                for offset in range(0, len(rows), step):
+                    table.scroll_to(offset)
+                    root.update_idletasks()
+                return {"rows": len(rows)}
+
+            self.record("render.bind_rows", measure(bind, self.repeat))
+            self.record("render.scroll_all_rows", measure(scroll, self.repeat))
+        finally:
+            root.destroy()
+
+    def run_storage(self):
+        from app.services.auth_service import AuthService
+        from app.utils import storage
+
+        settings = storage.load_display_settings()
+
+        def coalesced_saves():
+            for i in range(100):
+                settings["registration_columns"]["notes"] = bool(i % 2)
+                storage.save_display_settings(settings)
+            storage._storage.flush()
+
+        def loads():
+            for _ in range(1000):
+                storage.load_display_settings()
+
+        user = {"id": 1, "email": "bench@example.com", "name": "Bench", "role": "ADMIN"}
+
+        def auth_roundtrip():
+            storage.save_auth_data("bench-token", user)
+            auth = AuthService(FakeAPI(self.dataset))
+            loaded = auth.load_saved_auth()
+            valid = auth.check_token()
+            return {"loaded": loaded, "valid": valid}
+
+        self.record("storage.100_saves_and_flush", measure(coalesced_saves, self.repeat))
+        self.record("storage.1000_loads", measure(loads, self.repeat))
+        self.record("auth.save_load_validate", measure(auth_roundtrip, self.repeat))
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Print ratios against a baseline file; names of benchmarks slower than threshold"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    print(f"\nAgainst {baseline_path} (median, regression above x{threshold}):")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old or "median_ms" not in old or "median_ms" not in result or not old["median_ms"]:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"  {name:<34} {old['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  x{ratio:.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Desktop client benchmark suite")
+    add_spec_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--render-rows", type=int, default=1000, help="rows bound in render benchmarks")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, help="run only these groups")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="compare with a previous JSON results file")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--workdir", help="data directory to use (default: a new temp dir)")
+    parser.add_argument("--verbose", action="store_true", help="show app logs")
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="ftr-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    isolate(workdir, args.verbose)
+
+    from app.database.session import init_db
+    init_db()
+
+    spec = spec_from_args(args)
+    started = time.perf_counter()
+    dataset = SyntheticDataset(spec)
+    print(f"Dataset: {spec._asdict()} ({dataset.total_registrations} registrations, "
+          f"generated in {time.perf_counter() - started:.2f} s)")
+    print(f"Work dir: {workdir}" + ("" if args.workdir else " (removed at exit)"))
+
+    groups = args.only or GROUPS
+    suite = Suite(dataset, args.repeat, args.render_rows)
+    if "sync" in groups:
+        print("sync:")
+        suite.run_sync()
+    if "sync_http" in groups:
+        print("sync_http:")
+        suite.run_sync_http(profile_from_args(args), workdir)
+    suite.prepare_database(synced="sync" in groups)
+    for group in ("queries", "render", "storage"):
+        if group in groups:
+            print(f"{group}:")
+            getattr(suite, f"run_{group}")()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "spec": spec._asdict(),
+            "repeat": args.repeat,
+        },
+        "results": suite.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {args.output}")
+
+    regressions = compare(suite.results, args.baseline, args.threshold) if args.baseline else []
+    if not args.workdir:
+        from app.database.session import engine
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
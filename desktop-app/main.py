@@ -5,35 +5,65 @@ from pathlib import Path
 # Add app directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.database.session import init_db, get_db_session
-from app.api.client import APIClient
-from app.services.auth_service import AuthService
-from app.gui.main_window import MainWindow
-from app.utils.config import settings
-from app.utils.logger import logger
+# Heavy modules (customtkinter, requests) are imported inside main() in the order
+# they are needed, so --profile-startup can time each group; SQLAlchemy and the
+# database setup wait until the main window needs data (app.utils.startup.init_database)
+from app.utils.startup import get_startup_profiler
 
 
 def main():
     """Main function"""
+    profiler = get_startup_profiler()
+    profiler.enabled = "--profile-startup" in sys.argv[1:]
+
+    with profiler.phase("import config, logger"):
+        from app.utils.config import settings
+        from app.utils.logger import logger
+
     try:
         logger.info("Starting FTR Registration Desktop Application")
         logger.info(f"Version: {settings.app_version}")
-        
-        # Initialize database
-        logger.info("Initializing database...")
-        init_db()
-        
+
+        if "--watchdog" in sys.argv[1:]:
+            settings.ui_watchdog = True
+        if "--memory" in sys.argv[1:]:
+            settings.memory_monitor = True
+
+        with profiler.phase("import api, auth"):
+            from app.api.client import APIClient
+            from app.services.auth_service import AuthService
+
         # Create API client
         api_client = APIClient()
-        
+
         # Create auth service
         auth_service = AuthService(api_client)
-        
+
         # Create and run GUI
         logger.info("Starting GUI...")
-        app = MainWindow(auth_service)
-        app.mainloop()
-        
+        with profiler.phase("import gui"):
+            from app.gui.main_window import MainWindow
+            from app.gui.background import shutdown_executor
+        with profiler.phase("main window"):
+            app = MainWindow(auth_service)
+
+        if profiler.enabled:
+            def first_paint():
+                app.update_idletasks()
+                profiler.mark("first paint")
+                profiler.print_report()
+            app.after_idle(first_paint)
+
+        try:
+            app.mainloop()
+        finally:
+            app.stop_watchdog()
+            app.stop_memory_monitor()
+            shutdown_executor()
+            api_client.stop_capture()
+            from app.utils.profiling import get_profiler
+            logger.debug(get_profiler().report())
+
     except KeyboardInterrupt:
         logger.info("Application interrupted by user")
     except Exception as e:
@@ -43,4 +73,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Rebuild the event_stats aggregate table from registrations"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.database.session import engine, init_db
+from app.database.event_stats import rebuild_event_stats
+
+
+def main():
+    """Reconcile event_stats for all events, or for the local event IDs given as arguments"""
+    init_db()
+    event_ids = [int(arg) for arg in sys.argv[1:]]
+    
+    with engine.begin() as conn:
+        if event_ids:
+            for event_id in event_ids:
+                rebuild_event_stats(conn, event_id)
+                print(f"Rebuilt stats for event {event_id}")
+        else:
+            count = rebuild_event_stats(conn)
+            print(f"Rebuilt stats for {count} events")
+
+
+if __name__ == "__main__":
+    main()